@@ -0,0 +1,61 @@
+"""
+Benchmark: executemany bulk loader vs. DataFrame.to_sql on the sales schema
+File: scripts/benchmarks/bench_bulk_insert.py
+
+Appends several rounds of synthetic sales rows into a warehouse built from
+scripts/schema.sql with each engine, so the effect of a growing sales table shows up.
+
+    py scripts/benchmarks/bench_bulk_insert.py --rows 500000 --rounds 4
+"""
+
+import argparse
+import os
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Get the path to the 'scripts' directory (one level up) and the project root (two levels up)
+scripts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(scripts_dir)
+sys.path.append(os.path.dirname(scripts_dir))
+
+import dwbuilder as dwb
+from synthetic_data import make_sales_frame
+
+SQL_PATH = pathlib.Path(scripts_dir).joinpath("schema.sql")
+
+
+def run_engine(engine: str, rows: int, rounds: int, batch_size: int) -> list:
+    """Load `rounds` batches of `rows` sales rows with one engine; return rows/sec per round."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, f"bench_{engine}.db"))
+        dwb.execute_sql_file(conn, SQL_PATH)
+        for round_number in range(rounds):
+            df = make_sales_frame(rows, seed=round_number)
+            df["TransactionID"] += round_number * rows
+            dwb.convert_to_sql_format(df)
+            start = time.perf_counter()
+            dwb.load_data_to_dw(conn, df, "sales", engine=engine, batch_size=batch_size or None)
+            results.append(rows / (time.perf_counter() - start))
+        conn.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows appended per round.")
+    parser.add_argument("--rounds", type=int, default=3, help="Number of append rounds.")
+    parser.add_argument("--batch-size", type=int, default=0, help="Rows per commit for executemany; 0 for one commit.")
+    args = parser.parse_args()
+
+    print(f"{'engine':>12} " + " ".join(f"{'round ' + str(i + 1):>12}" for i in range(args.rounds)) + "   (rows/sec)")
+    for engine in ("to_sql", "executemany"):
+        rates = run_engine(engine, args.rows, args.rounds, args.batch_size)
+        print(f"{engine:>12} " + " ".join(f"{rate:>12.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: chunk size vs. throughput and peak memory for dwbuilder.csv_to_dw
+File: scripts/benchmarks/bench_chunked_load.py
+
+Each chunk size is loaded in a fresh Python process so the peak-RSS figure
+belongs to that run alone.
+
+    py scripts/benchmarks/bench_chunked_load.py --rows 2000000
+    python3 scripts/benchmarks/bench_chunked_load.py --rows 2000000 --chunksizes 50000 200000 0
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+# Get the path to the 'scripts' directory (one level up) and the project root (two levels up)
+scripts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(scripts_dir)
+sys.path.append(os.path.dirname(scripts_dir))
+
+import dwbuilder as dwb
+from synthetic_data import write_sales_csv_in_subprocess
+
+SQL_PATH = pathlib.Path(scripts_dir).joinpath("schema.sql")
+
+
+def run_single(csv_path: str, chunksize: int) -> dict:
+    """Load the CSV into a fresh warehouse and return the csv_to_dw report."""
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        dwb.execute_sql_file(conn, SQL_PATH)
+        report = dwb.csv_to_dw(csv_path, conn, "sales", delete_first=True, chunksize=chunksize or None)
+        conn.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksizes", type=int, nargs="+", default=[10_000, 50_000, 200_000, 1_000_000, 0],
+                        help="Chunk sizes to compare; 0 loads the whole file at once.")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        print(json.dumps(run_single(args.csv, args.single)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "sales_data_prepared.csv")
+        write_sales_csv_in_subprocess(csv_path, args.rows)
+        print(f"{'chunksize':>10} {'rows/sec':>12} {'seconds':>9} {'peak RSS MB':>12}")
+        for chunksize in args.chunksizes:
+            result = subprocess.run(
+                [sys.executable, __file__, "--single", str(chunksize), "--csv", csv_path],
+                capture_output=True, text=True, check=True,
+            )
+            report = json.loads(result.stdout.strip().splitlines()[-1])
+            peak = f"{report['peak_rss_mb']:.1f}" if report["peak_rss_mb"] is not None else "n/a"
+            label = chunksize or "whole file"
+            print(f"{label:>10} {report['rows_per_sec']:>12.0f} {report['seconds']:>9.2f} {peak:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: pd.to_datetime with no format vs. the cached-format, unique-value date parser
+File: scripts/benchmarks/bench_date_parsing.py
+
+Generates a synthetic year of raw sales dates (M/D/YYYY strings, ~366 distinct values)
+and parses them with:
+- "to_datetime": pd.to_datetime with no format, as DataScrubber used to
+- "to_datetime + format": pd.to_datetime with the format given explicitly
+- "parse_dates": utils.date_parsing.parse_dates (inferred, cached format; unique values only)
+
+    py scripts/benchmarks/bench_date_parsing.py --rows 10000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Get the path to the 'scripts' directory (one level up) and the project root (two levels up)
+scripts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(scripts_dir)
+sys.path.append(os.path.dirname(scripts_dir))
+
+import pandas as pd
+from synthetic_data import make_sales_frame
+from utils.date_parsing import clear_format_cache, parse_dates
+
+APPROACHES = {
+    "to_datetime": lambda dates: pd.to_datetime(dates),
+    "to_datetime + format": lambda dates: pd.to_datetime(dates, format="%m/%d/%Y"),
+    "parse_dates": lambda dates: parse_dates(dates, source="benchmark"),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    dates = make_sales_frame(args.rows, raw=True)["SaleDate"]
+    print(f"{len(dates):,} rows, {dates.nunique()} distinct dates")
+    print(f"{'approach':>22} {'seconds':>9}")
+    expected = None
+    for label, parse in APPROACHES.items():
+        clear_format_cache()
+        start = time.perf_counter()
+        parsed = parse(dates)
+        seconds = time.perf_counter() - start
+        if expected is None:
+            expected = parsed
+        pd.testing.assert_series_equal(parsed, expected)
+        print(f"{label:>22} {seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: single-process vs. partitioned multi-process DataScrubber plans
+File: scripts/benchmarks/bench_parallel_scrubber.py
+
+Builds a synthetic raw sales frame with padded, mixed-case payment types and
+M/D/YYYY dates, then runs the same lazy cleaning chain with collect() and with
+collect(workers=N) for each N given. The chain is dominated by row-local work
+(string trimming, date parsing, filtering) plus one global duplicate removal.
+
+    py scripts/benchmarks/bench_parallel_scrubber.py --rows 5000000 --workers 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Get the path to the 'scripts' directory (one level up) and the project root (two levels up)
+scripts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(scripts_dir)
+sys.path.append(os.path.dirname(scripts_dir))
+
+import pandas as pd
+from data_scrubber import DataScrubber
+from synthetic_data import make_sales_frame
+
+
+def cleaning_chain(df: pd.DataFrame) -> DataScrubber:
+    """Record the benchmark chain on a lazy DataScrubber."""
+    scrubber = DataScrubber(df, lazy=True)
+    scrubber.format_column_strings_to_upper_and_trim('PaymentType')
+    scrubber.parse_dates_to_add_standard_datetime('SaleDate')
+    scrubber.filter_column_outliers('SaleAmount', 5, 4_000)
+    scrubber.convert_column_to_new_data_type('LoyaltyPoints', 'float64')
+    scrubber.remove_duplicate_records(['TransactionID'])
+    scrubber.drop_columns(['SaleDate'])
+    return scrubber
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+
+    df = make_sales_frame(args.rows, raw=True)
+    df["PaymentType"] = "  " + df["PaymentType"].str.lower() + " "
+    print(f"{os.cpu_count()} CPUs, {len(df):,} rows")
+
+    start = time.perf_counter()
+    expected = cleaning_chain(df).collect()
+    baseline = time.perf_counter() - start
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    print(f"{1:>8} {baseline:>9.2f} {1.0:>8.2f}")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        result = cleaning_chain(df).collect(workers=workers)
+        seconds = time.perf_counter() - start
+        pd.testing.assert_frame_equal(result, expected)
+        print(f"{workers:>8} {seconds:>9.2f} {baseline / seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: declared-dtype CSV ingestion vs. the original read-then-convert approach
+File: scripts/benchmarks/bench_typed_csv.py
+
+Generates a synthetic raw sales_data.csv (M/D/YYYY dates) and parses it with:
+- "inferred": pd.read_csv with no dtypes, then pd.to_datetime(SaleDate) with no format
+- "typed (c)": utils.typed_csv.read_typed_csv with the C engine
+- "typed (pyarrow)": the same with the pyarrow engine, when pyarrow is installed
+
+Each approach runs in a fresh process so the peak-RSS figures are independent.
+
+    py scripts/benchmarks/bench_typed_csv.py --rows 10000000
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Get the path to the 'scripts' directory (one level up) and the project root (two levels up)
+scripts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(scripts_dir)
+sys.path.append(os.path.dirname(scripts_dir))
+
+import pandas as pd
+import dwbuilder as dwb
+from synthetic_data import write_sales_csv_in_subprocess
+from utils.typed_csv import read_typed_csv
+
+# Same declaration as scripts/data_preparation/prepare_sales_data.py
+EXPECTED_COLS = {
+    "TransactionID": "int64",
+    "SaleDate": "datetime64[ns]",
+    "ProductID": "int32",
+    "StoreID": "int16",
+    "CustomerID": "int32",
+    "CampaignID": "int16",
+    "SaleAmount": "float64",
+    "LoyaltyPoints": "int32",
+    "PaymentType": "category",
+}
+DATE_FORMATS = {"SaleDate": "%m/%d/%Y"}
+
+
+def run_single(approach: str, csv_path: str) -> dict:
+    """Parse the file with one approach and report seconds, frame size and peak RSS."""
+    start = time.perf_counter()
+    if approach == "inferred":
+        df = pd.read_csv(csv_path)
+        df["SaleDate"] = pd.to_datetime(df["SaleDate"])
+    else:
+        df = read_typed_csv(csv_path, EXPECTED_COLS, DATE_FORMATS, engine=approach)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "frame_mb": df.memory_usage(deep=True).sum() / (1024 * 1024),
+        "peak_rss_mb": dwb.get_peak_rss_mb(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        print(json.dumps(run_single(args.single, args.csv)))
+        return
+
+    approaches = ["inferred", "c"]
+    if importlib.util.find_spec("pyarrow") is not None:
+        approaches.append("pyarrow")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "sales_data.csv")
+        write_sales_csv_in_subprocess(csv_path, args.rows, raw=True)
+        print(f"{'approach':>16} {'seconds':>9} {'frame MB':>10} {'peak RSS MB':>12}")
+        for approach in approaches:
+            result = subprocess.run(
+                [sys.executable, __file__, "--single", approach, "--csv", csv_path],
+                capture_output=True, text=True, check=True,
+            )
+            report = json.loads(result.stdout.strip().splitlines()[-1])
+            label = approach if approach == "inferred" else f"typed ({approach})"
+            peak = f"{report['peak_rss_mb']:.1f}" if report["peak_rss_mb"] is not None else "n/a"
+            print(f"{label:>16} {report['seconds']:>9.2f} {report['frame_mb']:>10.1f} {peak:>12}")
+
+
+if __name__ == "__main__":
+    main()
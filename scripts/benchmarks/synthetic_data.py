@@ -0,0 +1,91 @@
+"""
+Synthetic data generators for the benchmark scripts.
+File: scripts/benchmarks/synthetic_data.py
+
+Writes sales files shaped like data/raw/sales_data.csv (or its prepared counterpart)
+with as many rows as needed to exercise the loaders at realistic volumes.
+"""
+
+import numpy as np
+import pandas as pd
+
+PAYMENT_TYPES = ["Card", "Cash", "Digital"]
+
+
+def make_sales_frame(rows: int, raw: bool = False, seed: int = 42) -> pd.DataFrame:
+    """
+    Build a synthetic sales DataFrame with the same columns as the sales source file.
+
+    Args:
+        rows (int): Number of rows to generate.
+        raw (bool): True for raw-style M/D/YYYY dates, False for prepared ISO dates.
+        seed (int): Random seed so runs are repeatable.
+
+    Returns:
+        pd.DataFrame: Synthetic sales data covering one calendar year.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 366, rows), unit="D")
+    sale_amount = rng.integers(100, 500_000, rows) / 100
+    if raw:
+        sale_date = dates.month.astype(str) + "/" + dates.day.astype(str) + "/" + dates.year.astype(str)
+    else:
+        sale_date = dates.strftime("%Y-%m-%d")
+    df = pd.DataFrame({
+        "TransactionID": np.arange(1, rows + 1),
+        "SaleDate": sale_date,
+        "CustomerID": rng.integers(1001, 1012, rows),
+        "ProductID": rng.integers(101, 109, rows),
+        "StoreID": rng.integers(401, 407, rows),
+        "CampaignID": rng.integers(0, 4, rows),
+        "SaleAmount": sale_amount,
+        "LoyaltyPoints": sale_amount.astype(int),
+        "PaymentType": rng.choice(PAYMENT_TYPES, rows),
+    })
+    return df
+
+
+def write_sales_csv(file_path: str, rows: int, raw: bool = False, block_rows: int = 1_000_000) -> None:
+    """
+    Write a synthetic sales CSV in blocks so very large files never sit in memory at once.
+
+    Args:
+        file_path (str): Destination CSV path.
+        rows (int): Total number of rows to write.
+        raw (bool): True for raw-style M/D/YYYY dates, False for prepared ISO dates.
+        block_rows (int): Rows generated per block.
+    """
+    written = 0
+    while written < rows:
+        block = make_sales_frame(min(block_rows, rows - written), raw=raw, seed=written)
+        block["TransactionID"] += written
+        block.to_csv(file_path, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += len(block)
+
+
+def write_sales_csv_in_subprocess(file_path: str, rows: int, raw: bool = False) -> None:
+    """
+    Write a synthetic sales CSV from a separate Python process.
+
+    On Linux a child process inherits its parent's peak RSS, so benchmarks that measure
+    peak memory in child processes generate their input this way to keep the parent small.
+
+    Args:
+        file_path (str): Destination CSV path.
+        rows (int): Total number of rows to write.
+        raw (bool): True for raw-style M/D/YYYY dates, False for prepared ISO dates.
+    """
+    import subprocess
+    import sys
+    command = [sys.executable, __file__, file_path, str(rows)] + (["--raw"] if raw else [])
+    subprocess.run(command, check=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Write a synthetic sales CSV.")
+    parser.add_argument("file_path")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--raw", action="store_true", help="Use raw-style M/D/YYYY dates.")
+    args = parser.parse_args()
+    write_sales_csv(args.file_path, args.rows, raw=args.raw)
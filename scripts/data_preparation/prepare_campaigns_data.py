@@ -0,0 +1,46 @@
+import sys
+import os
+
+# Get the path to the directory containing 'utils' (assuming it's two levels up)
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+ # Add the parent directory to sys.path
+sys.path.append(parent_dir)
+ 
+# Local Imports
+from utils.logger import logger
+from utils.validation import prepare_source
+
+########################################
+# Validation Spec (UPDATE TO CUSTOMIZE)
+########################################
+
+# Column dtypes drive parsing; the row rules are checked by utils.validation and failing
+# rows go to data/quarantine/campaigns_data_rejected.csv (see utils/validation.py for the rules).
+# CampaignID 0 is the "No Campaign" baseline that campaign lift is measured against.
+CAMPAIGNS_SPEC = {
+    "columns": {
+        "CampaignID": {"dtype": "int16", "not_null": True, "min": 0},
+        "CampaignName": {"dtype": "object"},
+        "Channel": {"dtype": "category"},
+        "StartDate": {"dtype": "datetime64[ns]", "format": "%m/%d/%Y"},
+        "EndDate": {"dtype": "datetime64[ns]", "format": "%m/%d/%Y"},
+        "Budget": {"dtype": "float64", "min": 0},
+    },
+    "unique": ["CampaignID"],
+}
+
+
+########################################
+# Main Execution
+########################################
+def main() -> None:
+    """Main function for processing marketing campaign data."""
+    logger.info("Starting data preparation...")
+
+    # Rows failing a rule go to data/quarantine; a missing file or schema mismatch is logged and stops here
+    if prepare_source("campaigns_data", CAMPAIGNS_SPEC) is not None:
+        logger.info("Data preparation complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import pandas as pd
 import sys
 import os
 
@@ -9,105 +8,40 @@ sys.path.append(parent_dir)
  
 # Local Imports
 from utils.logger import logger
+from utils.validation import prepare_source
 
 ########################################
-# Functions
+# Validation Spec (UPDATE TO CUSTOMIZE)
 ########################################
 
-def verify_columns(df: pd.DataFrame, expected_columns: dict) -> bool:
-    """
-    Verifies the correct number and type of columns in a DataFrame.
-
-    Args:
-        df: The DataFrame to check.
-        expected_columns: A dictionary where keys are column names and values are expected data types (e.g., 'int64', 'float64', 'object').
-
-    Returns:
-        True if the DataFrame has the correct columns and types, False otherwise.
-    """
-    logger.info("Verifying columns and types...")
-
-    # Check if the number of columns is correct
-    if len(df.columns) != len(expected_columns):
-        logger.error(f"Incorrect number of columns. Expected: {len(expected_columns)}, Found: {len(df.columns)}")
-        return False
-
-    # Check if all expected columns are present
-    for col_name in expected_columns:
-        if col_name not in df.columns:
-            logger.error(f"Missing column: {col_name}")
-            return False
-
-    # Check the data type of each column
-    for col_name, expected_type in expected_columns.items():
-        actual_type = str(df[col_name].dtype)
-        if actual_type != expected_type:
-            logger.error(f"Incorrect data type for column '{col_name}'. Expected: {expected_type}, Found: {actual_type}")
-            return False
-
-    logger.info("Columns and types verified successfully.")
-    return True
-
-
-def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
-    """Removes duplicate rows from the DataFrame."""
-    df.drop_duplicates(inplace=True)
-    return df
-
-
-def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
-    """Removes sales data where SaleDate is before 2000-01-01."""
-    cutoff_date = pd.to_datetime('2000-01-01')  # Define the cutoff date
-    df_filtered = df[df['SaleDate'] >= cutoff_date]
-
-    return df_filtered
+# Column dtypes drive parsing; the row rules are checked by utils.validation and failing
+# rows go to data/quarantine/sales_data_rejected.csv (see utils/validation.py for the rules)
+SALES_SPEC = {
+    "columns": {
+        "TransactionID": {"dtype": "int64", "not_null": True},
+        "SaleDate": {"dtype": "datetime64[ns]", "format": "%m/%d/%Y", "min": "2000-01-01"},
+        "ProductID": {"dtype": "int32"},
+        "StoreID": {"dtype": "int16"},
+        "CustomerID": {"dtype": "int32"},
+        "CampaignID": {"dtype": "int16"},
+        "SaleAmount": {"dtype": "float64", "min": 0},
+        "LoyaltyPoints": {"dtype": "int32"},
+        "PaymentType": {"dtype": "category", "allowed": ["Card", "Digital", "Cash"]},
+    },
+    "unique": ["TransactionID"],
+}
 
 
 ########################################
 # Main Execution
 ########################################
 def main() -> None:
-    """Main function for processing customer, product, and sales data."""
+    """Main function for processing sales data."""
     logger.info("Starting data preparation...")
 
-    try:
-        df_sales = pd.read_csv("data/raw/sales_data.csv")
-        expected_cols = {
-            "TransactionID": "int64",
-            "SaleDate": "datetime64[ns]",  #Note:  SaleDate is not datetime64 in the provided data
-            "ProductID": "int64",
-            "StoreID": "int64",
-            "CustomerID": "int64",
-            "CampaignID": "int64",
-            "SaleAmount": "float64",
-            "LoyaltyPoints": "int64",
-            "PaymentType": "object",
-        }
-        # Convert JoinDate to datetime before verifying columns
-        df_sales["SaleDate"] = pd.to_datetime(df_sales["SaleDate"])
-        
-        if verify_columns(df_sales, expected_cols):
-            logger.info("Proceeding with data processing...")
-            df_sales = remove_duplicates(df_sales)
-            df_sales = remove_outliers(df_sales)
-
-            # Create the 'data/prepared' directory if it doesn't exist
-            prepared_data_dir = "data/prepared"
-            os.makedirs(prepared_data_dir, exist_ok=True)
-
-            # Write the processed DataFrame to a CSV file in the 'data/prepared' directory
-            output_filepath = os.path.join(prepared_data_dir, "sales_data_prepared.csv")
-            df_sales.to_csv(output_filepath, index=False)  # index=False prevents writing the index
-            logger.info(f"Processed data saved to: {output_filepath}")
-
-        else:
-            logger.error("Data validation failed. Exiting.")
-            return
-    except FileNotFoundError:
-        logger.error("sales_data.csv not found")
-        return
-
-    logger.info("Data preparation complete.")
+    # Rows failing a rule go to data/quarantine; a missing file or schema mismatch is logged and stops here
+    if prepare_source("sales_data", SALES_SPEC) is not None:
+        logger.info("Data preparation complete.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+import sys
+import os
+
+# Get the path to the directory containing 'utils' (assuming it's two levels up)
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+ # Add the parent directory to sys.path
+sys.path.append(parent_dir)
+ 
+# Local Imports
+from utils.logger import logger
+from utils.validation import prepare_source
+
+########################################
+# Validation Spec (UPDATE TO CUSTOMIZE)
+########################################
+
+# Column dtypes drive parsing; the row rules are checked by utils.validation and failing
+# rows go to data/quarantine/stores_data_rejected.csv (see utils/validation.py for the rules)
+STORES_SPEC = {
+    "columns": {
+        "StoreID": {"dtype": "int16", "not_null": True},
+        "StoreName": {"dtype": "object"},
+        "Region": {"dtype": "category", "allowed": ["East", "West", "North", "South"]},
+        "City": {"dtype": "object"},
+        "State": {"dtype": "category"},
+        "SquareFeet": {"dtype": "int32", "min": 0},
+    },
+    "unique": ["StoreID"],
+}
+
+
+########################################
+# Main Execution
+########################################
+def main() -> None:
+    """Main function for processing store data."""
+    logger.info("Starting data preparation...")
+
+    # Rows failing a rule go to data/quarantine; a missing file or schema mismatch is logged and stops here
+    if prepare_source("stores_data", STORES_SPEC) is not None:
+        logger.info("Data preparation complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,23 +10,91 @@ Use it to create a DataScrubber object by passing in a DataFrame with your data.
 Then, call the methods, providing arguments as needed to enjoy common, 
 re-usable cleaning and preparation methods. 
 
+Pass lazy=True to record the cleaning steps instead of running them one by one.
+Call collect() at the end of the chain: the recorded plan is optimized (column
+drops and reorders become a single up-front projection, adjacent filters are
+merged into one boolean mask, renames only touch column labels) and then run
+with as few copies of the data as possible.
+
+    scrubber = DataScrubber(df, lazy=True)
+    scrubber.drop_columns(['Notes']).filter_column_outliers('Age', 13, 150)
+    df_clean = scrubber.collect()
+
+Pass collect(workers=N) to run the row-local steps on N row partitions in a process
+pool. Partitions travel to the workers as Arrow data in shared memory rather than
+being pickled. Global steps (duplicate removal, conversion to 'category') run once
+on the combined result, so the output is the same as a single-process run.
+
 See the associated test script in the tests folder. 
 
 """
 
-import io
+import numpy as np
 import pandas as pd
-from typing import Dict, Tuple, Union, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple, Union, List, Optional
+
+from utils.data_profiler import DataProfiler
+from utils.date_parsing import parse_dates
+from utils.dedup import drop_duplicate_rows
+from utils.shared_frames import from_payload, release_payload, to_payload
 
 class DataScrubber:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, lazy: bool = False):
         """
         Initialize the DataScrubber with a DataFrame.
         
         Parameters:
             df (pd.DataFrame): The DataFrame to be scrubbed.
+            lazy (bool, optional): If True, cleaning methods are recorded and run by collect(). Default is False.
         """
         self.df = df
+        self.lazy = lazy
+        self.plan = []
+
+    def _record(self, method: str, *args) -> 'DataScrubber':
+        """Record a cleaning step for lazy execution and return self so calls can be chained."""
+        self.plan.append((method, args))
+        return self
+
+    def collect(self, workers: Optional[int] = None) -> pd.DataFrame:
+        """
+        Optimize and run the recorded cleaning steps (lazy mode).
+        In eager mode there is nothing recorded and the current DataFrame is returned.
+        
+        Parameters:
+            workers (int, optional): Number of processes for row-local steps (string formatting, type
+                                     conversion, outlier filters, date parsing, missing values). The frame
+                                     is split into that many row partitions. Default is None (one process).
+
+        Returns:
+            pd.DataFrame: The cleaned DataFrame.
+
+        Raises:
+            ValueError: If a recorded step refers to a column that does not exist at that point.
+        """
+        if self.plan:
+            self.df = execute_plan(self.df, self.plan, workers)
+            self.plan = []
+        return self.df
+
+    def profile(self, chunksize: Union[int, None] = None) -> dict:
+        """
+        Profile the data in a single pass: null counts, duplicate count, min/max/mean/std,
+        distinct-count estimates and dtypes. See utils/data_profiler.py.
+        
+        Parameters:
+            chunksize (int, optional): Rows profiled at a time. Default is None (the whole DataFrame at once).
+
+        Returns:
+            dict: 'rows', 'duplicate_count', 'memory_bytes' and 'columns' (a DataFrame of per-column statistics).
+        """
+        self.collect()
+        profiler = DataProfiler()
+        step = chunksize or max(len(self.df), 1)
+        for start in range(0, max(len(self.df), 1), step):
+            profiler.update(self.df.iloc[start:start + step])
+        return profiler.profile()
 
     def check_data_consistency_before_cleaning(self) -> Dict[str, Union[pd.Series, int]]:
         """
@@ -35,9 +103,9 @@ class DataScrubber:
         Returns:
             dict: Dictionary with counts of null values and duplicate rows.
         """
-        null_counts = self.df.isnull().sum()
-        duplicate_count = self.df.duplicated().sum()
-        return {'null_counts': null_counts, 'duplicate_count': duplicate_count}
+        profile = self.profile()
+        null_counts = profile['columns']['null_count'].astype('int64')
+        return {'null_counts': null_counts, 'duplicate_count': profile['duplicate_count']}
 
     def check_data_consistency_after_cleaning(self) -> Dict[str, Union[pd.Series, int]]:
         """
@@ -46,8 +114,9 @@ class DataScrubber:
         Returns:
             dict: Dictionary with counts of null values and duplicate rows, expected to be zero for each.
         """
-        null_counts = self.df.isnull().sum()
-        duplicate_count = self.df.duplicated().sum()
+        profile = self.profile()
+        null_counts = profile['columns']['null_count'].astype('int64')
+        duplicate_count = profile['duplicate_count']
         assert null_counts.sum() == 0, "Data still contains null values after cleaning."
         assert duplicate_count == 0, "Data still contains duplicate records after cleaning."
         return {'null_counts': null_counts, 'duplicate_count': duplicate_count}
@@ -66,6 +135,8 @@ class DataScrubber:
         Raises:
             ValueError: If the specified column not found in the DataFrame.
         """
+        if self.lazy:
+            return self._record('convert_column_to_new_data_type', column, new_type)
         try:
             self.df[column] = self.df[column].astype(new_type)
             return self.df
@@ -85,6 +156,8 @@ class DataScrubber:
         Raises:
             ValueError: If a specified column is not found in the DataFrame.
         """
+        if self.lazy:
+            return self._record('drop_columns', columns)
         for column in columns:
             if column not in self.df.columns:
                 raise ValueError(f"Column name '{column}' not found in the DataFrame.")
@@ -106,6 +179,8 @@ class DataScrubber:
         Raises:
             ValueError: If the specified column not found in the DataFrame.
         """
+        if self.lazy:
+            return self._record('filter_column_outliers', column, lower_bound, upper_bound)
         try:
             self.df = self.df[(self.df[column] >= lower_bound) & (self.df[column] <= upper_bound)]
             return self.df
@@ -125,6 +200,8 @@ class DataScrubber:
         Raises:
             ValueError: If the specified column not found in the DataFrame.
         """
+        if self.lazy:
+            return self._record('format_column_strings_to_lower_and_trim', column)
         try:
             self.df[column] = self.df[column].str.lower().str.strip()
             return self.df
@@ -144,6 +221,8 @@ class DataScrubber:
         Raises:
             ValueError: If the specified column not found in the DataFrame.
         """
+        if self.lazy:
+            return self._record('format_column_strings_to_upper_and_trim', column)
         try:
             # TODO: Fix the following logic to call str.upper() and str.strip() on the given column 
             # HINT: See previous function for an example
@@ -163,6 +242,8 @@ class DataScrubber:
         Returns:
             pd.DataFrame: Updated DataFrame with missing data handled.
         """
+        if self.lazy:
+            return self._record('handle_missing_data', drop, fill_value)
         if drop:
             self.df = self.df.dropna()
         elif fill_value is not None:
@@ -171,26 +252,38 @@ class DataScrubber:
 
     def inspect_data(self) -> Tuple[str, str]:
         """
-        Inspect the data by providing DataFrame information and summary statistics.
+        Inspect the data by providing column information and summary statistics,
+        both computed by a single profiling pass.
         
         Returns:
-            tuple: (info_str, describe_str), where `info_str` is a string representation of DataFrame.info()
-                   and `describe_str` is a string representation of DataFrame.describe().
+            tuple: (info_str, describe_str), where `info_str` lists each column's dtype, non-null count,
+                   distinct-count estimate and memory use (like DataFrame.info()), and `describe_str`
+                   holds count, mean, std, min and max of the numeric and datetime columns
+                   (like DataFrame.describe(), without the percentiles).
         """
-        buffer = io.StringIO()
-        self.df.info(buf=buffer)
-        info_str = buffer.getvalue()  # Retrieve the string content of the buffer
+        profile = self.profile()
+        columns = profile['columns']
+        info_str = (
+            f"{len(columns)} columns, {profile['rows']} entries, {profile['duplicate_count']} duplicate rows\n"
+            + columns[['dtype', 'non_null', 'distinct_estimate', 'memory_bytes']].to_string()
+            + f"\nmemory usage: {profile['memory_bytes']} bytes\n"
+        )
 
-        # Capture the describe output as a string
-        describe_str = self.df.describe().to_string()  # Convert DataFrame.describe() output to a string
+        # Summary statistics of the columns that have a min/max, laid out like describe()
+        described = columns[columns['min'].notna()]
+        describe_str = described[['non_null', 'mean', 'std', 'min', 'max']] \
+            .rename(columns={'non_null': 'count'}).T.to_string()
         return info_str, describe_str
 
-    def parse_dates_to_add_standard_datetime(self, column: str) -> pd.DataFrame:
+    def parse_dates_to_add_standard_datetime(self, column: str, date_format: Optional[str] = None) -> pd.DataFrame:
         """
         Parse a specified column as datetime format and add it as a new column named 'StandardDateTime'.
+        The format is inferred once per column and cached, and only unique values are parsed
+        (see utils/date_parsing.py).
         
         Parameters:
             column (str): Name of the column to parse as datetime.
+            date_format (str, optional): strftime format of the column, e.g. '%m/%d/%Y'. Default is None (inferred).
         
         Returns:
             pd.DataFrame: Updated DataFrame with a new 'StandardDateTime' column containing parsed datetime values.
@@ -198,21 +291,32 @@ class DataScrubber:
         Raises:
             ValueError: If the specified column not found in the DataFrame.
         """
+        if self.lazy:
+            return self._record('parse_dates_to_add_standard_datetime', column, date_format)
         try:
-            self.df['StandardDateTime'] = pd.to_datetime(self.df[column])
+            self.df['StandardDateTime'] = parse_dates(self.df[column], date_format=date_format)
             return self.df
         except KeyError:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
 
-    def remove_duplicate_records(self) -> pd.DataFrame:
+    def remove_duplicate_records(self, subset: Union[List[str], None] = None) -> pd.DataFrame:
         """
-        Remove duplicate rows from the DataFrame.
+        Remove duplicate rows from the DataFrame, keeping the first occurrence.
+        Rows are compared by 64-bit fingerprints (see utils/dedup.py).
         
+        Parameters:
+            subset (list, optional): Key columns that identify a duplicate, e.g. ['TransactionID'].
+                                     Default is None (compare every column).
+
         Returns:
             pd.DataFrame: Updated DataFrame with duplicates removed.
 
+        Raises:
+            ValueError: If a subset column is not found in the DataFrame.
         """
-        self.df = self.df.drop_duplicates()
+        if self.lazy:
+            return self._record('remove_duplicate_records', subset)
+        self.df = drop_duplicate_rows(self.df, subset)
         return self.df
 
     def rename_columns(self, column_mapping: Dict[str, str]) -> pd.DataFrame:
@@ -228,6 +332,8 @@ class DataScrubber:
         Raises:
             ValueError: If a specified column is not found in the DataFrame.
         """
+        if self.lazy:
+            return self._record('rename_columns', column_mapping)
 
         for old_name, new_name in column_mapping.items():
             if old_name not in self.df.columns:
@@ -249,8 +355,246 @@ class DataScrubber:
         Raises:
             ValueError: If a specified column is not found in the DataFrame.
         """
+        if self.lazy:
+            return self._record('reorder_columns', columns)
         for column in columns:
             if column not in self.df.columns:
                 raise ValueError(f"Column name '{column}' not found in the DataFrame.")
         self.df = self.df[columns]
-        return self.df
\ No newline at end of file
+        return self.df
+
+###################################################################
+# Lazy execution plan
+###################################################################
+def _require_columns(visible: List[str], columns: List[str], message: str = "Column name '{}' not found in the DataFrame.") -> None:
+    """Raise the same ValueError the eager methods raise when a column is missing."""
+    for column in columns:
+        if column not in visible:
+            raise ValueError(message.format(column))
+
+
+def optimize_plan(columns: List[str], plan: List[tuple]) -> dict:
+    """
+    Turn a recorded list of DataScrubber calls into an optimized physical plan.
+
+    Column drops, reorders and renames are tracked as metadata only: they decide which source
+    columns are read at all (projection pushdown) and what the result columns are called,
+    but never copy data themselves. Adjacent row filters are merged into one step so a single
+    boolean mask is applied.
+
+    Parameters:
+        columns (list): Column names of the input DataFrame.
+        plan (list): (method name, args) tuples recorded in lazy mode.
+
+    Returns:
+        dict: 'source_columns' to read, physical 'steps', and the 'output_columns' / 'output_names' of the result.
+
+    Raises:
+        ValueError: If a step refers to a column that does not exist at that point in the chain.
+    """
+    visible = list(columns)              # logical column names, in order, at this point in the chain
+    physical = {c: c for c in columns}   # logical name -> physical column in the working frame
+    used_physical = set(columns)
+    steps = []
+
+    for method, args in plan:
+        if method == 'drop_columns':
+            _require_columns(visible, args[0])
+            visible = [c for c in visible if c not in args[0]]
+        elif method == 'reorder_columns':
+            _require_columns(visible, args[0])
+            visible = list(args[0])
+        elif method == 'rename_columns':
+            mapping = args[0]
+            _require_columns(visible, list(mapping), "Column '{}' not found in the DataFrame.")
+            physical = {mapping.get(c, c): physical[c] for c in visible}
+            visible = [mapping.get(c, c) for c in visible]
+        elif method == 'filter_column_outliers':
+            column, lower_bound, upper_bound = args
+            _require_columns(visible, [column])
+            condition = (physical[column], lower_bound, upper_bound)
+            if steps and steps[-1][0] == 'filter':
+                steps[-1][1].append(condition)
+            else:
+                steps.append(('filter', [condition]))
+        elif method in ('format_column_strings_to_lower_and_trim', 'format_column_strings_to_upper_and_trim'):
+            _require_columns(visible, [args[0]])
+            case = 'lower' if method == 'format_column_strings_to_lower_and_trim' else 'upper'
+            steps.append(('format_strings', physical[args[0]], case))
+        elif method == 'convert_column_to_new_data_type':
+            _require_columns(visible, [args[0]])
+            steps.append(('astype', physical[args[0]], args[1]))
+        elif method == 'parse_dates_to_add_standard_datetime':
+            _require_columns(visible, [args[0]])
+            if 'StandardDateTime' not in visible:
+                target = 'StandardDateTime'
+                while target in used_physical:
+                    target += '_'
+                used_physical.add(target)
+                physical['StandardDateTime'] = target
+                visible.append('StandardDateTime')
+            steps.append(('to_datetime', physical[args[0]], physical['StandardDateTime'], args[1]))
+        elif method == 'handle_missing_data':
+            drop, fill_value = args
+            if drop:
+                steps.append(('dropna', [physical[c] for c in visible]))
+            elif fill_value is not None:
+                steps.append(('fillna', [physical[c] for c in visible], fill_value))
+        elif method == 'remove_duplicate_records':
+            subset = visible if not args or args[0] is None else list(args[0])
+            _require_columns(visible, subset)
+            steps.append(('drop_duplicates', [physical[c] for c in subset]))
+        else:
+            raise ValueError(f"Method '{method}' cannot be recorded in a lazy plan.")
+
+    output_columns = [physical[c] for c in visible]
+    referenced = set(output_columns)
+    for step in steps:
+        referenced.update(step_columns(step))
+    return {
+        'source_columns': [c for c in columns if c in referenced],
+        'steps': steps,
+        'output_columns': output_columns,
+        'output_names': visible,
+    }
+
+
+def step_columns(step: tuple) -> List[str]:
+    """Return the physical columns a plan step reads or writes."""
+    kind = step[0]
+    if kind == 'filter':
+        return [column for column, _, _ in step[1]]
+    if kind in ('dropna', 'fillna', 'drop_duplicates'):
+        return list(step[1])
+    if kind == 'to_datetime':
+        return [step[1], step[2]]
+    return [step[1]]
+
+
+def apply_step(df: pd.DataFrame, step: tuple) -> pd.DataFrame:
+    """
+    Apply one physical plan step to the working DataFrame.
+    Column steps modify the working frame in place; row steps return a new frame.
+
+    Parameters:
+        df (pd.DataFrame): The working DataFrame.
+        step (tuple): A step produced by optimize_plan.
+
+    Returns:
+        pd.DataFrame: The working DataFrame after the step.
+    """
+    kind = step[0]
+    if kind == 'filter':
+        mask = np.ones(len(df), dtype=bool)
+        for column, lower_bound, upper_bound in step[1]:
+            mask &= ((df[column] >= lower_bound) & (df[column] <= upper_bound)).to_numpy()
+        return df.take(np.flatnonzero(mask))
+    if kind == 'format_strings':
+        strings = df[step[1]].str.lower() if step[2] == 'lower' else df[step[1]].str.upper()
+        df[step[1]] = strings.str.strip()
+    elif kind == 'astype':
+        df[step[1]] = df[step[1]].astype(step[2])
+    elif kind == 'to_datetime':
+        df[step[2]] = parse_dates(df[step[1]], date_format=step[3])
+    elif kind == 'dropna':
+        return df.dropna(subset=step[1])
+    elif kind == 'fillna':
+        df.fillna({column: step[2] for column in step[1]}, inplace=True)
+    elif kind == 'drop_duplicates':
+        return drop_duplicate_rows(df, step[1])
+    return df
+
+
+# Steps that only look at one row at a time, so they can run on row partitions independently
+PARTITIONABLE_STEPS = {'filter', 'format_strings', 'astype', 'to_datetime', 'dropna', 'fillna'}
+
+# Frames shorter than this are not worth shipping to worker processes
+MIN_PARALLEL_ROWS = 50_000
+
+
+def is_partitionable(step: tuple) -> bool:
+    """Return True if a plan step gives the same result run per partition as on the whole frame."""
+    if step[0] == 'astype':
+        # Each partition would infer its own categories; convert once the partitions are combined
+        return not isinstance(pd.api.types.pandas_dtype(step[2]), pd.CategoricalDtype)
+    return step[0] in PARTITIONABLE_STEPS
+
+
+def run_partition(payload: tuple, steps: List[tuple]) -> tuple:
+    """Worker process: apply the steps to one row partition and send the result back."""
+    df = from_payload(payload)
+    for step in steps:
+        df = apply_step(df, step)
+    return to_payload(df)
+
+
+def run_partitioned(df: pd.DataFrame, steps: List[tuple], pool: ProcessPoolExecutor, workers: int) -> pd.DataFrame:
+    """
+    Split the frame into row partitions, run the steps on each in the process pool
+    and concatenate the results in partition order.
+    """
+    bounds = np.linspace(0, len(df), workers + 1).astype(int)
+    payloads = [to_payload(df.iloc[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:])]
+    results = []
+    try:
+        futures = [pool.submit(run_partition, payload, steps) for payload in payloads]
+        results = [future.result() for future in futures]
+        parts = [from_payload(result, unlink=True) for result in results]
+    except Exception:
+        for result in results:
+            release_payload(result)
+        raise
+    finally:
+        for payload in payloads:
+            release_payload(payload)
+    return pd.concat(parts)
+
+
+def execute_plan(df: pd.DataFrame, plan: List[tuple], workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Optimize and run a recorded plan against a DataFrame.
+
+    The input is projected once onto the columns the plan needs (the only up-front copy, which
+    also leaves the caller's DataFrame untouched), then the physical steps run in order and the
+    result columns are labelled in place.
+
+    With workers > 1, each run of consecutive row-local steps is executed on row partitions in
+    a process pool. A duplicate-removal step is also applied inside the partitions to shrink
+    them before the combine, then once more on the combined frame, which keeps the first
+    occurrence exactly as a single-process run would.
+
+    Parameters:
+        df (pd.DataFrame): The input DataFrame.
+        plan (list): (method name, args) tuples recorded in lazy mode.
+        workers (int, optional): Number of worker processes. Default is None (run in this process).
+
+    Returns:
+        pd.DataFrame: The cleaned DataFrame.
+    """
+    optimized = optimize_plan(list(df.columns), plan)
+    positions = [df.columns.get_loc(c) for c in optimized['source_columns']]
+    working = df.take(positions, axis=1)
+
+    parallel = workers is not None and workers > 1 and len(working) >= MIN_PARALLEL_ROWS
+    if not parallel:
+        for step in optimized['steps']:
+            working = apply_step(working, step)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            segment = []
+            for step in optimized['steps'] + [None]:
+                if step is not None and is_partitionable(step):
+                    segment.append(step)
+                    continue
+                if step is not None and step[0] == 'drop_duplicates':
+                    segment.append(step)
+                if any(is_partitionable(s) for s in segment):
+                    working = run_partitioned(working, segment, pool, workers)
+                segment = []
+                if step is not None:
+                    working = apply_step(working, step)
+
+    if list(working.columns) != optimized['output_columns']:
+        working = working.take([working.columns.get_loc(c) for c in optimized['output_columns']], axis=1)
+    working.columns = optimized['output_names']
+    return working
@@ -0,0 +1,391 @@
+"""
+Sales Cube Query API
+File: scripts/dw_cube.py
+
+Slice, dice and drill-down queries over the warehouse built by dwbuilder, without
+hand-written SQL. The star schema from scripts/schema.sql is declared once below:
+the sales fact table, the customers, products, stores and campaigns dimensions, the dimension levels
+that can be grouped or filtered on, and the measures that can be aggregated.
+
+Each query is answered from the smallest source that can answer it: a materialized
+rollup table (see dwbuilder.refresh_rollups) when every requested dimension, filter
+and measure is available there and the rollups are up to date, otherwise grouped SQL
+over the fact table with only the dimension joins the query needs. When the fact
+table is partitioned by month (dwbuilder.partition_by_month), date, month and year
+filters and date ranges prune the query to the partitions that can match.
+
+Results are kept in an LRU cache keyed on the normalized query plus the versions of
+the tables it reads (dw_table_versions, bumped by every load), so a load that changes
+a table invalidates the cached results that depend on it.
+
+Example:
+    cube = SalesCube("data/dw/block_smart_sales.db")
+    cube.query(["region", "month"], ["sale_amount", "sale_profit"], filters={"category": "Electronics"})
+    cube.query(["store"], ["sale_amount"], date_range=("2024-03-01", "2024-05-31"))
+"""
+
+import collections
+import re
+import sqlite3
+import sys
+import os
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import pandas as pd
+
+# Get the path to the directory containing 'utils' (assuming it's one level up)
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+# Local Imports
+from utils.logger import logger
+import dwbuilder as dwb
+
+###################################################################
+# Star schema declaration (UPDATE TO CUSTOMIZE)
+###################################################################
+FACT_TABLE = "sales"
+
+# Dimension tables joined on demand: alias -> (table, join condition; {alias} is the fact or rollup row)
+DIMENSION_JOINS = {
+    "c": ("customers", "c.customer_id = {alias}.customer_id"),
+    "p": ("products", "p.product_id = {alias}.product_id"),
+    "d": ("dim_date", "d.date_key = {alias}.sale_date_key"),
+    "t": ("stores", "t.store_id = {alias}.store_id"),
+    "g": ("campaigns", "g.campaign_id = {alias}.campaign_id"),
+}
+
+
+class Level(NamedTuple):
+    """A dimension level: its SQL expression over the fact table (alias s) and over each rollup (alias r)."""
+    fact: str
+    rollups: Dict[str, str]
+
+
+class Measure(NamedTuple):
+    """An aggregate: its SQL over the fact table (alias s) and over each rollup (alias r)."""
+    fact: str
+    rollups: Dict[str, str]
+
+
+DAILY = "rollup_daily_sales"
+STORE = "rollup_store_daily"
+CAMPAIGN = "rollup_campaign_daily"
+CUSTOMER = "rollup_customer_value"
+
+LEVELS = {
+    "region": Level("c.region", {DAILY: "r.region", CAMPAIGN: "r.region", CUSTOMER: "r.region"}),
+    "customer": Level("s.customer_id", {CUSTOMER: "r.customer_id"}),
+    "store": Level("s.store_id", {DAILY: "r.store_id", STORE: "r.store_id", CAMPAIGN: "r.store_id"}),
+    "store_name": Level("t.store_name", {DAILY: "t.store_name", STORE: "t.store_name", CAMPAIGN: "t.store_name"}),
+    "store_region": Level("t.region", {DAILY: "t.region", STORE: "t.region", CAMPAIGN: "t.region"}),
+    "state": Level("t.state", {DAILY: "t.state", STORE: "t.state", CAMPAIGN: "t.state"}),
+    "campaign": Level("s.campaign_id", {CAMPAIGN: "r.campaign_id"}),
+    "campaign_name": Level("g.campaign_name", {CAMPAIGN: "g.campaign_name"}),
+    "channel": Level("g.channel", {CAMPAIGN: "g.channel"}),
+    "product": Level("s.product_id", {DAILY: "r.product_id"}),
+    "category": Level("p.category", {DAILY: "p.category"}),
+    "supplier": Level("p.supplier", {DAILY: "p.supplier"}),
+    "year": Level("substr(s.sale_date, 1, 4)", {
+        DAILY: "substr(r.sale_date, 1, 4)", STORE: "substr(r.sale_date, 1, 4)", CAMPAIGN: "substr(r.sale_date, 1, 4)"}),
+    "month": Level("substr(s.sale_date, 1, 7)", {
+        DAILY: "substr(r.sale_date, 1, 7)", STORE: "substr(r.sale_date, 1, 7)", CAMPAIGN: "substr(r.sale_date, 1, 7)"}),
+    "date": Level("s.sale_date", {DAILY: "r.sale_date", STORE: "r.sale_date", CAMPAIGN: "r.sale_date"}),
+    "payment_type": Level("s.payment_type", {}),
+    # Calendar attributes from the dim_date dimension (fact table only)
+    "quarter": Level("d.year || '-Q' || d.quarter", {}),
+    "week": Level("d.iso_year || '-W' || printf('%02d', d.week_of_year)", {}),
+    "day_of_week": Level("d.day_name", {}),
+    "fiscal_year": Level("d.fiscal_year", {}),
+    "fiscal_quarter": Level("d.fiscal_year || '-Q' || d.fiscal_quarter", {}),
+}
+
+MEASURES = {
+    "sale_amount": Measure("SUM(s.sale_amount)", {
+        DAILY: "SUM(r.sale_amount)", STORE: "SUM(r.sale_amount)", CAMPAIGN: "SUM(r.sale_amount)",
+        CUSTOMER: "SUM(r.sale_amount)"}),
+    "transactions": Measure("COUNT(*)", {
+        DAILY: "SUM(r.transactions)", STORE: "SUM(r.transactions)", CAMPAIGN: "SUM(r.transactions)",
+        CUSTOMER: "SUM(r.transactions)"}),
+    "quantity": Measure("SUM(s.quantity)", {DAILY: "SUM(r.quantity)", CUSTOMER: "SUM(r.quantity)"}),
+    "sale_profit": Measure("SUM(s.sale_profit)", {
+        DAILY: "SUM(r.sale_profit)", STORE: "SUM(r.sale_profit)", CAMPAIGN: "SUM(r.sale_profit)",
+        CUSTOMER: "SUM(r.sale_profit)"}),
+    "avg_sale_amount": Measure("AVG(s.sale_amount)", {
+        DAILY: "SUM(r.sale_amount) * 1.0 / SUM(r.transactions)",
+        STORE: "SUM(r.sale_amount) * 1.0 / SUM(r.transactions)",
+        CAMPAIGN: "SUM(r.sale_amount) * 1.0 / SUM(r.transactions)",
+        CUSTOMER: "SUM(r.sale_amount) * 1.0 / SUM(r.transactions)",
+    }),
+    "customers": Measure("COUNT(DISTINCT s.customer_id)", {CUSTOMER: "COUNT(DISTINCT r.customer_id)"}),
+}
+
+# Rollups in order of preference (smallest first)
+ROLLUP_PREFERENCE = [CUSTOMER, STORE, CAMPAIGN, DAILY]
+
+# Number of query results kept in the cache
+DEFAULT_CACHE_SIZE = 128
+
+ALIAS_PATTERN = re.compile(r"\b([a-z])\.")
+
+
+###################################################################
+# Query planning
+###################################################################
+def normalize_query(dimensions: List[str], measures: List[str], filters: Optional[dict] = None,
+                    date_range: Optional[tuple] = None) -> tuple:
+    """
+    Validate a query and put it in a canonical, hashable form.
+
+    Args:
+        dimensions (list): Level names to group by, in output order.
+        measures (list): Measure names to aggregate, in output order.
+        filters (dict, optional): Level name -> value or list of values to keep.
+        date_range (tuple, optional): Inclusive (first, last) ISO sale dates to keep.
+
+    Returns:
+        tuple: (dimensions, measures, filters, date_range) with filters as a sorted tuple of (level, values).
+
+    Raises:
+        ValueError: If a level or measure is not declared.
+    """
+    filters = filters or {}
+    unknown = [name for name in list(dimensions) + list(filters) if name not in LEVELS]
+    unknown += [name for name in measures if name not in MEASURES]
+    if unknown:
+        raise ValueError(f"Unknown dimension level(s) or measure(s): {', '.join(unknown)}")
+    if not measures:
+        raise ValueError("A cube query needs at least one measure.")
+    normalized_filters = []
+    for level, values in sorted(filters.items()):
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        normalized_filters.append((level, tuple(sorted(values, key=str))))
+    if date_range is not None:
+        date_range = tuple(str(bound) for bound in date_range)
+        if len(date_range) != 2:
+            raise ValueError("date_range must be a (first, last) pair of ISO dates.")
+    return tuple(dimensions), tuple(measures), tuple(normalized_filters), date_range
+
+
+def partition_bounds(query: tuple) -> Optional[dict]:
+    """
+    Translate the date predicates of a query into dwbuilder.prune_partitions arguments.
+
+    Returns:
+        dict: lower, upper and partition_keys, or None if the query has no date predicate.
+    """
+    _, _, filters, date_range = query
+    lowers, uppers, partition_keys = [], [], None
+    for level, values in filters:
+        if level in ("date", "month"):
+            months = {str(value)[:7] for value in values}
+            partition_keys = months if partition_keys is None else partition_keys & months
+        elif level == "year":
+            lowers.append(f"{min(values)}-01-01")
+            uppers.append(f"{max(values)}-12-31")
+    if date_range is not None:
+        lowers.append(date_range[0])
+        uppers.append(date_range[1])
+    if partition_keys is None and not lowers:
+        return None
+    return {"lower": max(lowers, default=None), "upper": min(uppers, default=None), "partition_keys": partition_keys}
+
+
+def choose_source(query: tuple, usable_rollups: List[str]) -> str:
+    """Pick the first usable rollup that can answer every part of the query, else the fact table."""
+    dimensions, measures, filters, date_range = query
+    levels = set(dimensions) | {level for level, _ in filters} | ({"date"} if date_range else set())
+    for rollup in ROLLUP_PREFERENCE:
+        if rollup in usable_rollups \
+                and all(rollup in LEVELS[level].rollups for level in levels) \
+                and all(rollup in MEASURES[measure].rollups for measure in measures):
+            return rollup
+    return FACT_TABLE
+
+
+def build_sql(query: tuple, source: str, fact_source: Optional[str] = None) -> tuple:
+    """
+    Generate grouped SQL for a normalized query against the fact table or a rollup.
+
+    Only the dimension tables referenced by the chosen expressions are joined.
+
+    Args:
+        query (tuple): Output of normalize_query.
+        source (str): FACT_TABLE or a rollup table name.
+        fact_source (str, optional): SELECT over the fact rows to read instead of the whole
+                                     table, e.g. its pruned partitions (see SalesCube.fact_source).
+
+    Returns:
+        tuple: (sql, params)
+    """
+    dimensions, measures, filters, date_range = query
+    on_fact = source == FACT_TABLE
+    alias = "s" if on_fact else "r"
+
+    def level_sql(level: str) -> str:
+        return LEVELS[level].fact if on_fact else LEVELS[level].rollups[source]
+
+    def measure_sql(measure: str) -> str:
+        return MEASURES[measure].fact if on_fact else MEASURES[measure].rollups[source]
+
+    select = [f"{level_sql(level)} AS {level}" for level in dimensions]
+    select += [f"{measure_sql(measure)} AS {measure}" for measure in measures]
+    where, params = [], []
+    for level, values in filters:
+        where.append(f"{level_sql(level)} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    if date_range is not None and on_fact:
+        # An integer range on the indexed date key
+        where.append("s.sale_date_key BETWEEN ? AND ?")
+        params.extend(int(bound.replace("-", "")[:8]) for bound in date_range)
+    elif date_range is not None:
+        where.append(f"{level_sql('date')} BETWEEN ? AND ?")
+        params.extend(date_range)
+
+    used_aliases = set(ALIAS_PATTERN.findall(" ".join(select + where)))
+    joins = [f"LEFT JOIN {table} {join_alias} ON {condition.format(alias=alias)}"
+             for join_alias, (table, condition) in DIMENSION_JOINS.items() if join_alias in used_aliases]
+
+    table = source
+    if on_fact and fact_source is not None:
+        table = f"({fact_source})"
+    sql = f"SELECT {', '.join(select)} FROM {table} {alias}"
+    if joins:
+        sql += " " + " ".join(joins)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if dimensions:
+        positions = ", ".join(str(i) for i in range(1, len(dimensions) + 1))
+        sql += f" GROUP BY {positions} ORDER BY {positions}"
+    return sql, params
+
+
+###################################################################
+# Cube
+###################################################################
+class SalesCube:
+    """
+    Cached slice/dice/drill-down queries over the sales star schema.
+
+    Args:
+        database (str or sqlite3.Connection): Path to the warehouse, or an open connection.
+        cache_size (int): Number of query results to keep. 0 disables caching.
+    """
+
+    def __init__(self, database: Union[str, sqlite3.Connection], cache_size: int = DEFAULT_CACHE_SIZE):
+        if isinstance(database, sqlite3.Connection):
+            self.connection = database
+            self._owns_connection = False
+        else:
+            self.connection = dwb.connect_dw(str(database), profile="serve")
+            self._owns_connection = True
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def usable_rollups(self) -> List[str]:
+        """Rollups that have been built and have no pending refresh from a later load."""
+        versions = dwb.table_versions(self.connection) or {}
+        try:
+            pending = self.connection.execute("SELECT EXISTS (SELECT 1 FROM etl_dirty_keys)").fetchone()[0]
+        except sqlite3.OperationalError:
+            return []
+        return [] if pending else [rollup for rollup in ROLLUP_PREFERENCE if rollup in versions]
+
+    def fact_source(self, query: tuple) -> tuple:
+        """
+        Find the fact partitions a normalized query can match.
+
+        Returns:
+            tuple: (partitions, SELECT over them with encoded columns decoded),
+                   or (None, None) to read the whole fact table.
+        """
+        bounds = partition_bounds(query)
+        partitions = None if bounds is None else dwb.prune_partitions(self.connection, FACT_TABLE, **bounds)
+        if partitions is None:
+            return None, None
+        if not partitions:
+            # Nothing can match: the fact table's columns with no rows
+            return partitions, f"SELECT * FROM {FACT_TABLE} WHERE 0"
+        return partitions, dwb.table_select_sql(self.connection, FACT_TABLE, partitions)
+
+    def plan(self, dimensions: List[str], measures: List[str], filters: Optional[dict] = None,
+             date_range: Optional[tuple] = None) -> dict:
+        """
+        Show how a query would be answered without running it.
+
+        Returns:
+            dict: 'source' table, the fact 'partitions' read (None for all), generated 'sql' and its 'params'.
+        """
+        query = normalize_query(dimensions, measures, filters, date_range)
+        source = choose_source(query, self.usable_rollups())
+        partitions, fact_source = self.fact_source(query) if source == FACT_TABLE else (None, None)
+        sql, params = build_sql(query, source, fact_source)
+        return {"source": source, "partitions": partitions, "sql": sql, "params": params}
+
+    def query(self, dimensions: List[str], measures: List[str], filters: Optional[dict] = None,
+              date_range: Optional[tuple] = None) -> pd.DataFrame:
+        """
+        Aggregate measures grouped by dimension levels, optionally filtered (slice/dice).
+        Drill down by adding a finer level, e.g. ["region"] -> ["region", "store"].
+
+        Args:
+            dimensions (list): Level names to group by, e.g. ["region", "month"]. Empty for a grand total.
+            measures (list): Measure names, e.g. ["sale_amount", "transactions", "sale_profit"].
+            filters (dict, optional): Level name -> value or list of values, e.g. {"category": "Electronics"}.
+            date_range (tuple, optional): Inclusive (first, last) ISO sale dates, e.g. ("2024-03-01", "2024-05-31").
+
+        Returns:
+            pd.DataFrame: One row per group, with a column per level and measure.
+
+        Raises:
+            ValueError: If a level or measure is not declared.
+        """
+        query = normalize_query(dimensions, measures, filters, date_range)
+        versions = dwb.table_versions(self.connection)
+        usable = self.usable_rollups()
+        source = choose_source(query, usable)
+        # Cached results depend on the versions of every table a query can read
+        key = None if versions is None else (query, source, tuple(sorted(versions.items())))
+
+        if key is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key].copy()
+
+        self.misses += 1
+        _, fact_source = self.fact_source(query) if source == FACT_TABLE else (None, None)
+        sql, params = build_sql(query, source, fact_source)
+        try:
+            result = pd.read_sql_query(sql, self.connection, params=params)
+        except (sqlite3.Error, pd.errors.DatabaseError) as e:
+            logger.error(f"Cube query failed on {source}: {e}")
+            raise
+        logger.info(f"Cube query answered from {source}: {len(result)} row(s)")
+
+        if key is not None and self.cache_size > 0:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return result.copy()
+        return result
+
+    def cache_info(self) -> dict:
+        """Return cache hits, misses and current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "max_size": self.cache_size}
+
+    def clear_cache(self) -> None:
+        """Drop every cached result."""
+        self._cache.clear()
+
+    def close(self) -> None:
+        """Close the connection if the cube opened it."""
+        if self._owns_connection:
+            self.connection.close()
+
+    def __enter__(self) -> "SalesCube":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
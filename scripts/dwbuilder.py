@@ -1,8 +1,21 @@
+import numpy as np
 import pandas as pd
 import sqlite3
 import sys
 import os
 import re
+import time
+import itertools
+import hashlib
+import functools
+import json
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Optional
+
+try:
+    import resource  # Unix only; used for the peak-RSS load report
+except ImportError:
+    resource = None
 
 
 # Import local modules
@@ -13,15 +26,251 @@ sys.path.append(parent_dir)
  
 # Local Imports
 from utils.logger import logger
+from utils.date_parsing import parse_dates
+from utils.validation import RULE_COLUMN, quarantine_file_path
+
+###################################################################
+# Constants
+###################################################################
+# Named PRAGMA profiles for warehouse connections, applied in order (journal_mode first).
+# "bulk_load" trades durability for speed while a re-runnable load is in progress.
+# "serve" keeps WAL so BI readers (e.g. the ODBC/PowerBI DSN) are not blocked by a writer.
+CONNECTION_PROFILES = {
+    "bulk_load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,  # negative values are KiB, i.e. 256 MB of page cache
+        "mmap_size": 1073741824,  # 1 GB
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,  # parallel loads take turns holding the write lock
+    },
+    "serve": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,  # 64 MB
+        "mmap_size": 268435456,  # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,  # milliseconds to wait for the writer's lock
+    },
+}
+
+# Columns whose loaded values mark rollup partitions as needing a refresh, per table (UPDATE TO CUSTOMIZE).
+# An empty list means any load into the table invalidates every rollup (e.g. a changed unit_price).
+CHANGE_TRACKING = {
+    "sales": ["sale_date", "customer_id"],
+    "customers": [],
+    "products": [],
+}
+
+# Marker recorded in etl_dirty_keys when every rollup partition must be rebuilt
+FULL_REFRESH = "*"
+
+# Materialized rollups maintained by refresh_rollups(): table -> (partition column, SELECT of its rows).
+# The SELECT columns follow the rollup table's column order in schema.sql; {where} limits the
+# sales rows to the partitions being refreshed. Quantity and profit are the stored sales columns
+# computed at load time (see sales_derived_columns).
+ROLLUPS = {
+    "rollup_daily_sales": ("sale_date", """
+        SELECT s.sale_date, s.store_id, s.product_id, c.region,
+               COUNT(*), SUM(s.sale_amount), SUM(s.quantity), SUM(s.sale_profit)
+        FROM sales s
+        LEFT JOIN customers c ON c.customer_id = s.customer_id
+        {where}
+        GROUP BY s.sale_date, s.store_id, s.product_id, c.region"""),
+    "rollup_store_daily": ("sale_date", """
+        SELECT s.sale_date, s.store_id, COUNT(*), SUM(s.sale_amount), SUM(s.sale_profit)
+        FROM sales s
+        {where}
+        GROUP BY s.sale_date, s.store_id"""),
+    "rollup_campaign_daily": ("sale_date", """
+        SELECT s.sale_date, s.campaign_id, c.region, s.store_id,
+               COUNT(*), SUM(s.sale_amount), SUM(s.sale_profit)
+        FROM sales s
+        LEFT JOIN customers c ON c.customer_id = s.customer_id
+        {where}
+        GROUP BY s.sale_date, s.campaign_id, c.region, s.store_id"""),
+    "rollup_customer_value": ("customer_id", """
+        SELECT s.customer_id, c.region,
+               COUNT(*), SUM(s.sale_amount), SUM(s.quantity), SUM(s.sale_profit),
+               MIN(s.sale_date), MAX(s.sale_date)
+        FROM sales s
+        LEFT JOIN customers c ON c.customer_id = s.customer_id
+        {where}
+        GROUP BY s.customer_id, c.region
+        HAVING s.customer_id IS NOT NULL"""),
+}
+
+# SQL expressions that fill a column added to a table that already holds rows: (table, column) -> expression
+# over the stored row, where {table} is the storage table being updated. Columns without one stay NULL
+# until rows are reloaded. (UPDATE TO CUSTOMIZE)
+BACKFILLS = {
+    ("products", "profit_margin"): "unit_price - wholesale_price",
+    ("sales", "unit_price"): "(SELECT p.unit_price FROM products p WHERE p.product_id = {table}.product_id)",
+    ("sales", "profit_margin"): "(SELECT p.unit_price - p.wholesale_price FROM products p WHERE p.product_id = {table}.product_id)",
+    ("sales", "quantity"): "sale_amount / NULLIF(unit_price, 0)",
+    ("sales", "sale_profit"): "quantity * profit_margin",
+    ("sales", "sale_date_key"): "CAST(strftime('%Y%m%d', sale_date) AS INTEGER)",
+    ("customers", "join_date_key"): "CAST(strftime('%Y%m%d', join_date) AS INTEGER)",
+    # The ISO year is the year of the week's Thursday ('weekday 4' moves forward to the next Thursday)
+    ("dim_date", "iso_year"): "CAST(strftime('%Y', full_date, '-3 days', 'weekday 4') AS INTEGER)",
+}
+
+# Fact tables that partition_by_month() splits into one table per month, behind a UNION ALL
+# view under the original name: table -> ISO date column the rows are routed on (UPDATE TO CUSTOMIZE)
+PARTITIONED_TABLES = {
+    "sales": "sale_date",
+}
+
+# Date columns stored with an integer YYYYMMDD key joining dim_date: table -> {date column: key column}
+# (UPDATE TO CUSTOMIZE)
+DATE_KEYS = {
+    "sales": {"sale_date": "sale_date_key"},
+    "customers": {"join_date": "join_date_key"},
+}
+
+# First month of the fiscal year in dim_date (1 makes the fiscal year the calendar year) (UPDATE TO CUSTOMIZE)
+FISCAL_YEAR_START_MONTH = 7
+
+# Suffix of the table holding a partitioned table's undated rows; it is also the template
+# (columns, keys and indexes) every monthly partition is created from
+UNDATED_SUFFIX = "_undated"
+
+# Low-cardinality text columns that dictionary_encode_table() stores as integer codes into
+# dict_<column> tables, behind a view that decodes them: table -> columns (UPDATE TO CUSTOMIZE)
+ENCODED_COLUMNS = {
+    "customers": ["region"],
+    "products": ["category", "supplier"],
+    "sales": ["payment_type"],
+}
+
+# Suffix of an encoded (unpartitioned) table's stored table, and prefix of the dictionary tables
+ENCODED_SUFFIX = "_encoded"
+DICTIONARY_PREFIX = "dict_"
+
+# Foreign keys checked in memory on every loaded chunk, before it is written:
+# table -> {column: parent table}; the parent's primary key is read once per load (UPDATE TO CUSTOMIZE)
+REFERENCES = {
+    "sales": {"customer_id": "customers", "product_id": "products", "store_id": "stores",
+              "campaign_id": "campaigns"},
+}
+
+# What file_to_dw does with rows whose key is missing from the parent table (orphans) (UPDATE TO CUSTOMIZE):
+# "report" loads them and logs the count, "quarantine" writes them to data/quarantine instead of loading them,
+# "unknown_member" adds a placeholder parent row (UNKNOWN_MEMBERS) for each missing key, "ignore" skips the check
+ORPHAN_POLICY = "report"
+ORPHAN_POLICIES = ("report", "quarantine", "unknown_member", "ignore")
+
+# Attribute values of the placeholder rows added by the "unknown_member" policy: table -> {column: value}
+UNKNOWN_MEMBERS = {
+    "customers": {"name": "Unknown", "region": "Unknown"},
+    "products": {"product_name": "Unknown", "category": "Unknown", "supplier": "Unknown"},
+    "stores": {"store_name": "Unknown", "region": "Unknown"},
+    "campaigns": {"campaign_name": "Unknown"},
+}
+
+# Whether file_to_dw adds the columns a source file has and its table lacks (a recorded migration)
+# instead of dropping them from the load. Off unless the EVOLVE_SCHEMA environment variable is set to 1,
+# so a stray or misspelled column in a source file cannot change the warehouse schema (UPDATE TO CUSTOMIZE)
+EVOLVE_SCHEMA = os.environ.get("EVOLVE_SCHEMA", "0").strip().lower() in ("1", "true", "yes")
+
+# Index statements, so schema files can declare indexes on a table that is now a view
+INDEX_TARGET_PATTERN = re.compile(r"(CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?\w+\s+ON\s+)(\w+)",
+                                  re.IGNORECASE)
 
 ###################################################################
 # Functions
 ###################################################################
+# Function to apply a named PRAGMA profile to an open connection
+def apply_connection_profile(connection: sqlite3.Connection, profile: str) -> None:
+    """
+    Apply one of the CONNECTION_PROFILES to an open SQLite connection.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        profile (str): Name of the profile, e.g. "bulk_load" or "serve".
+
+    Raises:
+        ValueError: If the profile name is not defined in CONNECTION_PROFILES.
+    """
+    if profile not in CONNECTION_PROFILES:
+        raise ValueError(f"Unknown connection profile '{profile}'. Expected one of: {', '.join(CONNECTION_PROFILES)}")
+    # journal_mode cannot change inside an open transaction
+    connection.commit()
+    for pragma, value in CONNECTION_PROFILES[profile].items():
+        connection.execute(f"PRAGMA {pragma} = {value}").fetchall()
+    logger.info(f"Applied '{profile}' connection profile")
+
+# Function to open a warehouse connection with a PRAGMA profile
+def connect_dw(db_path: str, profile: str = "serve") -> sqlite3.Connection:
+    """
+    Open a connection to the data warehouse and apply a PRAGMA profile.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        profile (str): Name of the profile in CONNECTION_PROFILES. Defaults to "serve".
+
+    Returns:
+        sqlite3.Connection: The tuned connection.
+    """
+    connection = sqlite3.connect(str(db_path))
+    apply_connection_profile(connection, profile)
+    return connection
+
+@contextmanager
+def timed_phase(name: str, timings: Optional[dict] = None) -> Iterator[None]:
+    """
+    Log how long the wrapped block takes, optionally recording it in a timings dict.
+
+    Args:
+        name (str): Name of the phase for the log message.
+        timings (dict, optional): Dictionary to store the elapsed seconds under `name`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if timings is not None:
+            timings[name] = elapsed
+        logger.info(f"Phase '{name}' took {elapsed:.2f}s")
+
+@contextmanager
+def bulk_load_session(connection: sqlite3.Connection, serve_profile: str = "serve") -> Iterator[dict]:
+    """
+    Switch a connection to the "bulk_load" profile for the wrapped loads, then checkpoint
+    the WAL and switch back to the serving profile. Each phase is timed and logged.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        serve_profile (str): Profile to restore once loading finishes. Defaults to "serve".
+
+    Yields:
+        dict: Phase name -> elapsed seconds, filled in as the session runs.
+    """
+    timings = {}
+    with timed_phase("switch to bulk_load", timings):
+        apply_connection_profile(connection, "bulk_load")
+    try:
+        with timed_phase("load", timings):
+            yield timings
+    finally:
+        with timed_phase("checkpoint", timings):
+            connection.commit()
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        with timed_phase(f"switch to {serve_profile}", timings):
+            apply_connection_profile(connection, serve_profile)
+
 # Function to run SQL files, e.g., schema.sql, data.sql
 def execute_sql_file(connection, file_path) -> None:
     """
     Executes a SQL file using the provided SQLite connection.
 
+    Indexes declared on a table that partition_by_month() or dictionary_encode_table() has
+    replaced with a view are created on its storage table instead (for a partitioned table
+    the template, and from there on every monthly partition). Columns the file declares for
+    an existing table are added first (see migrate_to_schema), so an older warehouse is
+    upgraded in place instead of being rebuilt.
+
     Args:
         connection (sqlite3.Connection): SQLite connection object.
         file_path (str): Path to the SQL file to be executed.
@@ -31,10 +280,27 @@ def execute_sql_file(connection, file_path) -> None:
         with open(file_path, 'r') as file:
             # Read the SQL file into a string
             sql_script: str = file.read()
+        added = migrate_to_schema(connection, sql_script, str(file_path))
+        partitioned = partitioned_tables(connection)
+        views = set(partitioned) | set(encoded_columns(connection))
+        if views:
+            sql_script = INDEX_TARGET_PATTERN.sub(
+                lambda match: match.group(1) + (storage_tables(connection, match.group(2))[0]
+                                                if match.group(2) in views else match.group(2)),
+                sql_script,
+            )
         with connection:
             # Use the connection as a context manager to execute the SQL script
             connection.executescript(sql_script)
             logger.info(f"Executed: {file_path}")
+        for table_name in partitioned:
+            sync_partition_indexes(connection, table_name)
+        # Backfilled date keys need their days in dim_date, which the script may have just created
+        for table_name, columns in added.items():
+            for date_column, key_column in DATE_KEYS.get(table_name, {}).items():
+                if key_column in columns:
+                    dates = pd.read_sql_query(f"SELECT DISTINCT {date_column} FROM {table_name}", connection)[date_column]
+                    extend_date_dimension(connection, parse_dates(dates, source=table_name, errors="coerce"))
     except Exception as e:
         logger.error(f"Failed to execute {file_path}: {e}")
         raise
@@ -57,6 +323,228 @@ def delete_existing_records(cursor: sqlite3.Cursor, table_name: str, should_dele
             logger.error(f"Error deleting from table {table_name}: {e}")
             raise
 
+# Function to drop the secondary indexes of a table, returning their definitions
+def drop_secondary_indexes(connection: sqlite3.Connection, table_name: str) -> list:
+    """
+    Record and drop the explicitly created indexes on a table.
+
+    Automatic indexes (PRIMARY KEY / UNIQUE constraints) have no SQL in sqlite_master
+    and are left alone.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table whose indexes are dropped.
+
+    Returns:
+        list: (index_name, create_sql) tuples needed to rebuild the indexes.
+    """
+    indexes = connection.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table_name,),
+    ).fetchall()
+    with connection:
+        for index_name, _ in indexes:
+            connection.execute(f"DROP INDEX IF EXISTS {index_name}")
+    if indexes:
+        logger.info(f"Dropped {len(indexes)} index(es) on {table_name}: {', '.join(name for name, _ in indexes)}")
+    return indexes
+
+# Function to (re)create indexes from their recorded definitions
+def create_indexes(connection: sqlite3.Connection, indexes: list) -> None:
+    """
+    Create indexes from (index_name, create_sql) tuples, e.g. those returned by drop_secondary_indexes.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        indexes (list): (index_name, create_sql) tuples.
+    """
+    with connection:
+        for index_name, create_sql in indexes:
+            connection.execute(create_sql)
+            logger.info(f"Built index {index_name}")
+
+# Function to report rows that break a table's foreign keys
+def check_foreign_keys(connection: sqlite3.Connection, table_name: str) -> list:
+    """
+    Run PRAGMA foreign_key_check on a table.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table to check.
+
+    Returns:
+        list: (table, rowid, parent_table, fk_index) tuples, one per violating row.
+    """
+    violations = connection.execute(f"PRAGMA foreign_key_check({table_name})").fetchall()
+    if violations:
+        parents = sorted({parent for _, _, parent, _ in violations})
+        logger.warning(f"{len(violations)} row(s) in {table_name} violate foreign keys to: {', '.join(parents)}")
+    return violations
+
+@contextmanager
+def deferred_indexes(connection: sqlite3.Connection, table_name: str) -> Iterator[dict]:
+    """
+    Drop a table's secondary indexes and disable foreign key enforcement for the wrapped load,
+    then rebuild the indexes (each in one sorted pass) and run a single foreign key check.
+    For a partitioned table the monthly partitions' indexes are dropped (the template keeps its
+    own) and afterwards every partition, including ones the load created, gets its indexes.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table being loaded.
+
+    Yields:
+        dict: Holds "indexes" (the rebuilt definitions) and, after the block, "fk_violations".
+    """
+    tables = storage_tables(connection, table_name)
+    partitioned = table_name in partitioned_tables(connection)
+    # PRAGMA foreign_keys is a no-op inside a transaction
+    connection.commit()
+    foreign_keys_enabled = connection.execute("PRAGMA foreign_keys").fetchone()[0]
+    connection.execute("PRAGMA foreign_keys = OFF")
+    dropped = [index for table in (tables[1:] if partitioned else tables)
+               for index in drop_secondary_indexes(connection, table)]
+    state = {"indexes": dropped, "fk_violations": []}
+    try:
+        yield state
+    finally:
+        connection.commit()
+        with timed_phase(f"build indexes on {table_name}"):
+            if partitioned:
+                state["indexes"] = sync_partition_indexes(connection, table_name)
+            else:
+                create_indexes(connection, state["indexes"])
+        connection.execute(f"PRAGMA foreign_keys = {foreign_keys_enabled}")
+    state["fk_violations"] = [violation for table in storage_tables(connection, table_name)
+                              for violation in check_foreign_keys(connection, table)]
+
+# Function to look up the primary key columns of a table
+def primary_key_columns(connection: sqlite3.Connection, table_name: str) -> list:
+    """
+    Get the primary key columns of a table in key order.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table.
+
+    Returns:
+        list: Primary key column names (empty if the table has none).
+    """
+    table_info = connection.execute(f"PRAGMA table_info({table_name})").fetchall()
+    return [row[1] for row in sorted(table_info, key=lambda row: row[5]) if row[5] > 0]
+
+# Function to fingerprint a source file for incremental loads
+def file_content_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 of a file, reading it in blocks.
+
+    Args:
+        file_path (str): Path to the file.
+        block_size (int): Bytes read per block. Defaults to 1 MB.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Function to read the recorded load state of a source file
+def get_load_state(connection: sqlite3.Connection, file_path: str, table_name: str) -> Optional[dict]:
+    """
+    Get the content hash and row count recorded by the last incremental load of a file.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        file_path (str): Path to the source file.
+        table_name (str): Name of the table the file was loaded into.
+
+    Returns:
+        dict: The recorded state, or None if the file has never been loaded.
+    """
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS etl_load_state (
+            source_path TEXT,
+            table_name TEXT,
+            content_hash TEXT,
+            rows_loaded INTEGER,
+            loaded_at TEXT,
+            PRIMARY KEY (source_path, table_name)
+        )"""
+    )
+    row = connection.execute(
+        "SELECT content_hash, rows_loaded, loaded_at FROM etl_load_state "
+        "WHERE source_path = ? AND table_name = ?",
+        (os.path.abspath(file_path), table_name),
+    ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("content_hash", "rows_loaded", "loaded_at"), row))
+
+# Function to record the load state of a source file
+def record_load_state(connection: sqlite3.Connection, file_path: str, table_name: str, content_hash: str,
+                      rows_loaded: int) -> None:
+    """
+    Record the content hash and row count of a successfully loaded file.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        file_path (str): Path to the source file.
+        table_name (str): Name of the table the file was loaded into.
+        content_hash (str): SHA-256 of the file contents.
+        rows_loaded (int): Number of rows read from the file.
+    """
+    with connection:
+        connection.execute(
+            "INSERT INTO etl_load_state (source_path, table_name, content_hash, rows_loaded, loaded_at) "
+            "VALUES (?, ?, ?, ?, datetime('now')) "
+            "ON CONFLICT (source_path, table_name) DO UPDATE SET content_hash = excluded.content_hash, "
+            "rows_loaded = excluded.rows_loaded, loaded_at = excluded.loaded_at",
+            (os.path.abspath(file_path), table_name, content_hash, rows_loaded),
+        )
+
+# Function to bump a table's version after a load changed it (cache invalidation for readers)
+def bump_table_version(connection: sqlite3.Connection, table_name: str) -> None:
+    """
+    Increment the version of a table in dw_table_versions. Readers that cache query
+    results (e.g. dw_cube.SalesCube) key them on these versions, so a bump invalidates them.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table that changed.
+    """
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS dw_table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER,
+            changed_at TEXT
+        )"""
+    )
+    with connection:
+        connection.execute(
+            "INSERT INTO dw_table_versions (table_name, version, changed_at) VALUES (?, 1, datetime('now')) "
+            "ON CONFLICT (table_name) DO UPDATE SET version = version + 1, changed_at = excluded.changed_at",
+            (table_name,),
+        )
+
+# Function to read the current table versions
+def table_versions(connection: sqlite3.Connection) -> Optional[dict]:
+    """
+    Get the version of every table that has been changed by a load.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+
+    Returns:
+        dict: Table name -> version, or None if the database has no dw_table_versions table.
+    """
+    try:
+        return dict(connection.execute("SELECT table_name, version FROM dw_table_versions"))
+    except sqlite3.OperationalError:
+        return None
+
 def load_csv(file_path: str) -> pd.DataFrame:
     """
     Load a CSV file into a DataFrame.
@@ -75,37 +563,304 @@ def load_csv(file_path: str) -> pd.DataFrame:
         logger.error(f"Failed to load CSV file {file_path}: {e}")
         raise
 
+def load_csv_chunks(file_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV file as a sequence of fixed-size DataFrames.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        chunksize (int): Number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: The next chunk of rows from the file.
+    """
+    try:
+        with pd.read_csv(file_path, chunksize=chunksize) as reader:
+            logger.info(f"Streaming CSV file: {file_path} ({chunksize} rows per chunk)")
+            for chunk in reader:
+                yield chunk
+    except Exception as e:
+        logger.error(f"Failed to stream CSV file {file_path}: {e}")
+        raise
+
+# File extensions understood by load_file / file_to_dw
+CSV_EXTENSIONS = (".csv",)
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".feather", ".arrow", ".ipc")
+
+def import_pyarrow():
+    """
+    Import the optional pyarrow package used for Parquet and Arrow IPC/Feather files.
+
+    Returns:
+        tuple: The pyarrow and pyarrow.parquet modules.
+
+    Raises:
+        ImportError: If the optional pyarrow package is not installed.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet or Feather files requires pyarrow (pip install pyarrow).")
+    return pa, pq
+
+def open_arrow_table(file_path: str):
+    """
+    Open a Parquet or Arrow IPC/Feather file as a pyarrow Table, memory-mapping the file.
+
+    Uncompressed Feather files are mapped without copying; Parquet is decoded column by column.
+
+    Args:
+        file_path (str): Path to the Parquet or Feather file.
+
+    Returns:
+        pyarrow.Table: The file contents.
+
+    Raises:
+        ImportError: If the optional pyarrow package is not installed.
+    """
+    pa, pq = import_pyarrow()
+    if file_path.lower().endswith(PARQUET_EXTENSIONS):
+        return pq.read_table(file_path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(file_path, "r")).read_all()
+
+def iter_arrow_batches(file_path: str, chunksize: int) -> Iterator:
+    """
+    Read a Parquet or Arrow IPC/Feather file as record batches of at most chunksize rows.
+
+    Only the batch being read is decoded: Parquet is read with ParquetFile.iter_batches and
+    Feather one stored record batch at a time (sliced without copying), never the whole file.
+
+    Args:
+        file_path (str): Path to the Parquet or Feather file.
+        chunksize (int): Maximum number of rows per batch.
+
+    Yields:
+        pyarrow.RecordBatch: The next batch of rows from the file.
+
+    Raises:
+        ImportError: If the optional pyarrow package is not installed.
+    """
+    pa, pq = import_pyarrow()
+    if file_path.lower().endswith(PARQUET_EXTENSIONS):
+        yield from pq.ParquetFile(file_path, memory_map=True).iter_batches(batch_size=chunksize)
+        return
+    reader = pa.ipc.open_file(pa.memory_map(file_path, "r"))
+    for index in range(reader.num_record_batches):
+        batch = reader.get_batch(index)
+        for offset in range(0, batch.num_rows, chunksize):
+            yield batch.slice(offset, chunksize)
+
+def load_file(file_path: str) -> pd.DataFrame:
+    """
+    Load a CSV, Parquet or Arrow IPC/Feather file into a DataFrame based on its extension.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the loaded data.
+    """
+    if file_path.lower().endswith(CSV_EXTENSIONS):
+        return load_csv(file_path)
+    try:
+        df = open_arrow_table(file_path).to_pandas()
+        logger.info(f"Loaded columnar file: {file_path}")
+        return df
+    except Exception as e:
+        logger.error(f"Failed to load file {file_path}: {e}")
+        raise
+
+def load_file_chunks(file_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV, Parquet or Arrow IPC/Feather file as a sequence of fixed-size DataFrames.
+
+    Columnar files keep their dtypes (datetimes, categoricals), so nothing is re-parsed, and are
+    decoded one batch at a time, so peak memory depends on the chunk size as for CSV files.
+
+    Args:
+        file_path (str): Path to the file.
+        chunksize (int): Number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: The next chunk of rows from the file.
+    """
+    if file_path.lower().endswith(CSV_EXTENSIONS):
+        yield from load_csv_chunks(file_path, chunksize)
+        return
+    try:
+        logger.info(f"Streaming columnar file: {file_path} ({chunksize} rows per chunk)")
+        for batch in iter_arrow_batches(file_path, chunksize):
+            yield batch.to_pandas()
+    except Exception as e:
+        logger.error(f"Failed to stream file {file_path}: {e}")
+        raise
+
+def get_peak_rss_mb() -> Optional[float]:
+    """
+    Get the peak resident set size of the current process.
+
+    Returns:
+        float: Peak RSS in megabytes, or None if it cannot be measured on this platform.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return None
+
+# Precompiled patterns used to turn source headers into snake_case SQL column names
+CAMEL_WORD_PATTERN = re.compile('(.)([A-Z][a-z]+)')  # Insert underscore before capitalized words
+CAMEL_BOUNDARY_PATTERN = re.compile('([a-z0-9])([A-Z])')  # Handle consecutive uppercase letters
+NON_SQL_CHAR_PATTERN = re.compile(r'[^a-z0-9_]')  # Remaining special characters
+
+@functools.lru_cache(maxsize=256)
+def sql_column_names(headers: tuple) -> tuple:
+    """
+    Map a tuple of source headers to snake_case SQL column names.
+
+    Results are memoized on the raw header tuple, so streaming and multi-file loads over the
+    same headers pay the renaming cost once.
+
+    Args:
+        headers (tuple): Raw column headers.
+
+    Returns:
+        tuple: SQL column names in the same order.
+
+    Raises:
+        ValueError: If a header normalizes to an empty name or two headers normalize to the same name.
+    """
+    new_columns = []
+    for col in headers:
+        new_col = CAMEL_WORD_PATTERN.sub(r'\1_\2', str(col))
+        new_col = CAMEL_BOUNDARY_PATTERN.sub(r'\1_\2', new_col)
+        new_col = NON_SQL_CHAR_PATTERN.sub('', new_col.lower())
+        if not new_col:
+            raise ValueError(f"Column '{col}' has no characters left after conversion to SQL format.")
+        new_columns.append(new_col)
+
+    sources = {}
+    for col, new_col in zip(headers, new_columns):
+        sources.setdefault(new_col, []).append(str(col))
+    collisions = {new_col: cols for new_col, cols in sources.items() if len(cols) > 1}
+    if collisions:
+        details = "; ".join(f"{', '.join(cols)} -> {new_col}" for new_col, cols in collisions.items())
+        raise ValueError(f"Columns collide after conversion to SQL format: {details}")
+    return tuple(new_columns)
+
 # Prepare the DataFrame for SQL insertion by removing uppercase letters and special characters
-#TODO: Implement this function to convert DataFrame column names to lowercase and remove special characters
-def convert_to_sql_format(df: pd.DataFrame) -> str:
+def convert_to_sql_format(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Convert a DataFrame to SQL format for insertion into a database.
+    Convert DataFrame column names to SQL format (snake_case, no special characters) in place.
 
     Args:
         df (pd.DataFrame): DataFrame to convert.
 
     Returns:
-        str: SQL formatted string for insertion.
+        pd.DataFrame: The same DataFrame with renamed columns.
     """
     try:
-        new_columns = []
-        for col in df.columns:
-            # Insert underscore before uppercase letters
-            new_col = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', col)
-            new_col = re.sub('([a-z0-9])([A-Z])', r'\1_\2', new_col) #Handle consecutive uppercase letters
-            new_col = new_col.lower()  # Convert to lowercase
-            new_col = re.sub(r'[^a-z0-9_]', '', new_col)  # Remove remaining special characters
-            new_columns.append(new_col)
-
-        df.columns = new_columns
+        df.columns = sql_column_names(tuple(df.columns))
         logger.info("Converted DataFrame column names to lowercase, adding underscores before uppercase letters, and removed special characters.")
         return df
     except Exception as e:
         logger.error(f"Failed to convert DataFrame column names to SQL format: {e}")
         raise
 
+def column_to_sql_values(series: pd.Series) -> list:
+    """
+    Convert a DataFrame column into a list of values SQLite can bind directly.
+
+    Numbers come out as native int/float, datetimes as ISO strings (date only when every
+    value falls on midnight, matching what to_csv writes) and missing values as None.
+
+    Args:
+        series (pd.Series): Column to convert.
+
+    Returns:
+        list: One bindable value per row.
+    """
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        is_date_only = bool((series.dropna() == series.dropna().dt.normalize()).all())
+        values = series.dt.strftime("%Y-%m-%d" if is_date_only else "%Y-%m-%d %H:%M:%S")
+    elif isinstance(series.dtype, pd.CategoricalDtype):
+        values = series.astype(object)
+    elif pd.api.types.is_bool_dtype(series) and not missing.any():
+        values = series.astype("int64")
+    else:
+        values = series
+
+    if not missing.any():
+        return values.tolist()
+    return [None if is_missing else value for value, is_missing in zip(values.tolist(), missing)]
+
+def build_upsert_clause(table_name: str, columns: list, key_columns: list) -> str:
+    """
+    Build the ON CONFLICT clause that turns an INSERT into an upsert on the key columns.
+
+    Args:
+        table_name (str): Name of the target table.
+        columns (list): Columns being inserted.
+        key_columns (list): Columns of the table's primary key.
+
+    Returns:
+        str: The clause to append to the INSERT statement.
+    """
+    value_columns = [col for col in columns if col not in key_columns]
+    conflict = f" ON CONFLICT ({', '.join(key_columns)})"
+    if not value_columns:
+        return conflict + " DO NOTHING"
+    assignments = ", ".join(f"{col} = excluded.{col}" for col in value_columns)
+    changed = " OR ".join(f"{table_name}.{col} IS NOT excluded.{col}" for col in value_columns)
+    return f"{conflict} DO UPDATE SET {assignments} WHERE {changed}"
+
+# Function to bulk insert a DataFrame with a single prepared INSERT statement
+def bulk_insert(connection: sqlite3.Connection, df: pd.DataFrame, table_name: str,
+                batch_size: Optional[int] = None, upsert_keys: Optional[list] = None) -> int:
+    """
+    Insert every row of a DataFrame with executemany on one parameterized INSERT.
+
+    Rows are built as tuples straight from the column arrays and committed once per batch,
+    or once at the end when no batch size is given. With upsert_keys the statement becomes
+    INSERT ... ON CONFLICT DO UPDATE, and existing rows are only rewritten when a value changed.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        df (pd.DataFrame): DataFrame whose columns all exist in the table.
+        table_name (str): Name of the table to insert into.
+        batch_size (int, optional): Rows per transaction. Defaults to None (one transaction).
+        upsert_keys (list, optional): Conflict target columns (the table's key) for upserts.
+
+    Returns:
+        int: Number of rows inserted or upserted.
+    """
+    columns = list(df.columns)
+    sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    if upsert_keys:
+        sql += build_upsert_clause(table_name, columns, upsert_keys)
+    rows = zip(*(column_to_sql_values(df[col]) for col in columns))
+    # Without a batch size the row iterator is handed to executemany as-is, so no row list is built
+    batches = iter(lambda: list(itertools.islice(rows, batch_size)), []) if batch_size else [rows]
+    cursor = connection.cursor()
+    try:
+        for batch in batches:
+            cursor.executemany(sql, batch)
+            connection.commit()
+    except sqlite3.Error:
+        connection.rollback()
+        raise
+    return len(df)
+
 # Function to load data from DataFrame into the SQLite database
-def load_data_to_dw(connection: sqlite3.Connection, df: pd.DataFrame, table_name: str) -> None:
+def load_data_to_dw(connection: sqlite3.Connection, df: pd.DataFrame, table_name: str,
+                    engine: str = "executemany", batch_size: Optional[int] = None, upsert: bool = False) -> None:
     """
     Load data from a DataFrame into the specified table in the SQLite database.
     Gracefully handles columns that do not exist in the table.
@@ -114,6 +869,9 @@ def load_data_to_dw(connection: sqlite3.Connection, df: pd.DataFrame, table_name
         connection (sqlite3.Connection): SQLite connection object.
         df (pd.DataFrame): DataFrame containing the data to load.
         table_name (str): Name of the table to load data into.
+        engine (str): "executemany" for the native bulk loader or "to_sql" for DataFrame.to_sql.
+        batch_size (int, optional): Rows per transaction for the executemany engine.
+        upsert (bool): Insert new keys and update changed rows instead of plain appends (executemany only).
     """
     try:
         cursor = connection.cursor()
@@ -121,6 +879,8 @@ def load_data_to_dw(connection: sqlite3.Connection, df: pd.DataFrame, table_name
         # Get the existing column names from the table
         cursor.execute(f"PRAGMA table_info({table_name})")
         existing_columns = [row[1] for row in cursor.fetchall()]
+        if not existing_columns:
+            raise sqlite3.OperationalError(f"no such table: {table_name}")
 
         # Identify columns to be filtered out
         columns_to_filter = list(set(df.columns) - set(existing_columns))
@@ -133,7 +893,17 @@ def load_data_to_dw(connection: sqlite3.Connection, df: pd.DataFrame, table_name
             logger.info(f"Columns filtered out for table '{table_name}': {', '.join(columns_to_filter)}")
 
         # Load the filtered data into the table
-        df_filtered.to_sql(table_name, connection, if_exists='append', index=False)
+        if engine == "executemany":
+            upsert_keys = primary_key_columns(connection, table_name) if upsert else None
+            if upsert and not upsert_keys:
+                raise ValueError(f"Table '{table_name}' has no primary key to upsert on.")
+            bulk_insert(connection, df_filtered, table_name, batch_size, upsert_keys)
+        elif engine == "to_sql" and upsert:
+            raise ValueError("Upserts require the 'executemany' engine.")
+        elif engine == "to_sql":
+            df_filtered.to_sql(table_name, connection, if_exists='append', index=False)
+        else:
+            raise ValueError(f"Unknown load engine '{engine}'. Expected 'executemany' or 'to_sql'.")
         logger.info(f"Loaded data into {table_name} table (ignoring non-existent columns)")
 
     except sqlite3.OperationalError as e:
@@ -145,20 +915,1370 @@ def load_data_to_dw(connection: sqlite3.Connection, df: pd.DataFrame, table_name
         logger.error(f"An unexpected error occurred while loading data into {table_name}: {e}")
         raise
     
-def csv_to_dw(file_path: str, connection: sqlite3.Connection, table_name: str, delete_first: bool = False) -> None:
+###################################################################
+# Time-partitioned fact tables
+###################################################################
+# Function to create the tables recording which tables are partitioned and their partitions
+def create_partition_registry(connection: sqlite3.Connection) -> None:
+    """Create dw_partitioned_tables and dw_partitions, maintained by partition_by_month() and the loaders."""
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS dw_partitioned_tables (
+            table_name TEXT PRIMARY KEY,
+            column_name TEXT
+        )"""
+    )
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS dw_partitions (
+            table_name TEXT,
+            partition_key TEXT,  -- YYYY-MM
+            partition_table TEXT,
+            lower_bound TEXT,  -- first day of the month, inclusive
+            upper_bound TEXT,  -- first day of the next month, exclusive
+            PRIMARY KEY (table_name, partition_key)
+        )"""
+    )
+
+# Function to list the partitioned tables of a warehouse
+def partitioned_tables(connection: sqlite3.Connection) -> dict:
     """
-    Load CSV data into the specified table in the SQLite database.
+    Get the tables partition_by_month() has split.
 
     Args:
-        file_path (str): Path to the CSV file.
         connection (sqlite3.Connection): SQLite connection object.
-        table_name (str): Name of the table to load data into.
-        delete_first (bool): Whether to delete existing records in the table before loading. Defaults to True.
+
+    Returns:
+        dict: Table name -> partition date column; empty if nothing is partitioned.
+    """
+    try:
+        return dict(connection.execute("SELECT table_name, column_name FROM dw_partitioned_tables"))
+    except sqlite3.OperationalError:
+        return {}
+
+# Function to list the tables that physically hold a table's rows
+def storage_tables(connection: sqlite3.Connection, table_name: str) -> list:
+    """
+    Get the tables holding a table's rows: the table itself, for a dictionary-encoded table
+    <table>_encoded, or for a partitioned table its undated/template table followed by the
+    monthly partitions in date order.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the (possibly partitioned or encoded) table.
+
+    Returns:
+        list: Table names.
+    """
+    if table_name not in partitioned_tables(connection):
+        return [table_name + ENCODED_SUFFIX] if table_name in encoded_columns(connection) else [table_name]
+    partitions = connection.execute(
+        "SELECT partition_table FROM dw_partitions WHERE table_name = ? ORDER BY partition_key", (table_name,)
+    )
+    return [table_name + UNDATED_SUFFIX] + [row[0] for row in partitions]
+
+# Function to name the first and last day bounds of a month partition
+def month_bounds(partition_key: str) -> tuple:
+    """Return the inclusive lower and exclusive upper ISO date bounds of a YYYY-MM partition."""
+    month = pd.Period(partition_key, freq="M")
+    return f"{month}-01", f"{month + 1}-01"
+
+# Function to derive a partition's CREATE statements from its template table
+def partition_ddl(connection: sqlite3.Connection, table_name: str, partition_table: str) -> tuple:
+    """
+    Build the CREATE TABLE and CREATE INDEX statements of a partition by renaming the ones
+    of the template table, so partitions always share its columns, keys and indexes.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the partitioned table.
+        partition_table (str): Name of the partition.
+
+    Returns:
+        tuple: (create table SQL, list of (index_name, create index SQL)).
+    """
+    template = table_name + UNDATED_SUFFIX
+    suffix = partition_table[len(table_name):]
+    table_sql = connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (template,)
+    ).fetchone()[0]
+    table_sql = re.sub(r'^CREATE TABLE\s+("?)\w+\1', f"CREATE TABLE IF NOT EXISTS {partition_table}", table_sql, count=1)
+    indexes = []
+    for index_name, index_sql in connection.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (template,)
+    ).fetchall():
+        name = index_name + suffix
+        index_sql = re.sub(r'^CREATE (UNIQUE )?INDEX\s+("?)\w+\2\s+ON\s+("?)\w+\3',
+                           lambda match: f"CREATE {match.group(1) or ''}INDEX IF NOT EXISTS {name} ON {partition_table}",
+                           index_sql, count=1)
+        indexes.append((name, index_sql))
+    return table_sql, indexes
+
+# Function to name the stored rows of a table (some of its storage tables) as one FROM source
+def storage_source_sql(connection: sqlite3.Connection, table_name: str, tables: Optional[list] = None) -> str:
+    """Return the single storage table, or a UNION ALL subquery over several, as stored (codes not decoded)."""
+    tables = storage_tables(connection, table_name) if tables is None else tables
+    if len(tables) == 1:
+        return tables[0]
+    return "(" + " UNION ALL ".join(f"SELECT * FROM {table}" for table in tables) + ")"
+
+# Function to build the SELECT that reads a partitioned or encoded table as the original table
+def table_select_sql(connection: sqlite3.Connection, table_name: str, tables: Optional[list] = None) -> str:
+    """
+    Build the SELECT behind a partitioned or encoded table's view: the rows of its storage tables
+    (or the given subset, e.g. pruned partitions) with every encoded column decoded to its text.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table.
+        tables (list, optional): Storage tables to read. Defaults to all of them.
+
+    Returns:
+        str: The SELECT statement, with the original columns in their original order.
+    """
+    source = storage_source_sql(connection, table_name, tables)
+    encoded = encoded_columns(connection).get(table_name, {})
+    if not encoded:
+        return f"SELECT * FROM {source}"
+    template = storage_tables(connection, table_name)[0]
+    columns = [row[1] for row in connection.execute(f"PRAGMA table_info({template})")]
+    select, joins = [], []
+    for column in columns:
+        if column in encoded:
+            alias = f"{column}_dict"
+            select.append(f"{alias}.value AS {column}")
+            joins.append(f"LEFT JOIN {encoded[column]} {alias} ON {alias}.code = t.{column}")
+        else:
+            select.append(f"t.{column}")
+    return f"SELECT {', '.join(select)} FROM {source} t {' '.join(joins)}"
+
+# Function to (re)create the view that keeps a partitioned or encoded table readable under its own name
+def create_table_view(connection: sqlite3.Connection, table_name: str) -> None:
+    """
+    Replace the view named after a partitioned or encoded table with the SELECT from table_select_sql.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table.
+    """
+    connection.execute(f"DROP VIEW IF EXISTS {table_name}")
+    connection.execute(f"CREATE VIEW {table_name} AS {table_select_sql(connection, table_name)}")
+
+# Function to build any template index a partition is missing
+def sync_partition_indexes(connection: sqlite3.Connection, table_name: str) -> list:
+    """
+    Create the template table's indexes on every partition that lacks them (new partitions
+    loaded with deferred indexes, or an index added to the schema file).
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the partitioned table.
+
+    Returns:
+        list: (index_name, create_sql) tuples of the indexes built.
+    """
+    existing = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    missing = [index for partition in storage_tables(connection, table_name)[1:]
+               for index in partition_ddl(connection, table_name, partition)[1] if index[0] not in existing]
+    create_indexes(connection, missing)
+    return missing
+
+# Function to create a month partition on first use
+def ensure_partition(connection: sqlite3.Connection, table_name: str, partition_key: str,
+                     indexes: bool = True, refresh_view: bool = True) -> str:
+    """
+    Get the partition of a table for a month, creating and registering it if needed.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the partitioned table.
+        partition_key (str): The month, as YYYY-MM.
+        indexes (bool): Whether to create a new partition's indexes now rather than after the load.
+        refresh_view (bool): Whether to add a new partition to the view straight away.
+
+    Returns:
+        str: Name of the partition table, e.g. sales_p202401.
+    """
+    partition_table = f"{table_name}_p{partition_key.replace('-', '')}"
+    registered = connection.execute(
+        "SELECT 1 FROM dw_partitions WHERE table_name = ? AND partition_key = ?", (table_name, partition_key)
+    ).fetchone()
+    if registered:
+        return partition_table
+    table_sql, index_ddl = partition_ddl(connection, table_name, partition_table)
+    connection.execute(table_sql)
+    if indexes:
+        for _, index_sql in index_ddl:
+            connection.execute(index_sql)
+    connection.execute("INSERT INTO dw_partitions VALUES (?, ?, ?, ?, ?)",
+                       (table_name, partition_key, partition_table, *month_bounds(partition_key)))
+    if refresh_view:
+        create_table_view(connection, table_name)
+    logger.info(f"Created partition {partition_table} of {table_name}")
+    return partition_table
+
+# Function to split a table into monthly partitions behind a view of the same name
+def partition_by_month(connection: sqlite3.Connection, table_name: str, column: Optional[str] = None) -> list:
+    """
+    Turn a table into one table per month of a date column, read through a UNION ALL view
+    under the original name so existing queries and BI reports keep working.
+
+    The original table is renamed to <table>_undated. It keeps rows without a usable date
+    and is the template for new partitions. Dates that are not ISO strings are rewritten as
+    ISO first, so every partition holds sortable YYYY-MM-DD values. Running it again is a no-op.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table to partition.
+        column (str, optional): Date column to partition on. Defaults to PARTITIONED_TABLES[table_name].
+
+    Returns:
+        list: The storage tables after partitioning.
+    """
+    create_partition_registry(connection)
+    if table_name in partitioned_tables(connection):
+        return storage_tables(connection, table_name)
+    column = column or PARTITIONED_TABLES[table_name]
+    undated = table_name + UNDATED_SUFFIX
+    source = storage_tables(connection, table_name)[0]
+    iso_date = f"{column} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'"
+    try:
+        # One transaction, so a failure leaves the table as it was
+        connection.commit()
+        connection.execute("BEGIN")
+        if source != table_name:
+            # An encoded table: its view is rebuilt over the partitions below
+            connection.execute(f"DROP VIEW {table_name}")
+        connection.execute(f"ALTER TABLE {source} RENAME TO {undated}")
+        connection.execute("INSERT INTO dw_partitioned_tables VALUES (?, ?)", (table_name, column))
+
+        # Rewrite dates stored in other formats (e.g. M/D/YYYY) as ISO strings
+        legacy = pd.read_sql_query(f"SELECT rowid, {column} FROM {undated} WHERE {column} IS NOT NULL AND NOT {iso_date}",
+                                   connection)
+        if len(legacy):
+            iso = column_to_sql_values(parse_dates(legacy[column], source=table_name, errors="coerce"))
+            connection.executemany(f"UPDATE {undated} SET {column} = ? WHERE rowid = ?",
+                                   [(value, rowid) for value, rowid in zip(iso, legacy["rowid"].tolist()) if value])
+
+        keys = [row[0] for row in connection.execute(f"SELECT DISTINCT substr({column}, 1, 7) FROM {undated} WHERE {iso_date}")]
+        for partition_key in sorted(keys):
+            partition_table = ensure_partition(connection, table_name, partition_key, refresh_view=False)
+            lower, upper = month_bounds(partition_key)
+            connection.execute(f"INSERT INTO {partition_table} SELECT * FROM {undated} WHERE {column} >= ? AND {column} < ?",
+                               (lower, upper))
+            connection.execute(f"DELETE FROM {undated} WHERE {column} >= ? AND {column} < ?", (lower, upper))
+        create_table_view(connection, table_name)
+        connection.commit()
+    except sqlite3.Error as e:
+        connection.rollback()
+        logger.error(f"Failed to partition {table_name} by month: {e}")
+        raise
+    logger.info(f"Partitioned {table_name} by {column} into {len(keys)} monthly partition(s)")
+    return storage_tables(connection, table_name)
+
+# Function to empty a partitioned table by dropping its partitions
+def drop_partitions(connection: sqlite3.Connection, table_name: str) -> None:
+    """
+    Remove every row of a partitioned table: each monthly partition is dropped (much cheaper
+    than deleting its rows) and the undated table is emptied.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the partitioned table.
+    """
+    partitions = storage_tables(connection, table_name)[1:]
+    with connection:
+        for partition_table in partitions:
+            connection.execute(f"DROP TABLE IF EXISTS {partition_table}")
+        connection.execute("DELETE FROM dw_partitions WHERE table_name = ?", (table_name,))
+        connection.execute(f"DELETE FROM {table_name}{UNDATED_SUFFIX}")
+        create_table_view(connection, table_name)
+    logger.info(f"Dropped {len(partitions)} partition(s) of {table_name}")
+
+# Function to load a chunk into the monthly partitions of a partitioned table
+def load_partitioned(connection: sqlite3.Connection, df: pd.DataFrame, table_name: str,
+                     engine: str = "executemany", batch_size: Optional[int] = None, upsert: bool = False,
+                     indexes: bool = True) -> dict:
+    """
+    Route each row of a chunk to the partition of its month (or the undated table) and load
+    each group with load_data_to_dw, so a load only writes the partitions it touches.
+
+    For upserts, a key stored in a different month's partition than its new row is deleted
+    there first, so a sale moved to another month is not kept twice.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        df (pd.DataFrame): The chunk, with SQL column names.
+        table_name (str): Name of the partitioned table.
+        engine (str): Insert engine passed to load_data_to_dw.
+        batch_size (int, optional): Rows per transaction for the executemany engine.
+        upsert (bool): Insert new keys and update changed rows instead of plain appends.
+        indexes (bool): Whether new partitions get their indexes now (False while indexes are deferred).
+
+    Returns:
+        dict: Storage table -> number of rows loaded into it.
+    """
+    column = partitioned_tables(connection)[table_name]
+    undated = table_name + UNDATED_SUFFIX
+    if column in df.columns:
+        # Unparseable dates become NaT, so those rows go to the undated table instead of failing the load
+        df[column] = parse_dates(df[column], source=table_name, errors="coerce")
+        keys = df[column].dt.strftime("%Y-%m")
+    else:
+        keys = pd.Series(np.nan, index=df.index)
+    partitions = {partition_key: ensure_partition(connection, table_name, partition_key, indexes=indexes)
+                  for partition_key in keys.dropna().unique()}
+    targets = keys.map(partitions).fillna(undated)
+
+    key_columns = primary_key_columns(connection, undated)
+    if upsert and len(key_columns) == 1 and key_columns[0] in df.columns:
+        key = key_columns[0]
+        connection.execute("CREATE TEMP TABLE IF NOT EXISTS etl_partition_keys (key PRIMARY KEY, partition_table TEXT)")
+        with connection:
+            connection.execute("DELETE FROM temp.etl_partition_keys")
+            connection.executemany("INSERT OR REPLACE INTO temp.etl_partition_keys VALUES (?, ?)",
+                                   zip(column_to_sql_values(df[key]), targets.tolist()))
+            for storage_table in storage_tables(connection, table_name):
+                connection.execute(
+                    f"DELETE FROM {storage_table} WHERE {key} IN "
+                    f"(SELECT key FROM temp.etl_partition_keys WHERE partition_table <> ?)", (storage_table,)
+                )
+
+    loaded = {}
+    for storage_table, group in df.groupby(targets, sort=True):
+        load_data_to_dw(connection, group, storage_table, engine, batch_size, upsert)
+        loaded[storage_table] = len(group)
+    return loaded
+
+# Function to choose the partitions a date predicate can match
+def prune_partitions(connection: sqlite3.Connection, table_name: str, lower: Optional[str] = None,
+                     upper: Optional[str] = None, partition_keys: Optional[set] = None) -> Optional[list]:
+    """
+    Get the monthly partitions of a table that can hold rows in a date range or set of months.
+    The undated table is never included, since its rows match no date predicate.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the partitioned table.
+        lower (str, optional): Inclusive lower ISO date.
+        upper (str, optional): Inclusive upper ISO date.
+        partition_keys (set, optional): Months (YYYY-MM) to keep.
+
+    Returns:
+        list: Partition tables in date order, or None if the table is not partitioned.
+    """
+    if table_name not in partitioned_tables(connection):
+        return None
+    partitions = connection.execute(
+        "SELECT partition_key, partition_table, lower_bound, upper_bound FROM dw_partitions "
+        "WHERE table_name = ? ORDER BY partition_key", (table_name,)
+    ).fetchall()
+    return [
+        partition_table for partition_key, partition_table, lower_bound, upper_bound in partitions
+        if (partition_keys is None or partition_key in partition_keys)
+        and (lower is None or upper_bound > lower)
+        and (upper is None or lower_bound <= upper)
+    ]
+
+###################################################################
+# Dictionary-encoded columns
+###################################################################
+# Function to create the table recording which columns are dictionary-encoded
+def create_encoding_registry(connection: sqlite3.Connection) -> None:
+    """Create dw_encoded_columns, maintained by dictionary_encode_table()."""
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS dw_encoded_columns (
+            table_name TEXT,
+            column_name TEXT,
+            dictionary_table TEXT,
+            PRIMARY KEY (table_name, column_name)
+        )"""
+    )
+
+# Function to list the dictionary-encoded columns of a warehouse
+def encoded_columns(connection: sqlite3.Connection) -> dict:
+    """
+    Get the columns dictionary_encode_table() has encoded.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+
+    Returns:
+        dict: Table name -> {column name: dictionary table}; empty if nothing is encoded.
+    """
+    try:
+        rows = connection.execute("SELECT table_name, column_name, dictionary_table FROM dw_encoded_columns").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    encoded = {}
+    for table_name, column, dictionary in rows:
+        encoded.setdefault(table_name, {})[column] = dictionary
+    return encoded
+
+# Function to read a dictionary table as parallel code and value arrays
+def read_dictionary(connection: sqlite3.Connection, dictionary_table: str) -> tuple:
+    """Return (codes, values) of a dictionary table, ordered by code."""
+    rows = connection.execute(f"SELECT code, value FROM {dictionary_table} ORDER BY code").fetchall()
+    return np.array([row[0] for row in rows], dtype=np.int64), [row[1] for row in rows]
+
+# Function to rewrite a stored table with some TEXT columns replaced by their dictionary codes
+def rebuild_with_codes(connection: sqlite3.Connection, table: str, dictionaries: dict) -> None:
+    """
+    Recreate a table with INTEGER code columns in place of the given TEXT columns, copying its
+    rows (each value replaced by its code) and recreating its indexes. Runs in the caller's transaction.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table (str): Name of the stored table.
+        dictionaries (dict): Column name -> dictionary table holding its codes.
+    """
+    table_sql = connection.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                   (table,)).fetchone()[0]
+    index_sql = [row[0] for row in connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,))]
+    rebuilt = f"{table}_rebuild"
+    table_sql = re.sub(r'^CREATE TABLE\s+("?)\w+\1', f"CREATE TABLE {rebuilt}", table_sql, count=1)
+    for column in dictionaries:
+        table_sql = re.sub(rf"(\b{column}\s+)TEXT\b", r"\1INTEGER", table_sql, count=1, flags=re.IGNORECASE)
+    columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+    select = ", ".join(
+        f"(SELECT code FROM {dictionaries[column]} WHERE value = {table}.{column})" if column in dictionaries else column
+        for column in columns
+    )
+    connection.execute(table_sql)
+    connection.execute(f"INSERT INTO {rebuilt} ({', '.join(columns)}) SELECT {select} FROM {table}")
+    connection.execute(f"DROP TABLE {table}")
+    connection.execute(f"ALTER TABLE {rebuilt} RENAME TO {table}")
+    for sql in index_sql:
+        connection.execute(sql)
+
+# Function to store low-cardinality text columns as integer codes behind a decoding view
+def dictionary_encode_table(connection: sqlite3.Connection, table_name: str, columns: Optional[list] = None) -> list:
+    """
+    Replace repeated text values with small integer codes into per-attribute dictionary tables
+    (dict_<column>: code, value). The table is stored as <table>_encoded (or, if partitioned,
+    in its partitions) and a view under its original name joins the text back, so existing
+    queries and BI reports keep working. Running it again only encodes new columns.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table to encode.
+        columns (list, optional): Columns to encode. Defaults to ENCODED_COLUMNS[table_name].
+
+    Returns:
+        list: The columns newly encoded.
+    """
+    create_encoding_registry(connection)
+    columns = ENCODED_COLUMNS.get(table_name, []) if columns is None else columns
+    new_columns = [column for column in columns if column not in encoded_columns(connection).get(table_name, {})]
+    if not new_columns:
+        return []
+    dictionaries = {column: f"{DICTIONARY_PREFIX}{column}" for column in new_columns}
+    # Dropping the old copy of a table other tables' foreign keys point at needs enforcement off
+    connection.commit()
+    foreign_keys_enabled = connection.execute("PRAGMA foreign_keys").fetchone()[0]
+    connection.execute("PRAGMA foreign_keys = OFF")
+    try:
+        connection.execute("BEGIN")
+        if table_name not in partitioned_tables(connection) and table_name not in encoded_columns(connection):
+            # Foreign keys in other tables follow the rename to the stored table
+            connection.execute(f"ALTER TABLE {table_name} RENAME TO {table_name}{ENCODED_SUFFIX}")
+        else:
+            connection.execute(f"DROP VIEW {table_name}")
+        connection.executemany("INSERT INTO dw_encoded_columns VALUES (?, ?, ?)",
+                               [(table_name, column, dictionary) for column, dictionary in dictionaries.items()])
+        tables = storage_tables(connection, table_name)
+        for column, dictionary in dictionaries.items():
+            connection.execute(f"CREATE TABLE IF NOT EXISTS {dictionary} (code INTEGER PRIMARY KEY, value TEXT UNIQUE)")
+            for table in tables:
+                connection.execute(f"INSERT OR IGNORE INTO {dictionary} (value) "
+                                   f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY {column}")
+        for table in tables:
+            rebuild_with_codes(connection, table, dictionaries)
+        create_table_view(connection, table_name)
+        connection.commit()
+    except sqlite3.Error as e:
+        connection.rollback()
+        logger.error(f"Failed to dictionary-encode {table_name}: {e}")
+        raise
+    finally:
+        connection.execute(f"PRAGMA foreign_keys = {foreign_keys_enabled}")
+    logger.info(f"Dictionary-encoded {table_name}: {', '.join(new_columns)}")
+    return new_columns
+
+# Function to replace a chunk's encoded text columns with their codes before it is stored
+def encode_chunk(connection: sqlite3.Connection, df: pd.DataFrame, table_name: str) -> None:
+    """
+    Map the values of a chunk's encoded columns to their dictionary codes in place, adding
+    unseen values to the dictionaries first. Matching is one vectorized Categorical pass per column.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        df (pd.DataFrame): The chunk, with SQL column names.
+        table_name (str): Name of the table being loaded.
+    """
+    for column, dictionary in encoded_columns(connection).get(table_name, {}).items():
+        if column not in df.columns:
+            continue
+        values = df[column].astype(object).where(df[column].notna(), None)
+        codes, known = read_dictionary(connection, dictionary)
+        unseen = pd.Index(values.dropna().unique()).difference(pd.Index(known, dtype=object))
+        if len(unseen):
+            with connection:
+                connection.executemany(f"INSERT OR IGNORE INTO {dictionary} (value) VALUES (?)",
+                                       [(value,) for value in sorted(map(str, unseen))])
+            codes, known = read_dictionary(connection, dictionary)
+        positions = pd.Categorical(values.astype("string"), categories=known).codes
+        df[column] = pd.Series(codes.take(positions) if len(codes) else np.zeros(len(df), dtype=np.int64),
+                               index=df.index).where(positions >= 0).astype("Int64")
+
+# Function to read a table's stored rows into pandas with encoded columns as categoricals
+def read_table(connection: sqlite3.Connection, table_name: str, columns: Optional[list] = None) -> pd.DataFrame:
+    """
+    Read a table into a DataFrame. Encoded columns are read as their integer codes and turned
+    into category dtype with Categorical.from_codes, so no value is looked up row by row.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the (possibly partitioned or encoded) table.
+        columns (list, optional): Columns to read. Defaults to all.
+
+    Returns:
+        pd.DataFrame: The rows, encoded columns as category dtype.
+    """
+    select_list = ", ".join(columns) if columns else "*"
+    df = pd.read_sql_query(f"SELECT {select_list} FROM {storage_source_sql(connection, table_name)}", connection)
+    for column, dictionary in encoded_columns(connection).get(table_name, {}).items():
+        if column not in df.columns:
+            continue
+        codes, values = read_dictionary(connection, dictionary)
+        stored = df[column].fillna(-1).to_numpy(dtype=np.int64)
+        positions = np.searchsorted(codes, stored)
+        found = (positions < len(codes)) & (codes[np.minimum(positions, max(len(codes) - 1, 0))] == stored) \
+            if len(codes) else np.zeros(len(df), dtype=bool)
+        df[column] = pd.Categorical.from_codes(np.where(found, positions, -1), categories=values)
+    return df
+
+###################################################################
+# Schema migrations
+###################################################################
+# Function to create the table recording the columns added to the warehouse
+def create_migrations_table(connection: sqlite3.Connection) -> None:
+    """Create dw_schema_migrations, one versioned row per column added by add_columns()."""
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS dw_schema_migrations (
+            version INTEGER PRIMARY KEY,
+            table_name TEXT,
+            column_name TEXT,
+            column_definition TEXT,
+            source TEXT,
+            applied_at TEXT
+        )"""
+    )
+
+# Function to read the warehouse's schema version
+def schema_version(connection: sqlite3.Connection) -> int:
+    """Return the version of the last applied migration, 0 for a warehouse that has none."""
+    create_migrations_table(connection)
+    return connection.execute("SELECT COALESCE(MAX(version), 0) FROM dw_schema_migrations").fetchone()[0]
+
+# Function to list a table's stored columns
+def table_columns(connection: sqlite3.Connection, table_name: str) -> list:
+    """Return the column names of a table, read from its template for a partitioned or encoded table."""
+    return [row[1] for row in connection.execute(f"PRAGMA table_info({storage_tables(connection, table_name)[0]})")]
+
+# Function to map a chunk column's dtype to an SQLite column type
+def sql_column_type(series: pd.Series) -> str:
+    """Return INTEGER, REAL or TEXT for a DataFrame column."""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(series):
+        return "REAL"
+    return "TEXT"
+
+# Function to add columns to a table and every table storing its rows, as recorded migrations
+def add_columns(connection: sqlite3.Connection, table_name: str, columns: dict, source: str) -> list:
+    """
+    Add columns with ALTER TABLE ... ADD COLUMN, which only changes the schema, and fill those with
+    a BACKFILLS expression in one UPDATE of that column. A partitioned table gets the columns on its
+    template and every partition, and the view of a partitioned or encoded table is rebuilt.
+    Each column is recorded as the next version in dw_schema_migrations, all in one transaction.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table.
+        columns (dict): Column name -> definition (type and optional DEFAULT/REFERENCES), in order.
+                        Columns the table already has are skipped.
+        source (str): What asked for the columns, e.g. the schema file or the loaded file.
+
+    Returns:
+        list: The columns added.
+    """
+    existing = set(table_columns(connection, table_name))
+    columns = {column: definition for column, definition in columns.items() if column not in existing}
+    if not columns:
+        return []
+    create_migrations_table(connection)
+    storage = storage_tables(connection, table_name)
+    try:
+        # One transaction, so a failure leaves every storage table as it was
+        connection.commit()
+        connection.execute("BEGIN")
+        for column, definition in columns.items():
+            for table in storage:
+                connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                if (table_name, column) in BACKFILLS:
+                    connection.execute(f"UPDATE {table} SET {column} = {BACKFILLS[(table_name, column)].format(table=table)}")
+            connection.execute(
+                "INSERT INTO dw_schema_migrations (table_name, column_name, column_definition, source, applied_at) "
+                "VALUES (?, ?, ?, ?, datetime('now'))",
+                (table_name, column, definition, source),
+            )
+        if storage != [table_name]:
+            create_table_view(connection, table_name)
+        connection.commit()
+    except sqlite3.Error as e:
+        connection.rollback()
+        logger.error(f"Failed to add column(s) {', '.join(columns)} to {table_name}: {e}")
+        raise
+    bump_table_version(connection, table_name)
+    logger.info(f"Migrated {table_name} to schema version {schema_version(connection)}: added {', '.join(columns)}")
+    return list(columns)
+
+# Function to add the columns a schema script declares for tables the warehouse already has
+def migrate_to_schema(connection: sqlite3.Connection, sql_script: str, source: str = "schema") -> dict:
+    """
+    Diff the tables of a schema script against the warehouse and add the missing columns.
+
+    CREATE TABLE IF NOT EXISTS leaves an existing table as it is, so columns added to the script
+    later are added here (see add_columns). The script is run on a scratch in-memory database,
+    so its column types and foreign keys are read back from SQLite instead of parsed. Only
+    additive changes are applied: columns the warehouse has and the script does not are left
+    alone, and tables the script creates are not touched here.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        sql_script (str): The schema script (CREATE TABLE IF NOT EXISTS statements).
+        source (str): Recorded with each migration, e.g. the schema file path.
+
+    Returns:
+        dict: Table name -> columns added, for the tables that changed.
+
+    Raises:
+        ValueError: If a missing column cannot be added to a table with rows (PRIMARY KEY, or NOT NULL without a default).
+    """
+    scratch = sqlite3.connect(":memory:")
+    try:
+        scratch.executescript(sql_script)
+        declared = [row[0] for row in scratch.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY rowid")]
+        views = set(partitioned_tables(connection)) | set(encoded_columns(connection))
+        added = {}
+        for table_name in declared:
+            found = connection.execute("SELECT type FROM sqlite_master WHERE name = ?", (table_name,)).fetchone()
+            if found is None or (found[0] == "view" and table_name not in views):
+                continue
+            existing = set(table_columns(connection, table_name))
+            references = {row[3]: f" REFERENCES {row[2]} ({row[4]})"
+                          for row in scratch.execute(f"PRAGMA foreign_key_list({table_name})")}
+            columns = {}
+            for _, column, column_type, not_null, default, primary_key in scratch.execute(f"PRAGMA table_info({table_name})"):
+                if column in existing:
+                    continue
+                if primary_key or (not_null and default is None):
+                    message = f"Cannot add column {table_name}.{column} in place: primary key or NOT NULL without a default"
+                    logger.error(message)
+                    raise ValueError(message)
+                definition = column_type + (f" DEFAULT {default}" if default is not None else "")
+                definition += (" NOT NULL" if not_null else "") + references.get(column, "")
+                columns[column] = definition.strip()
+            if columns:
+                added[table_name] = add_columns(connection, table_name, columns, source)
+    finally:
+        scratch.close()
+    return added
+
+# Function to add the columns a chunk has and its table lacks
+def evolve_table(connection: sqlite3.Connection, df: pd.DataFrame, table_name: str, source: str) -> list:
+    """Add each chunk column missing from the table, typed from its dtype; returns the columns added."""
+    existing = set(table_columns(connection, table_name))
+    missing = {column: sql_column_type(df[column]) for column in df.columns if column not in existing}
+    return add_columns(connection, table_name, missing, source) if missing else []
+
+# Function to fill columns added during a load on the rows the chunk already has in the table
+def backfill_columns(connection: sqlite3.Connection, df: pd.DataFrame, table_name: str, columns: list,
+                     key_columns: list) -> None:
+    """
+    Write a chunk's values of the given columns onto the stored rows with the same key, one UPDATE
+    per storage table, so an incremental load then finds those rows unchanged.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        df (pd.DataFrame): The chunk, with SQL column names.
+        table_name (str): Name of the table being loaded.
+        columns (list): Columns to fill.
+        key_columns (list): The table's primary key; only a single-column key is supported.
+    """
+    columns = [column for column in columns if column in df.columns]
+    if len(key_columns) != 1 or key_columns[0] not in df.columns or not columns or not len(df):
+        return
+    key = key_columns[0]
+    connection.execute("DROP TABLE IF EXISTS temp.etl_backfill")
+    connection.execute(f"CREATE TEMP TABLE etl_backfill ({key} PRIMARY KEY, {', '.join(columns)})")
+    try:
+        bulk_insert(connection, df[[key] + columns].drop_duplicates(subset=[key], keep="last"), "etl_backfill")
+        with connection:
+            for table in storage_tables(connection, table_name):
+                assignments = ", ".join(f"{column} = b.{column}" for column in columns)
+                connection.execute(f"UPDATE {table} SET {assignments} FROM etl_backfill b WHERE b.{key} = {table}.{key}")
+    finally:
+        connection.execute("DROP TABLE IF EXISTS temp.etl_backfill")
+
+###################################################################
+# Derived columns
+###################################################################
+# Function to index a dimension's attribute columns by an integer key for vectorized lookups
+def build_key_lookup(keys: np.ndarray, max_dense_size: int = 10_000_000) -> dict:
+    """
+    Index integer keys so that many probe keys can be resolved to row positions at once.
+
+    Compact key ranges (like product_id 101-108) get a dense array indexed by the key itself;
+    sparse ranges fall back to a sorted array searched with np.searchsorted.
+
+    Args:
+        keys (np.ndarray): The dimension's integer keys, one per row.
+        max_dense_size (int): Largest dense array to allocate.
+
+    Returns:
+        dict: Lookup structure for lookup_positions.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    if len(keys) and keys.min() >= 0 and keys.max() < max_dense_size:
+        dense = np.full(int(keys.max()) + 1, -1, dtype=np.int64)
+        dense[keys] = np.arange(len(keys))
+        return {"dense": dense}
+    order = np.argsort(keys, kind="stable")
+    return {"sorted_keys": keys[order], "order": order}
+
+# Function to resolve probe keys to dimension row positions (-1 where the key is unknown)
+def lookup_positions(lookup: dict, probe: np.ndarray) -> np.ndarray:
+    """
+    Find the dimension row of each probe key in one vectorized pass.
+
+    Args:
+        lookup (dict): Structure from build_key_lookup.
+        probe (np.ndarray): Keys to resolve; missing values should be passed as -1.
+
+    Returns:
+        np.ndarray: Row positions, -1 for keys not in the dimension.
+    """
+    probe = np.asarray(probe, dtype=np.int64)
+    if "dense" in lookup:
+        dense = lookup["dense"]
+        in_range = (probe >= 0) & (probe < len(dense))
+        positions = np.full(len(probe), -1, dtype=np.int64)
+        positions[in_range] = dense[probe[in_range]]
+        return positions
+    sorted_keys = lookup["sorted_keys"]
+    slots = np.clip(np.searchsorted(sorted_keys, probe), 0, max(len(sorted_keys) - 1, 0))
+    if not len(sorted_keys):
+        return np.full(len(probe), -1, dtype=np.int64)
+    found = sorted_keys[slots] == probe
+    return np.where(found, lookup["order"][slots], -1)
+
+# Per-chunk derived columns for the products table
+def products_derived_columns(connection: sqlite3.Connection):
+    """Return a function adding profit_margin = unit_price - wholesale_price to a products chunk."""
+    def derive(df: pd.DataFrame) -> None:
+        if {"unit_price", "wholesale_price"} <= set(df.columns):
+            df["profit_margin"] = df["unit_price"] - df["wholesale_price"]
+    return derive
+
+# Per-chunk derived columns for the sales table, joined against the loaded products dimension
+def sales_derived_columns(connection: sqlite3.Connection):
+    """
+    Return a function adding unit_price, profit_margin, quantity and sale_profit to a sales chunk.
+
+    The products dimension is read once and indexed by product_id, so each chunk is joined with
+    a single array lookup instead of one lookup per row. Sales of unknown products get NULLs.
+    Definitions follow the P6 analysis: quantity = sale_amount / unit_price and
+    sale_profit = quantity * profit_margin.
+    """
+    products = connection.execute("SELECT product_id, unit_price, wholesale_price FROM products").fetchall()
+    lookup = build_key_lookup(np.array([row[0] for row in products], dtype=np.int64))
+    # A trailing NaN row, so position -1 (unknown product) reads as missing
+    unit_prices = np.array([row[1] for row in products] + [np.nan], dtype=np.float64)
+    wholesale_prices = np.array([row[2] for row in products] + [np.nan], dtype=np.float64)
+
+    def derive(df: pd.DataFrame) -> None:
+        if not {"product_id", "sale_amount"} <= set(df.columns):
+            return
+        probe = pd.to_numeric(df["product_id"]).fillna(-1).to_numpy(dtype=np.int64)
+        positions = lookup_positions(lookup, probe)
+        unit_price = unit_prices[positions]
+        profit_margin = unit_price - wholesale_prices[positions]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            quantity = df["sale_amount"].to_numpy(dtype=np.float64) / np.where(unit_price == 0, np.nan, unit_price)
+        df["unit_price"] = unit_price
+        df["profit_margin"] = profit_margin
+        df["quantity"] = quantity
+        df["sale_profit"] = quantity * profit_margin
+    return derive
+
+# Function to recompute the stored sales columns after the products dimension changed
+def refresh_sales_derived_columns(connection: sqlite3.Connection) -> int:
+    """
+    Bring the stored unit_price, profit_margin, quantity and sale_profit of existing sales in line
+    with the current products table (e.g. after a price change), touching only rows that differ.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+
+    Returns:
+        int: Number of sales rows updated.
+    """
+    sales_columns = {row[1] for row in connection.execute("PRAGMA table_info(sales)")}
+    if not {"unit_price", "profit_margin", "quantity", "sale_profit"} <= sales_columns:
+        logger.info("sales has no derived columns to refresh")
+        return 0
+    updated = 0
+    try:
+        with connection:
+            # Each storage table in turn, since a partitioned sales table is a view
+            for table in storage_tables(connection, "sales"):
+                cursor = connection.execute(
+                    f"""UPDATE {table} SET
+                           unit_price = p.unit_price,
+                           profit_margin = p.unit_price - p.wholesale_price,
+                           quantity = {table}.sale_amount / NULLIF(p.unit_price, 0),
+                           sale_profit = {table}.sale_amount / NULLIF(p.unit_price, 0) * (p.unit_price - p.wholesale_price)
+                       FROM products p
+                       WHERE p.product_id = {table}.product_id
+                         AND ({table}.unit_price IS NOT p.unit_price
+                              OR {table}.profit_margin IS NOT p.unit_price - p.wholesale_price)"""
+                )
+                updated += cursor.rowcount
+    except sqlite3.OperationalError as e:
+        logger.error(f"Failed to refresh derived sales columns: {e}")
+        raise
+    logger.info(f"Refreshed derived columns on {updated} sales rows")
+    if updated:
+        bump_table_version(connection, "sales")
+    return updated
+
+# Derived columns computed during loads: table -> function(connection) returning a per-chunk function,
+# and table -> function run after that table changes to update other tables (UPDATE TO CUSTOMIZE)
+DERIVED_COLUMNS = {
+    "products": products_derived_columns,
+    "sales": sales_derived_columns,
+}
+DERIVED_COLUMN_REFRESH = {
+    "products": refresh_sales_derived_columns,
+}
+
+###################################################################
+# Referential integrity
+###################################################################
+# Function to index the parent keys of a table's REFERENCES for in-memory orphan checks
+def reference_lookups(connection: sqlite3.Connection, table_name: str) -> dict:
+    """
+    Read the primary keys of each parent table a table references, indexed with build_key_lookup.
+
+    Parents that do not exist yet are left out, so their columns are not checked.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the child (fact) table.
+
+    Returns:
+        dict: Column -> {"parent", "key", "keys", "lookup"} for each checked column.
+    """
+    lookups = {}
+    for column, parent in REFERENCES.get(table_name, {}).items():
+        if connection.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (parent,)).fetchone() is None:
+            continue
+        key = primary_key_columns(connection, storage_tables(connection, parent)[0])[0]
+        keys = np.fromiter((row[0] for row in connection.execute(
+            f"SELECT {key} FROM {storage_source_sql(connection, parent)}")), dtype=np.int64)
+        lookups[column] = {"parent": parent, "key": key, "keys": keys, "lookup": build_key_lookup(keys)}
+    return lookups
+
+# Function to find the rows of a chunk whose foreign key is not in the parent table
+def orphan_masks(df: pd.DataFrame, lookups: dict) -> dict:
+    """
+    Flag orphaned rows per checked column with one vectorized key lookup each; NULL keys are not orphans.
+
+    Args:
+        df (pd.DataFrame): The chunk, with SQL column names.
+        lookups (dict): Structure from reference_lookups.
+
+    Returns:
+        dict: Column -> boolean mask, True for each row whose key is missing from the parent.
+    """
+    masks = {}
+    for column, reference in lookups.items():
+        if column not in df.columns:
+            continue
+        values = pd.to_numeric(df[column])
+        probe = values.fillna(-1).to_numpy(dtype=np.int64)
+        masks[column] = (lookup_positions(reference["lookup"], probe) == -1) & values.notna().to_numpy()
+    return masks
+
+# Function to add placeholder parent rows for orphaned keys
+def add_unknown_members(connection: sqlite3.Connection, reference: dict, missing_keys: np.ndarray) -> None:
+    """
+    Insert an UNKNOWN_MEMBERS row for each missing key, so BI joins show "Unknown" instead of blanks.
+
+    The new keys are added to the reference's lookup, and the rollups are marked for a full
+    refresh as after any other load of the dimension.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        reference (dict): One column's entry from reference_lookups.
+        missing_keys (np.ndarray): Distinct keys missing from the parent table.
+    """
+    parent = reference["parent"]
+    members = pd.DataFrame({reference["key"]: missing_keys})
+    for column, value in UNKNOWN_MEMBERS.get(parent, {}).items():
+        members[column] = value
+    encode_chunk(connection, members, parent)
+    load_data_to_dw(connection, members, storage_tables(connection, parent)[0])
+    reference["keys"] = np.concatenate([reference["keys"], missing_keys])
+    reference["lookup"] = build_key_lookup(reference["keys"])
+    mark_dirty(connection, parent)
+    bump_table_version(connection, parent)
+    logger.info(f"Added {len(missing_keys)} unknown member(s) to {parent}")
+
+# Function to apply the orphan policy to a chunk before it is loaded
+def handle_orphans(connection: sqlite3.Connection, df: pd.DataFrame, table_name: str, lookups: dict,
+                   policy: str, quarantine_path: Optional[str] = None) -> tuple:
+    """
+    Check a chunk against its parent keys and report, quarantine or adopt the orphaned rows.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        df (pd.DataFrame): The chunk, with SQL column names.
+        table_name (str): Name of the table being loaded.
+        lookups (dict): Structure from reference_lookups.
+        policy (str): One of ORPHAN_POLICIES.
+        quarantine_path (str, optional): CSV file the "quarantine" policy appends orphaned rows to.
+
+    Returns:
+        tuple: The rows to load, and column -> number of orphaned rows in the chunk.
+    """
+    masks = orphan_masks(df, lookups)
+    counts = {column: int(mask.sum()) for column, mask in masks.items()}
+    for column, count in counts.items():
+        if count:
+            sample = ", ".join(map(str, pd.unique(df.loc[masks[column], column])[:10]))
+            logger.warning(f"{count} row(s) in {table_name} reference a {column} missing from "
+                           f"{lookups[column]['parent']}: {sample}")
+    if not any(counts.values()):
+        return df, counts
+
+    if policy == "unknown_member":
+        for column, mask in masks.items():
+            if counts[column]:
+                missing = np.unique(pd.to_numeric(df.loc[mask, column]).to_numpy(dtype=np.int64))
+                add_unknown_members(connection, lookups[column], missing)
+    elif policy == "quarantine":
+        orphaned = np.zeros(len(df), dtype=bool)
+        labels = pd.Series("", index=df.index, dtype=object)
+        for column, mask in masks.items():
+            orphaned |= mask
+            labels[mask] = labels[mask] + f";{column}:references"
+        os.makedirs(os.path.dirname(quarantine_path) or ".", exist_ok=True)
+        df[orphaned].assign(**{RULE_COLUMN: labels[orphaned].str.lstrip(";")}).to_csv(
+            quarantine_path, mode="a", header=not os.path.exists(quarantine_path), index=False)
+        df = df[~orphaned].copy()
+    return df, counts
+
+###################################################################
+# Date dimension
+###################################################################
+# Function to build dim_date rows for a span of days
+def date_dimension_rows(start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """
+    Build the dim_date rows for every day from start to end (inclusive), in schema.sql column order.
+
+    The fiscal year starts in FISCAL_YEAR_START_MONTH and is named after the calendar year it ends in.
+
+    Args:
+        start (pd.Timestamp): First day.
+        end (pd.Timestamp): Last day.
+
+    Returns:
+        pd.DataFrame: One row per day.
+    """
+    days = pd.date_range(start.normalize(), end.normalize(), freq="D")
+    fiscal_offset = (days.month - FISCAL_YEAR_START_MONTH) % 12
+    return pd.DataFrame({
+        "date_key": days.year * 10_000 + days.month * 100 + days.day,
+        "full_date": days.strftime("%Y-%m-%d"),
+        "year": days.year,
+        "quarter": days.quarter,
+        "month": days.month,
+        "month_name": days.strftime("%B"),
+        "year_month": days.strftime("%Y-%m"),
+        "week_of_year": days.isocalendar().week.to_numpy(),
+        "day_of_month": days.day,
+        "day_of_week": days.dayofweek + 1,  # ISO: Monday = 1
+        "day_name": days.strftime("%A"),
+        "is_weekend": (days.dayofweek >= 5).astype("int64"),
+        "fiscal_year": days.year + ((days.month >= FISCAL_YEAR_START_MONTH) if FISCAL_YEAR_START_MONTH > 1 else 0),
+        "fiscal_quarter": fiscal_offset // 3 + 1,
+        "iso_year": days.isocalendar().year.to_numpy(),
+    })
+
+# Function to grow dim_date so it covers a set of dates
+def extend_date_dimension(connection: sqlite3.Connection, dates: pd.Series) -> int:
+    """
+    Add the days needed for dim_date to cover the given dates as one contiguous calendar,
+    so every date key in a fact table joins to a dim_date row.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        dates (pd.Series): Datetimes being loaded; missing values are ignored.
+
+    Returns:
+        int: Number of days added.
+    """
+    dates = dates.dropna()
+    if dates.empty:
+        return 0
+    low, high = dates.min(), dates.max()
+    current_low, current_high = connection.execute("SELECT MIN(full_date), MAX(full_date) FROM dim_date").fetchone()
+    if current_low is None:
+        spans = [(low, high)]
+    else:
+        current_low, current_high = pd.Timestamp(current_low), pd.Timestamp(current_high)
+        spans = [(low, current_low - pd.Timedelta(days=1)), (current_high + pd.Timedelta(days=1), high)]
+    missing = [date_dimension_rows(start, end) for start, end in spans if start.normalize() <= end]
+    if not missing:
+        return 0
+    rows = pd.concat(missing)
+    bulk_insert(connection, rows, "dim_date")
+    logger.info(f"Added {len(rows)} day(s) to dim_date")
+    return len(rows)
+
+# Function to add the integer date keys of a chunk's date columns
+def add_date_keys(connection: sqlite3.Connection, df: pd.DataFrame, table_name: str) -> None:
+    """
+    Add the YYYYMMDD integer key of each date column listed in DATE_KEYS for the table, and
+    make sure dim_date has a row for every key. Unparseable dates get a NULL key.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        df (pd.DataFrame): The chunk, with SQL column names; modified in place.
+        table_name (str): Name of the table being loaded.
+    """
+    date_keys = DATE_KEYS.get(table_name, {})
+    if not date_keys:
+        return
+    table_columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table_name})")}
+    for date_column, key_column in date_keys.items():
+        if date_column not in df.columns or key_column not in table_columns:
+            continue
+        dates = parse_dates(df[date_column], source=table_name, errors="coerce")
+        extend_date_dimension(connection, dates)
+        df[key_column] = (dates.dt.year * 10_000 + dates.dt.month * 100 + dates.dt.day).astype("Int64")
+
+###################################################################
+# Materialized rollups
+###################################################################
+# Function to create the table recording rollup partitions that need a refresh
+def create_dirty_keys_table(connection: sqlite3.Connection) -> None:
+    """Create etl_dirty_keys, which file_to_dw fills and refresh_rollups empties."""
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS etl_dirty_keys (
+            table_name TEXT,
+            column_name TEXT,
+            value,
+            PRIMARY KEY (table_name, column_name, value)
+        )"""
+    )
+
+# Function to record rollup partitions invalidated by a load
+def mark_dirty(connection: sqlite3.Connection, table_name: str, touched: Optional[dict] = None) -> None:
+    """
+    Record which rollup partitions a load has touched, for the next refresh_rollups().
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table that was loaded.
+        touched (dict, optional): Column name -> set of values loaded or replaced.
+                                  None marks every partition of every rollup.
+    """
+    create_dirty_keys_table(connection)
+    if touched is None:
+        rows = [(table_name, FULL_REFRESH, "")]
+    else:
+        rows = [(table_name, column, value) for column, values in touched.items() for value in values]
+    with connection:
+        connection.executemany("INSERT OR IGNORE INTO etl_dirty_keys VALUES (?, ?, ?)", rows)
+
+# Function to collect the values a chunk is about to write or overwrite in the tracked columns
+def touched_values(connection: sqlite3.Connection, df: pd.DataFrame, table_name: str, columns: list,
+                   key_columns: Optional[list] = None) -> Optional[dict]:
+    """
+    Collect the tracked-column values a chunk changes.
+
+    For an append every row is new. For an upsert the chunk is compared with the stored rows in
+    its key range: unchanged rows are ignored, and a changed row contributes both its new and
+    its old values (a sale moved to another date dirties both dates).
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        df (pd.DataFrame): The chunk, with SQL column names.
+        table_name (str): Name of the table being loaded.
+        columns (list): Tracked columns, e.g. ["sale_date", "customer_id"].
+        key_columns (list, optional): Primary key of an upsert load; None for appends.
+
+    Returns:
+        dict: Column name -> set of values, or None when the affected rows cannot be bounded
+              (a composite or non-integer upsert key), meaning every partition is dirty.
+    """
+    table_columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table_name})")]
+    load_columns = [col for col in df.columns if col in table_columns]
+    tracked = [col for col in columns if col in load_columns]
+    touched = {col: set() for col in tracked}
+    if not len(df) or not tracked:
+        return touched
+    rows = list(zip(*(column_to_sql_values(df[col]) for col in load_columns)))
+    positions = [load_columns.index(col) for col in tracked]
+
+    existing = {}
+    if key_columns:
+        key = key_columns[0]
+        if len(key_columns) != 1 or key not in load_columns or not pd.api.types.is_integer_dtype(df[key]):
+            return None
+        key_position = load_columns.index(key)
+        select_list = ", ".join(load_columns)
+        existing = {
+            row[key_position]: row
+            for row in connection.execute(f"SELECT {select_list} FROM {storage_source_sql(connection, table_name)} "
+                                          f"WHERE {key} BETWEEN ? AND ?",
+                                          (int(df[key].min()), int(df[key].max())))
+        }
+
+    for row in rows:
+        old_row = existing.get(row[key_position]) if existing else None
+        if old_row == row:
+            continue
+        for col, position in zip(tracked, positions):
+            touched[col].add(row[position])
+            if old_row is not None:
+                touched[col].add(old_row[position])
+    for values in touched.values():
+        values.discard(None)
+    return touched
+
+# Function to bring the materialized rollups up to date with the loads since the last refresh
+def refresh_rollups(connection: sqlite3.Connection, rollups: Optional[dict] = None) -> dict:
+    """
+    Rebuild the rollup partitions recorded as dirty by file_to_dw, then clear the record.
+
+    Only the sale dates (daily rollup) and customers (lifetime value) touched by the loads are
+    deleted and re-aggregated; a load of a dimension table or a delete-and-reload rebuilds
+    the rollups completely.
+
+    Args:
+        connection (sqlite3.Connection): SQLite connection object.
+        rollups (dict, optional): Rollup table -> (partition column, SELECT); defaults to ROLLUPS.
+
+    Returns:
+        dict: Rollup table -> number of partitions refreshed, or "full" for a complete rebuild.
+    """
+    rollups = ROLLUPS if rollups is None else rollups
+    create_dirty_keys_table(connection)
+    dirty = {}
+    for column, value in connection.execute("SELECT column_name, value FROM etl_dirty_keys"):
+        dirty.setdefault(column, set()).add(value)
+    full = FULL_REFRESH in dirty
+
+    report = {}
+    try:
+        with connection:
+            for rollup_table, (column, select_sql) in rollups.items():
+                if full:
+                    connection.execute(f"DELETE FROM {rollup_table}")
+                    connection.execute(f"INSERT INTO {rollup_table} {select_sql.format(where='')}")
+                    report[rollup_table] = "full"
+                    continue
+                values = sorted(dirty.get(column, ()), key=str)
+                if values:
+                    keys = json.dumps(values)
+                    connection.execute(f"DELETE FROM {rollup_table} WHERE {column} IN (SELECT value FROM json_each(?))",
+                                       (keys,))
+                    where = f"WHERE s.{column} IN (SELECT value FROM json_each(?))"
+                    connection.execute(f"INSERT INTO {rollup_table} {select_sql.format(where=where)}", (keys,))
+                report[rollup_table] = len(values)
+            connection.execute("DELETE FROM etl_dirty_keys")
+    except sqlite3.Error as e:
+        logger.error(f"Failed to refresh rollups: {e}")
+        raise
+    for rollup_table, refreshed in report.items():
+        if refreshed:
+            bump_table_version(connection, rollup_table)
+    logger.info(f"Refreshed rollups: {report}")
+    return report
+
+def file_to_dw(file_path: str, connection: sqlite3.Connection, table_name: str, delete_first: bool = False,
+              chunksize: Optional[int] = None, engine: str = "executemany",
+              batch_size: Optional[int] = None, defer_indexes: bool = False, incremental: bool = False,
+              orphans: Optional[str] = None, evolve_schema: Optional[bool] = None) -> dict:
+    """
+    Load a CSV, Parquet or Arrow IPC/Feather file into the specified table in the SQLite database.
+
+    When chunksize is given the file is streamed and each chunk is converted, filtered and
+    inserted on its own, so peak memory depends on the chunk size rather than the file size.
+    With defer_indexes the table's secondary indexes are dropped for the load and rebuilt
+    afterwards, followed by one foreign key check. An incremental load skips files whose
+    content hash matches the last load and otherwise upserts rows on the table's primary key,
+    so only new or changed keys are written. Loads into tables listed in CHANGE_TRACKING
+    record the rollup partitions they touch for the next refresh_rollups(). Tables listed in
+    DERIVED_COLUMNS get their derived columns (e.g. sales.sale_profit) computed per chunk, and
+    date columns listed in DATE_KEYS get an integer key into dim_date (e.g. sales.sale_date_key).
+    Rows of a table split by partition_by_month() are routed to their month's partition, and
+    a delete-first load drops the partitions instead of deleting rows. Columns encoded by
+    dictionary_encode_table() are stored as their dictionary codes. Foreign keys listed in
+    REFERENCES are checked on each chunk against the parent table's keys, in memory, and
+    orphaned rows are handled by the orphan policy. With evolve_schema, columns the file has and the
+    table lacks are added (see add_columns); an incremental load first fills them on the rows it
+    already has, so only the new columns are written for otherwise unchanged rows.
+
+    Args:
+        file_path (str): Path to the source file; the format is taken from its extension.
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table to load data into.
+        delete_first (bool): Whether to delete existing records in the table before loading. Defaults to False.
+        chunksize (int, optional): Rows per chunk for streaming loads. Defaults to None (load the whole file at once).
+        engine (str): Insert engine passed to load_data_to_dw. Defaults to "executemany".
+        batch_size (int, optional): Rows per transaction for the executemany engine.
+        defer_indexes (bool): Whether to build secondary indexes after the load. Defaults to False.
+        incremental (bool): Whether to upsert changed files instead of appending. Defaults to False.
+        orphans (str, optional): One of ORPHAN_POLICIES. Defaults to ORPHAN_POLICY.
+        evolve_schema (bool, optional): Whether to add missing columns. Defaults to EVOLVE_SCHEMA.
+
+    Returns:
+        dict: Load report with row count, elapsed seconds, rows/sec, peak RSS in MB, the number
+              of foreign key violations found by a deferred load, orphaned rows per foreign key
+              column, the columns added and whether the file was skipped.
+    """
+    orphans = ORPHAN_POLICY if orphans is None else orphans
+    evolve_schema = EVOLVE_SCHEMA if evolve_schema is None else evolve_schema
+    if orphans not in ORPHAN_POLICIES:
+        raise ValueError(f"Unknown orphan policy '{orphans}'. Expected one of: {', '.join(ORPHAN_POLICIES)}")
+    tracked_columns = CHANGE_TRACKING.get(table_name)
+    partition_column = partitioned_tables(connection).get(table_name)
+    derive = DERIVED_COLUMNS[table_name](connection) if table_name in DERIVED_COLUMNS else None
+    if incremental and delete_first:
+        raise ValueError("An incremental load cannot also delete existing records first.")
+    start = time.perf_counter()
+    rows = 0
+    chunks = 0
+    content_hash = file_content_hash(file_path) if incremental else None
+    if incremental:
+        state = get_load_state(connection, file_path, table_name)
+        if state is not None and state["content_hash"] == content_hash:
+            logger.info(f"Skipping {file_path}: unchanged since it was loaded into {table_name} at {state['loaded_at']}")
+            return {"table": table_name, "rows": 0, "chunks": 0, "chunksize": chunksize, "seconds": 0.0,
+                    "rows_per_sec": 0.0, "peak_rss_mb": get_peak_rss_mb(), "fk_violations": 0, "orphans": {},
+                    "columns_added": [], "skipped": True}
+        key_columns = primary_key_columns(connection, storage_tables(connection, table_name)[0])
+    # Column -> values touched, or None once every rollup partition is affected
+    touched = None if delete_first or not tracked_columns else {col: set() for col in tracked_columns}
+    lookups = reference_lookups(connection, table_name) if orphans != "ignore" else {}
+    orphan_counts = {column: 0 for column in lookups}
+    added_columns = []
+    quarantine_path = None
+    if orphans == "quarantine":
+        quarantine_path = quarantine_file_path(os.path.splitext(os.path.basename(file_path))[0] + "_orphans")
+        if os.path.exists(quarantine_path):
+            os.remove(quarantine_path)
+
+    with deferred_indexes(connection, table_name) if defer_indexes else nullcontext({}) as deferred:
+        if partition_column and delete_first:
+            drop_partitions(connection, table_name)
+        else:
+            delete_existing_records(connection.cursor(), storage_tables(connection, table_name)[0], delete_first)
+
+        frames = load_file_chunks(file_path, chunksize) if chunksize else [load_file(file_path)]
+        for df in frames:
+            convert_to_sql_format(df)
+            if lookups:
+                df, chunk_orphans = handle_orphans(connection, df, table_name, lookups, orphans, quarantine_path)
+                for column, count in chunk_orphans.items():
+                    orphan_counts[column] += count
+            if derive is not None:
+                derive(df)
+            add_date_keys(connection, df, table_name)
+            encode_chunk(connection, df, table_name)
+            if partition_column in df.columns:
+                # ISO dates, so tracked values and partition bounds compare as stored (NaT if unparseable)
+                df[partition_column] = parse_dates(df[partition_column], source=file_path, errors="coerce")
+            if evolve_schema:
+                added_columns += evolve_table(connection, df, table_name, file_path)
+                if incremental and added_columns:
+                    backfill_columns(connection, df, table_name, added_columns, key_columns)
+            if touched is not None:
+                chunk_touched = touched_values(connection, df, table_name, tracked_columns,
+                                               key_columns if incremental else None)
+                if chunk_touched is None:
+                    touched = None
+                else:
+                    for col, values in chunk_touched.items():
+                        touched[col].update(values)
+            if partition_column:
+                load_partitioned(connection, df, table_name, engine, batch_size, upsert=incremental,
+                                 indexes=not defer_indexes)
+            else:
+                load_data_to_dw(connection, df, storage_tables(connection, table_name)[0], engine, batch_size,
+                                upsert=incremental)
+            rows += len(df)
+            chunks += 1
+
+    if incremental:
+        record_load_state(connection, file_path, table_name, content_hash, rows)
+    if tracked_columns is not None:
+        mark_dirty(connection, table_name, touched)
+    bump_table_version(connection, table_name)
+    if table_name in DERIVED_COLUMN_REFRESH:
+        DERIVED_COLUMN_REFRESH[table_name](connection)
+
+    elapsed = time.perf_counter() - start
+    report = {
+        "table": table_name,
+        "rows": rows,
+        "chunks": chunks,
+        "chunksize": chunksize,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else float("inf"),
+        "peak_rss_mb": get_peak_rss_mb(),
+        "fk_violations": len(deferred.get("fk_violations", [])),
+        "orphans": orphan_counts,
+        "columns_added": added_columns,
+        "skipped": False,
+    }
+    peak = f"{report['peak_rss_mb']:.1f} MB" if report["peak_rss_mb"] is not None else "n/a"
+    logger.info(f"Loaded {rows} rows into {table_name} in {chunks} chunk(s): {elapsed:.2f}s, "
+                f"{report['rows_per_sec']:.0f} rows/sec, peak RSS {peak}")
+    return report
+
+def csv_to_dw(file_path: str, connection: sqlite3.Connection, table_name: str, delete_first: bool = False,
+              **load_args) -> dict:
+    """
+    Load CSV data into the specified table in the SQLite database.
+    Kept for existing callers; see file_to_dw for the load options.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        connection (sqlite3.Connection): SQLite connection object.
+        table_name (str): Name of the table to load data into.
+        delete_first (bool): Whether to delete existing records in the table before loading. Defaults to False.
+        **load_args: Further options passed to file_to_dw.
+
+    Returns:
+        dict: The file_to_dw load report.
     """
-    df = load_csv(file_path)
-    delete_existing_records(connection.cursor(), table_name, delete_first)
-    convert_to_sql_format(df)
-    load_data_to_dw(connection, df, table_name)
+    return file_to_dw(file_path, connection, table_name, delete_first, **load_args)
 
 ##################################################################
 # Main function
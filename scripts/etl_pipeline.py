@@ -0,0 +1,218 @@
+"""
+ETL Pipeline Orchestrator
+File: scripts/etl_pipeline.py
+
+Runs the whole ETL as a dependency graph instead of one script after another:
+- the prepare_* scripts are independent and run in a process pool
+- the dimension loads (customers, products, stores, campaigns) run in parallel once their files are prepared
+- the sales fact load starts only after its foreign key targets are loaded
+- the rollup tables are refreshed for the partitions the loads touched
+
+Wall time becomes the longest path through the graph rather than the sum of every step.
+Per-stage timings are written to the project log.
+
+Run from the root project folder:
+    py scripts\\etl_pipeline.py
+    python3 scripts/etl_pipeline.py
+"""
+
+import functools
+import os
+import pathlib
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, List, NamedTuple
+
+# Get the path to the project directory (one level up) and the prepare scripts
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_preparation'))
+
+# Local Imports
+from utils.logger import logger
+from utils.staging import PREPARED_FORMAT, prepared_file_path
+import dwbuilder as dwb
+import prepare_customers_data
+import prepare_products_data
+import prepare_sales_data
+import prepare_stores_data
+import prepare_campaigns_data
+
+##############################################
+# Constants (UPDATE PATHS TO CUSTOMIZE)
+##############################################
+DW_DIR = pathlib.Path("data").joinpath("dw")
+DB_PATH = DW_DIR.joinpath("block_smart_sales.db")
+PREPARED_DATA_DIR = pathlib.Path("data").joinpath("prepared")
+SQL_PATH = pathlib.Path("scripts/schema.sql")
+
+
+class Stage(NamedTuple):
+    """One step of the pipeline: what to run, what it waits for and where it runs."""
+    func: Callable[[], None]
+    depends_on: List[str]
+    executor: str  # "process" for CPU-bound prepare steps, "thread" for SQLite loads
+
+
+##############################################
+# Stage functions
+##############################################
+def build_schema() -> None:
+    """
+    Create the warehouse tables from the schema file, partition the fact tables by month,
+    dictionary-encode the low-cardinality text columns and switch the database to WAL.
+    """
+    DW_DIR.mkdir(parents=True, exist_ok=True)
+    conn = dwb.connect_dw(str(DB_PATH), profile="bulk_load")
+    try:
+        dwb.execute_sql_file(conn, SQL_PATH)
+        for table_name in dwb.PARTITIONED_TABLES:
+            dwb.partition_by_month(conn, table_name)
+        for table_name in dwb.ENCODED_COLUMNS:
+            dwb.dictionary_encode_table(conn, table_name)
+    finally:
+        conn.close()
+
+
+def load_table(stem: str, table_name: str, **load_args) -> None:
+    """Load one prepared file (in the configured staging format) on its own bulk_load connection."""
+    conn = dwb.connect_dw(str(DB_PATH), profile="bulk_load")
+    try:
+        file_path = prepared_file_path(stem, PREPARED_FORMAT, str(PREPARED_DATA_DIR))
+        dwb.file_to_dw(file_path, conn, table_name, **load_args)
+    finally:
+        conn.close()
+
+
+def refresh_rollups() -> None:
+    """Re-aggregate the rollup tables for the partitions touched by the loads."""
+    conn = dwb.connect_dw(str(DB_PATH), profile="bulk_load")
+    try:
+        dwb.refresh_rollups(conn)
+    finally:
+        conn.close()
+
+
+def finalize_warehouse() -> None:
+    """Checkpoint the WAL and leave the database on the serve profile for BI readers."""
+    conn = dwb.connect_dw(str(DB_PATH), profile="serve")
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    finally:
+        conn.close()
+
+
+# (UPDATE STAGES TO CUSTOMIZE)
+PIPELINE = {
+    "prepare_customers": Stage(prepare_customers_data.main, [], "process"),
+    "prepare_products": Stage(prepare_products_data.main, [], "process"),
+    "prepare_sales": Stage(prepare_sales_data.main, [], "process"),
+    "prepare_stores": Stage(prepare_stores_data.main, [], "process"),
+    "prepare_campaigns": Stage(prepare_campaigns_data.main, [], "process"),
+    "build_schema": Stage(build_schema, [], "thread"),
+    "load_customers": Stage(
+        functools.partial(load_table, "customers_data_prepared", "customers", incremental=True),
+        ["prepare_customers", "build_schema"], "thread"),
+    "load_products": Stage(
+        functools.partial(load_table, "products_data_prepared", "products", incremental=True),
+        ["prepare_products", "build_schema"], "thread"),
+    "load_stores": Stage(
+        functools.partial(load_table, "stores_data_prepared", "stores", incremental=True),
+        ["prepare_stores", "build_schema"], "thread"),
+    "load_campaigns": Stage(
+        functools.partial(load_table, "campaigns_data_prepared", "campaigns", incremental=True),
+        ["prepare_campaigns", "build_schema"], "thread"),
+    "load_sales": Stage(
+        functools.partial(load_table, "sales_data_prepared", "sales", incremental=True),
+        ["prepare_sales", "load_customers", "load_products", "load_stores",
+                    "load_campaigns"], "thread"),
+    "refresh_rollups": Stage(refresh_rollups, ["load_sales"], "thread"),
+    "finalize": Stage(finalize_warehouse, ["refresh_rollups"], "thread"),
+}
+
+
+##############################################
+# Scheduler
+##############################################
+def timed_call(func: Callable[[], None]) -> float:
+    """Run a stage function and return its wall-clock seconds (runs inside the worker)."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def critical_path_seconds(stages: dict, timings: dict) -> float:
+    """Length of the longest dependency chain through the graph, using the measured timings."""
+    finish = {}
+
+    def finish_time(name: str) -> float:
+        if name not in finish:
+            deps = stages[name].depends_on
+            finish[name] = timings[name] + max((finish_time(dep) for dep in deps), default=0.0)
+        return finish[name]
+
+    return max((finish_time(name) for name in stages), default=0.0)
+
+
+def run_stages(stages: dict, max_workers: int = None) -> dict:
+    """
+    Run pipeline stages as soon as their dependencies finish.
+
+    Args:
+        stages (dict): Stage name -> Stage.
+        max_workers (int, optional): Worker limit for each pool. Defaults to the executor defaults.
+
+    Returns:
+        dict: Stage name -> elapsed seconds.
+
+    Raises:
+        ValueError: If a stage depends on an unknown stage or the graph has a cycle.
+    """
+    for name, stage in stages.items():
+        unknown = [dep for dep in stage.depends_on if dep not in stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s): {', '.join(unknown)}")
+
+    timings = {}
+    running = {}
+    with ProcessPoolExecutor(max_workers) as processes, ThreadPoolExecutor(max_workers) as threads:
+        pools = {"process": processes, "thread": threads}
+        while len(timings) < len(stages):
+            for name, stage in stages.items():
+                ready = all(dep in timings for dep in stage.depends_on)
+                if ready and name not in timings and name not in running.values():
+                    logger.info(f"Starting stage '{name}'")
+                    running[pools[stage.executor].submit(timed_call, stage.func)] = name
+            if not running:
+                pending = [name for name in stages if name not in timings]
+                raise ValueError(f"Dependency cycle between stages: {', '.join(pending)}")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    timings[name] = future.result()
+                except Exception as e:
+                    logger.error(f"Stage '{name}' failed: {e}")
+                    raise
+                logger.info(f"Stage '{name}' finished in {timings[name]:.2f}s")
+    return timings
+
+
+##############################################
+# Main Execution
+##############################################
+def main() -> None:
+    """Run the full ETL pipeline and log stage timings."""
+    logger.info("Starting ETL pipeline...")
+    start = time.perf_counter()
+    timings = run_stages(PIPELINE)
+    wall = time.perf_counter() - start
+    logger.info(f"ETL pipeline complete in {wall:.2f}s "
+                f"(sum of stages {sum(timings.values()):.2f}s, "
+                f"critical path {critical_path_seconds(PIPELINE, timings):.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
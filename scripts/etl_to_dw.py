@@ -1,4 +1,3 @@
-import sqlite3
 import pathlib
 import sys
 import os
@@ -10,6 +9,7 @@ sys.path.append(parent_dir)
  
 # Local Imports
 from utils.logger import logger
+from utils.staging import PREPARED_FORMAT, prepared_file_path
 import dwbuilder as dwb
 
 ##############################################
@@ -23,13 +23,15 @@ SQL_PATH = pathlib.Path("scripts/schema.sql")
 # Ensure the DW directory exists
 DW_DIR.mkdir(parents=True, exist_ok=True)
 
-# Connect to the database
-conn = sqlite3.connect(str(DB_PATH))
+# Connect to the database (tuned for BI readers between loads)
+conn = dwb.connect_dw(str(DB_PATH), profile="serve")
 
-# Construct the full paths to the CSV files (UPDATE SOURCES TO CUSTOMIZE)
-customers_csv_path = PREPARED_DATA_DIR.joinpath("customers_data_prepared.csv")
-products_csv_path = PREPARED_DATA_DIR.joinpath("products_data_prepared.csv")
-sales_csv_path = PREPARED_DATA_DIR.joinpath("sales_data_prepared.csv")
+# Construct the full paths to the prepared files in the staging format (UPDATE SOURCES TO CUSTOMIZE)
+customers_path = prepared_file_path("customers_data_prepared", PREPARED_FORMAT, str(PREPARED_DATA_DIR))
+products_path = prepared_file_path("products_data_prepared", PREPARED_FORMAT, str(PREPARED_DATA_DIR))
+stores_path = prepared_file_path("stores_data_prepared", PREPARED_FORMAT, str(PREPARED_DATA_DIR))
+campaigns_path = prepared_file_path("campaigns_data_prepared", PREPARED_FORMAT, str(PREPARED_DATA_DIR))
+sales_path = prepared_file_path("sales_data_prepared", PREPARED_FORMAT, str(PREPARED_DATA_DIR))
 
 ################################################
 # Execution Scripts
@@ -37,13 +39,29 @@ sales_csv_path = PREPARED_DATA_DIR.joinpath("sales_data_prepared.csv")
 # Build the data warehouse from the schema file
 dwb.execute_sql_file(conn, SQL_PATH)
 
-# Load data from 'customers.csv' into the 'customers' table (UPDATE ARGUMENTS TO CUSTOMIZE)
-dwb.csv_to_dw(str(customers_csv_path), conn, "customers", delete_first=True)
+# Store the fact tables as monthly partitions behind views of the same name (a no-op once done)
+for table_name in dwb.PARTITIONED_TABLES:
+    dwb.partition_by_month(conn, table_name)
 
-# Load data from 'products.csv' into the 'products' table, without deleting existing records.
-dwb.csv_to_dw(str(products_csv_path), conn, "products", delete_first=True)
+# Store low-cardinality text columns as integer codes behind views of the same name (a no-op once done)
+for table_name in dwb.ENCODED_COLUMNS:
+    dwb.dictionary_encode_table(conn, table_name)
 
-# Load data from 'sales.csv' into the 'sales' table, deleting existing records.
-dwb.csv_to_dw(str(sales_csv_path), conn, "sales", delete_first=True)
+# Switch to the bulk_load profile for the loads, then back to serve (phase timings are logged)
+with dwb.bulk_load_session(conn) as timings:
+    # Load the dimension files incrementally (UPDATE ARGUMENTS TO CUSTOMIZE): an unchanged file is skipped,
+    # a changed one is upserted and marks every rollup for a full rebuild.
+    dwb.file_to_dw(customers_path, conn, "customers", incremental=True)
+    dwb.file_to_dw(products_path, conn, "products", incremental=True)
+    dwb.file_to_dw(stores_path, conn, "stores", incremental=True)
+    dwb.file_to_dw(campaigns_path, conn, "campaigns", incremental=True)
+
+    # Load data from the prepared sales file into the 'sales' table incrementally: an unchanged file is skipped,
+    # otherwise only new or changed transaction_ids are written.
+    dwb.file_to_dw(sales_path, conn, "sales", incremental=True)
+
+    # Re-aggregate the rollup tables for the sale dates and customers the loads touched
+    with dwb.timed_phase("refresh_rollups", timings):
+        dwb.refresh_rollups(conn)
 
 conn.close()
@@ -4,7 +4,8 @@ CREATE TABLE IF NOT EXISTS customers (
     region TEXT,
     join_date TEXT,
     sex TEXT,
-    age INTEGER
+    age INTEGER,
+    join_date_key INTEGER  -- YYYYMMDD key into dim_date, computed by the loader
 );
 
 CREATE TABLE IF NOT EXISTS products (
@@ -13,7 +14,27 @@ CREATE TABLE IF NOT EXISTS products (
     category TEXT,
     unit_price REAL,
     wholesale_price REAL,
-    supplier TEXT
+    supplier TEXT,
+    profit_margin REAL  -- unit_price - wholesale_price, computed by the loader
+);
+
+CREATE TABLE IF NOT EXISTS stores (
+    store_id INTEGER PRIMARY KEY,
+    store_name TEXT,
+    region TEXT,
+    city TEXT,
+    state TEXT,
+    square_feet INTEGER
+);
+
+-- Marketing campaigns; campaign_id 0 is "No Campaign", the baseline campaign lift is measured against
+CREATE TABLE IF NOT EXISTS campaigns (
+    campaign_id INTEGER PRIMARY KEY,
+    campaign_name TEXT,
+    channel TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    budget REAL
 );
 
 CREATE TABLE IF NOT EXISTS sales (
@@ -25,6 +46,110 @@ CREATE TABLE IF NOT EXISTS sales (
     store_id INTEGER,
     loyalty_points INTEGER,
     payment_type TEXT,
+    -- Derived by the loader from the products dimension (see dwbuilder.sales_derived_columns)
+    unit_price REAL,
+    profit_margin REAL,
+    quantity REAL,  -- sale_amount / unit_price
+    sale_profit REAL,  -- quantity * profit_margin
+    sale_date_key INTEGER,  -- YYYYMMDD key into dim_date
+    campaign_id INTEGER,  -- 0 = no campaign
     FOREIGN KEY (customer_id) REFERENCES customers (customer_id),
-    FOREIGN KEY (product_id) REFERENCES products (product_id)
-);
\ No newline at end of file
+    FOREIGN KEY (product_id) REFERENCES products (product_id),
+    FOREIGN KEY (store_id) REFERENCES stores (store_id),
+    FOREIGN KEY (campaign_id) REFERENCES campaigns (campaign_id)
+);
+
+-- Analytical indexes on the fact table. Bulk loads can defer these with
+-- dwbuilder.csv_to_dw(..., defer_indexes=True) and rebuild them afterwards.
+CREATE INDEX IF NOT EXISTS idx_sales_sale_date ON sales (sale_date);
+CREATE INDEX IF NOT EXISTS idx_sales_store_id ON sales (store_id);
+CREATE INDEX IF NOT EXISTS idx_sales_customer_id ON sales (customer_id);
+CREATE INDEX IF NOT EXISTS idx_sales_product_id ON sales (product_id);
+CREATE INDEX IF NOT EXISTS idx_sales_sale_date_key ON sales (sale_date_key);
+CREATE INDEX IF NOT EXISTS idx_sales_campaign_id ON sales (campaign_id);
+
+-- Calendar dimension, one row per day, filled by the loader (dwbuilder.extend_date_dimension)
+-- to cover every loaded date. Join on date_key = sales.sale_date_key or customers.join_date_key.
+CREATE TABLE IF NOT EXISTS dim_date (
+    date_key INTEGER PRIMARY KEY,  -- YYYYMMDD
+    full_date TEXT,  -- YYYY-MM-DD
+    year INTEGER,
+    quarter INTEGER,
+    month INTEGER,
+    month_name TEXT,
+    year_month TEXT,  -- YYYY-MM
+    week_of_year INTEGER,  -- ISO week
+    day_of_month INTEGER,
+    day_of_week INTEGER,  -- ISO: Monday = 1
+    day_name TEXT,
+    is_weekend INTEGER,
+    fiscal_year INTEGER,  -- named after the calendar year it ends in
+    fiscal_quarter INTEGER,
+    iso_year INTEGER  -- year of the ISO week, e.g. 2025 for 2024-12-31 (ISO week 2025-W01)
+);
+
+-- Materialized rollups for BI, maintained by dwbuilder.refresh_rollups(). Only the
+-- sale dates and customers touched by a load are re-aggregated. Quantity is
+-- sale_amount / unit_price and sale_profit is quantity * (unit_price - wholesale_price).
+-- region is NULL for sales whose customer is not in the customers table.
+CREATE TABLE IF NOT EXISTS rollup_daily_sales (
+    sale_date TEXT,
+    store_id INTEGER,
+    product_id INTEGER,
+    region TEXT,
+    transactions INTEGER,
+    sale_amount REAL,
+    quantity REAL,
+    sale_profit REAL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_daily_sales_sale_date ON rollup_daily_sales (sale_date);
+
+-- Per-store daily totals for store dashboards, a few rows per day
+CREATE TABLE IF NOT EXISTS rollup_store_daily (
+    sale_date TEXT,
+    store_id INTEGER,
+    transactions INTEGER,
+    sale_amount REAL,
+    sale_profit REAL,
+    PRIMARY KEY (sale_date, store_id)
+);
+
+-- Per-day totals by campaign, customer region and store; campaign_lift compares each campaign with
+-- the no-campaign baseline in the same region and store
+CREATE TABLE IF NOT EXISTS rollup_campaign_daily (
+    sale_date TEXT,
+    campaign_id INTEGER,
+    region TEXT,
+    store_id INTEGER,
+    transactions INTEGER,
+    sale_amount REAL,
+    sale_profit REAL
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_campaign_daily_sale_date ON rollup_campaign_daily (sale_date);
+
+CREATE VIEW IF NOT EXISTS campaign_lift AS
+WITH totals AS (
+    SELECT campaign_id, region, store_id,
+           SUM(transactions) AS transactions, SUM(sale_amount) AS sale_amount, SUM(sale_profit) AS sale_profit
+    FROM rollup_campaign_daily
+    GROUP BY campaign_id, region, store_id
+)
+SELECT t.campaign_id, t.region, t.store_id, t.transactions, t.sale_amount, t.sale_profit,
+       t.sale_amount / t.transactions AS avg_sale_amount,
+       b.sale_amount / b.transactions AS baseline_avg_sale_amount,
+       t.sale_amount / t.transactions - b.sale_amount / b.transactions AS sale_amount_lift,
+       t.sale_profit / t.transactions - b.sale_profit / b.transactions AS sale_profit_lift
+FROM totals t
+LEFT JOIN totals b ON b.campaign_id = 0 AND b.region IS t.region AND b.store_id = t.store_id
+WHERE t.campaign_id <> 0;
+
+CREATE TABLE IF NOT EXISTS rollup_customer_value (
+    customer_id INTEGER PRIMARY KEY,
+    region TEXT,
+    transactions INTEGER,
+    sale_amount REAL,
+    quantity REAL,
+    sale_profit REAL,
+    first_sale_date TEXT,
+    last_sale_date TEXT
+);
@@ -0,0 +1,83 @@
+r"""
+tests/test_data_profiler.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_data_profiler.py
+    python3 tests\test_data_profiler.py
+
+This test suite checks the single-pass profiler against the equivalent pandas calls.
+"""
+
+import unittest
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.data_profiler import DataProfiler, HyperLogLog, profile_file, profile_frames  # noqa: E402
+
+SALES_CSV = PROJECT_ROOT.joinpath("data", "prepared", "sales_data_prepared.csv")
+
+
+class TestDataProfiler(unittest.TestCase):
+
+    def setUp(self):
+        """Load the prepared sales sample with one duplicated row and one missing value."""
+        df = pd.read_csv(SALES_CSV, parse_dates=["SaleDate"])
+        df.loc[3, "SaleAmount"] = None
+        self.df = pd.concat([df, df.iloc[[0]]], ignore_index=True)
+
+    def test_profile_matches_pandas(self):
+        result = profile_frames([self.df])
+        columns = result["columns"]
+        self.assertEqual(result["rows"], len(self.df), "Row count incorrect")
+        self.assertEqual(result["duplicate_count"], self.df.duplicated().sum(), "Duplicate count incorrect")
+        self.assertEqual(columns["null_count"].tolist(), self.df.isnull().sum().tolist(), "Null counts incorrect")
+        self.assertAlmostEqual(columns.loc["SaleAmount", "mean"], self.df["SaleAmount"].mean(), msg="Mean incorrect")
+        self.assertAlmostEqual(columns.loc["SaleAmount", "std"], self.df["SaleAmount"].std(), msg="Std incorrect")
+        self.assertEqual(columns.loc["SaleDate", "max"], self.df["SaleDate"].max(), "Datetime max incorrect")
+        self.assertEqual(columns.loc["StoreID", "distinct_estimate"], self.df["StoreID"].nunique(),
+                         "Distinct estimate should be exact for a handful of values")
+
+    def test_chunked_profile_matches_single_chunk(self):
+        whole = profile_frames([self.df])
+        chunked = profile_frames(self.df.iloc[start:start + 7] for start in range(0, len(self.df), 7))
+        self.assertEqual(chunked["duplicate_count"], whole["duplicate_count"], "Cross-chunk duplicates missed")
+        pd.testing.assert_frame_equal(chunked["columns"].drop(columns=["mean", "std"]),
+                                      whole["columns"].drop(columns=["mean", "std"]))
+        np.testing.assert_allclose(chunked["columns"]["std"].astype(float), whole["columns"]["std"].astype(float))
+
+    def test_dtype_change_between_chunks_counts_values_once(self):
+        # read_csv gives int64 for a chunk without missing values and float64 for one with
+        chunks = [pd.DataFrame({"ID": [1, 2], "Amount": [5, 6]}),
+                  pd.DataFrame({"ID": [1, 3], "Amount": [5.0, np.nan]})]
+        result = profile_frames(chunks)
+        self.assertEqual(result["duplicate_count"], 1, "Row repeated across chunks not counted")
+        self.assertEqual(result["columns"].loc["Amount", "distinct_estimate"], 2, "Same value counted twice")
+
+    def test_profile_file_reads_in_chunks(self):
+        result = profile_file(str(SALES_CSV), chunksize=10)
+        self.assertEqual(result["rows"], len(pd.read_csv(SALES_CSV)), "File not fully profiled")
+
+    def test_mismatched_chunk_columns_rejected(self):
+        profiler = DataProfiler().update(self.df)
+        with self.assertRaises(ValueError):
+            profiler.update(self.df.drop(columns=["SaleDate"]))
+
+    def test_hyperloglog_estimate_is_close(self):
+        sketch = HyperLogLog()
+        values = pd.Series(np.arange(200_000))
+        sketch.update(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        self.assertLess(abs(sketch.estimate() - 200_000) / 200_000, 0.05, "HyperLogLog estimate too far off")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
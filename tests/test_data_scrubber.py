@@ -14,6 +14,7 @@ import unittest
 import pathlib
 import sys
 from io import StringIO
+from unittest import mock
 import pandas as pd
 
 # For local imports, temporarily add project root to Python sys.path
@@ -22,7 +23,8 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 # Import DataScrubber from the scripts module
-from scripts.data_scrubber import DataScrubber  # noqa: E402
+from scripts import data_scrubber  # noqa: E402
+from scripts.data_scrubber import DataScrubber, optimize_plan  # noqa: E402
 
 # Create a fake CSV file using StringIO
 csv_data = StringIO("""
@@ -103,6 +105,11 @@ class TestDataScrubber(unittest.TestCase):
         df_no_duplicates = self.scrubber.remove_duplicate_records()
         self.assertEqual(df_no_duplicates.duplicated().sum(), 0, "Duplicates not removed correctly")
 
+    def test_remove_duplicate_records_by_key(self):
+        df_no_duplicates = self.scrubber.remove_duplicate_records(subset=['ID'])
+        self.assertEqual(df_no_duplicates['ID'].duplicated().sum(), 0, "Duplicate keys not removed correctly")
+        self.assertEqual(df_no_duplicates['Score'].iloc[-1], 25, "First occurrence of the key not kept")
+
     def test_rename_columns(self):
         df_renamed = self.scrubber.rename_columns({'ID': 'Identifier', 'Name': 'FullName'})
         self.assertIn('Identifier', df_renamed.columns, "Column ID not renamed correctly")
@@ -112,6 +119,55 @@ class TestDataScrubber(unittest.TestCase):
         df_reordered = self.scrubber.reorder_columns(['Name', 'ID', 'Date'])
         self.assertEqual(df_reordered.columns.tolist(), ['Name', 'ID', 'Date'], "Columns not reordered correctly")
 
+    def run_cleaning_chain(self, scrubber: DataScrubber, workers: int = None) -> pd.DataFrame:
+        """Run the same ten-step cleaning chain in either mode and return the result."""
+        scrubber.rename_columns({'Name': 'FullName'})
+        scrubber.format_column_strings_to_lower_and_trim('FullName')
+        scrubber.handle_missing_data(fill_value=0)
+        scrubber.filter_column_outliers('Score', 10, 25)
+        scrubber.filter_column_outliers('ID', 1, 5)
+        scrubber.parse_dates_to_add_standard_datetime('Date')
+        scrubber.drop_columns(['Date'])
+        scrubber.convert_column_to_new_data_type('Score', 'int64')
+        scrubber.remove_duplicate_records()
+        scrubber.reorder_columns(['StandardDateTime', 'FullName', 'Score'])
+        return scrubber.collect(workers)
+
+    def test_lazy_mode_matches_eager_mode(self):
+        df_eager = self.run_cleaning_chain(DataScrubber(df.copy()))
+        df_lazy = self.run_cleaning_chain(DataScrubber(df.copy(), lazy=True))
+        pd.testing.assert_frame_equal(df_lazy, df_eager)
+
+    def test_lazy_mode_merges_filters_and_pushes_down_projections(self):
+        scrubber = DataScrubber(df.copy(), lazy=True)
+        scrubber.filter_column_outliers('Score', 10, 25).drop_columns(['Date']).filter_column_outliers('ID', 1, 3)
+        optimized = optimize_plan(list(df.columns), scrubber.plan)
+        self.assertEqual(len(optimized['steps']), 1, "Adjacent filters not merged into one step")
+        self.assertNotIn('Date', optimized['source_columns'], "Dropped column still read from the source")
+
+    def test_lazy_mode_reports_missing_columns_on_collect(self):
+        scrubber = DataScrubber(df.copy(), lazy=True)
+        scrubber.drop_columns(['Score']).filter_column_outliers('Score', 10, 25)
+        with self.assertRaises(ValueError):
+            scrubber.collect()
+
+    def test_partitioned_collect_matches_single_process(self):
+        # Repeat the sample so every partition holds rows, duplicates and missing values
+        df_large = pd.concat([df] * 50, ignore_index=True)
+        expected = self.run_cleaning_chain(DataScrubber(df_large.copy(), lazy=True))
+        with mock.patch.object(data_scrubber, 'MIN_PARALLEL_ROWS', 0):
+            result = self.run_cleaning_chain(DataScrubber(df_large.copy(), lazy=True), workers=3)
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_partitioned_collect_falls_back_to_pickle(self):
+        # Mixed-type object columns cannot be sent as Arrow data
+        df_mixed = pd.DataFrame({'ID': range(10), 'Code': [1, 'a'] * 5})
+        with mock.patch.object(data_scrubber, 'MIN_PARALLEL_ROWS', 0):
+            scrubber = DataScrubber(df_mixed.copy(), lazy=True)
+            scrubber.filter_column_outliers('ID', 2, 7)
+            result = scrubber.collect(workers=2)
+        pd.testing.assert_frame_equal(result, df_mixed.iloc[2:8])
+
 
 # Run the tests with verbosity=2 for detailed output
 if __name__ == "__main__":
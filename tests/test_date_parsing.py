@@ -0,0 +1,66 @@
+r"""
+tests/test_date_parsing.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_date_parsing.py
+    python3 tests\test_date_parsing.py
+
+This test suite checks the cached-format date parser against pd.to_datetime.
+"""
+
+import unittest
+import pathlib
+import sys
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils import date_parsing  # noqa: E402
+from utils.date_parsing import clear_format_cache, infer_date_format, parse_dates  # noqa: E402
+from utils.typed_csv import read_typed_csv  # noqa: E402
+
+RAW_SALES_CSV = PROJECT_ROOT.joinpath("data", "raw", "sales_data.csv")
+
+
+class TestDateParsing(unittest.TestCase):
+
+    def setUp(self):
+        clear_format_cache()
+
+    def test_parse_dates_matches_to_datetime(self):
+        dates = pd.read_csv(RAW_SALES_CSV)["SaleDate"]
+        pd.testing.assert_series_equal(parse_dates(dates), pd.to_datetime(dates, format="%m/%d/%Y"))
+
+    def test_format_is_inferred_once_and_cached(self):
+        parse_dates(pd.Series(["1/6/2024", "12/31/2024"], name="SaleDate"), source="sales")
+        self.assertEqual(date_parsing._format_cache[("sales", "SaleDate")], "%m/%d/%Y", "Format not cached")
+
+    def test_day_first_sample_picks_day_first_format(self):
+        self.assertEqual(infer_date_format(["13/01/2024", "31/12/2024"]), "%d/%m/%Y", "Day-first format not inferred")
+
+    def test_unmatched_values_fall_back_to_per_element_parsing(self):
+        dates = pd.Series(["1/6/2024", "12/31/2024", "2024-03-05", None], name="SaleDate")
+        expected = pd.Series(pd.to_datetime(["2024-01-06", "2024-12-31", "2024-03-05", None]), name="SaleDate")
+        pd.testing.assert_series_equal(parse_dates(dates), expected)
+
+    def test_unparseable_values_raise_unless_coerced(self):
+        dates = pd.Series(["1/6/2024", "12/31/2024", "not a date"], name="SaleDate")
+        with self.assertRaises(ValueError):
+            parse_dates(dates)
+        self.assertTrue(parse_dates(dates, errors="coerce").iloc[2] is pd.NaT, "Unparseable value not coerced")
+
+    def test_typed_csv_infers_undeclared_date_formats(self):
+        expected_cols = {"TransactionID": "int64", "SaleDate": "datetime64[ns]"}
+        df = read_typed_csv(str(RAW_SALES_CSV), expected_cols)
+        declared = read_typed_csv(str(RAW_SALES_CSV), expected_cols, {"SaleDate": "%m/%d/%Y"})
+        pd.testing.assert_frame_equal(df, declared)
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,86 @@
+r"""
+tests/test_dedup.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_dedup.py
+    python3 tests\test_dedup.py
+
+This test suite checks the hash-based duplicate removal against DataFrame.drop_duplicates().
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.dedup import StreamingDeduplicator, dedup_csv_files, drop_duplicate_rows, iter_unique_chunks  # noqa: E402
+
+SALES_CSV = PROJECT_ROOT.joinpath("data", "raw", "sales_data.csv")
+
+
+class TestDedup(unittest.TestCase):
+
+    def setUp(self):
+        """Load the raw sales sample, which contains repeated transactions."""
+        self.df = pd.read_csv(SALES_CSV)
+
+    def test_drop_duplicate_rows_matches_pandas(self):
+        pd.testing.assert_frame_equal(drop_duplicate_rows(self.df), self.df.drop_duplicates())
+        pd.testing.assert_frame_equal(drop_duplicate_rows(self.df, ["TransactionID"]),
+                                      self.df.drop_duplicates(subset=["TransactionID"]))
+
+    def test_unknown_subset_column_rejected(self):
+        with self.assertRaises(ValueError):
+            drop_duplicate_rows(self.df, ["NoSuchColumn"])
+
+    def test_streaming_matches_in_memory(self):
+        expected = self.df.drop_duplicates(subset=["TransactionID"])
+        chunks = [self.df.iloc[start:start + 10] for start in range(0, len(self.df), 10)]
+        with tempfile.TemporaryDirectory() as tmp:
+            for db_path in (None, str(pathlib.Path(tmp).joinpath("seen.db"))):
+                result = pd.concat(iter_unique_chunks(chunks, ["TransactionID"], db_path))
+                pd.testing.assert_frame_equal(result, expected)
+
+    def test_on_disk_state_carries_over_between_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(pathlib.Path(tmp).joinpath("seen.db"))
+            with StreamingDeduplicator(["TransactionID"], db_path) as dedup:
+                dedup.filter(self.df)
+            with StreamingDeduplicator(["TransactionID"], db_path) as dedup:
+                self.assertEqual(len(dedup.filter(self.df)), 0, "Rows from the previous run were not remembered")
+
+    def test_dedup_csv_files_across_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = str(pathlib.Path(tmp).joinpath("sales_dedup.csv"))
+            report = dedup_csv_files([str(SALES_CSV), str(SALES_CSV)], output_path, chunksize=25)
+            result = pd.read_csv(output_path)
+        self.assertEqual(report["rows_in"], 2 * len(self.df), "Not every input row was read")
+        pd.testing.assert_frame_equal(result, self.df.drop_duplicates().reset_index(drop=True))
+
+    def test_dtype_change_between_chunks_still_matches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = pathlib.Path(tmp).joinpath("sales.csv")
+            input_path.write_text("id,v\n1,5\n2,6\n1,5\n3,\n")
+            # v is read as int64 in the first chunk and as float64 in the second, which has a missing value
+            with pd.read_csv(input_path, chunksize=2) as reader:
+                self.assertEqual([chunk["v"].dtype.kind for chunk in reader], ["i", "f"])
+            output_path = str(pathlib.Path(tmp).joinpath("dedup.csv"))
+            report = dedup_csv_files([str(input_path)], output_path, chunksize=2)
+            with pd.read_csv(input_path, chunksize=2) as reader:
+                streamed = pd.concat(iter_unique_chunks(reader))
+            expected = pd.read_csv(input_path).drop_duplicates()
+        self.assertEqual(report["rows_out"], len(expected))
+        self.assertEqual(streamed["id"].tolist(), [1, 2, 3])
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
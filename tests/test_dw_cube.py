@@ -0,0 +1,152 @@
+r"""
+tests/test_dw_cube.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_dw_cube.py
+    python3 tests\test_dw_cube.py
+
+This test suite loads the prepared sample data into a throwaway SQLite warehouse
+and checks that cube queries answered from the rollups match the fact table, and
+that cached results are invalidated by loads.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import pandas as pd
+
+# For local imports, temporarily add project root and scripts folder to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+for path in (PROJECT_ROOT, PROJECT_ROOT.joinpath("scripts")):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+import dw_cube  # noqa: E402
+from dw_cube import SalesCube, FACT_TABLE  # noqa: E402
+
+dwb = dw_cube.dwb
+
+SQL_PATH = PROJECT_ROOT.joinpath("scripts", "schema.sql")
+PREPARED_DATA_DIR = PROJECT_ROOT.joinpath("data", "prepared")
+SALES_CSV = str(PREPARED_DATA_DIR.joinpath("sales_data_prepared.csv"))
+CUSTOMERS_CSV = str(PREPARED_DATA_DIR.joinpath("customers_data_prepared.csv"))
+PRODUCTS_CSV = str(PREPARED_DATA_DIR.joinpath("products_data_prepared.csv"))
+STORES_CSV = str(PREPARED_DATA_DIR.joinpath("stores_data_prepared.csv"))
+CAMPAIGNS_CSV = str(PREPARED_DATA_DIR.joinpath("campaigns_data_prepared.csv"))
+
+
+class TestSalesCube(unittest.TestCase):
+
+    def setUp(self):
+        """Load the sample data into a fresh in-memory warehouse and build the rollups."""
+        self.conn = sqlite3.connect(":memory:")
+        dwb.execute_sql_file(self.conn, SQL_PATH)
+        dwb.csv_to_dw(CUSTOMERS_CSV, self.conn, "customers", delete_first=True)
+        dwb.csv_to_dw(PRODUCTS_CSV, self.conn, "products", delete_first=True)
+        dwb.csv_to_dw(STORES_CSV, self.conn, "stores", delete_first=True)
+        dwb.csv_to_dw(CAMPAIGNS_CSV, self.conn, "campaigns", delete_first=True)
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True)
+        dwb.refresh_rollups(self.conn)
+        self.cube = SalesCube(self.conn)
+
+    def tearDown(self):
+        self.cube.close()
+        self.conn.close()
+
+    def fact_only(self, dimensions, measures, filters=None) -> pd.DataFrame:
+        """Answer a query from the fact table regardless of the rollups."""
+        query = dw_cube.normalize_query(dimensions, measures, filters)
+        sql, params = dw_cube.build_sql(query, FACT_TABLE)
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def test_rollup_answers_match_fact_table(self):
+        queries = [
+            (["region"], ["sale_amount", "transactions", "sale_profit", "avg_sale_amount"], None),
+            (["category", "month"], ["sale_amount", "quantity"], {"region": ["East", "West"]}),
+            ([], ["sale_amount", "customers"], None),
+            (["store_name", "month"], ["transactions", "sale_profit"], {"store_region": "West"}),
+            (["campaign_name", "region"], ["sale_amount", "avg_sale_amount"], {"channel": ["Email", "Social"]}),
+        ]
+        for dimensions, measures, filters in queries:
+            self.assertNotEqual(self.cube.plan(dimensions, measures, filters)["source"], FACT_TABLE,
+                                f"{dimensions} not routed to a rollup")
+            pd.testing.assert_frame_equal(self.cube.query(dimensions, measures, filters),
+                                          self.fact_only(dimensions, measures, filters), check_dtype=False)
+
+    def test_store_and_campaign_levels_use_their_rollups(self):
+        self.assertEqual(self.cube.plan(["store_name", "date"], ["sale_amount", "sale_profit"])["source"],
+                         dw_cube.STORE, "Store query not answered from the per-store daily rollup")
+        self.assertEqual(self.cube.plan(["store", "category"], ["sale_amount"])["source"], dw_cube.DAILY)
+        self.assertEqual(self.cube.plan(["campaign", "store"], ["sale_profit"])["source"], dw_cube.CAMPAIGN)
+
+    def test_fact_only_level_and_pending_refresh_use_fact_table(self):
+        self.assertEqual(self.cube.plan(["payment_type"], ["sale_amount"])["source"], FACT_TABLE,
+                         "Level missing from every rollup not answered from the fact table")
+        dwb.mark_dirty(self.conn, "sales", {"sale_date": {"2024-01-06"}})
+        self.assertEqual(self.cube.plan(["region"], ["sale_amount"])["source"], FACT_TABLE,
+                         "Stale rollup used while a refresh is pending")
+
+    def test_repeated_query_is_cached_and_load_invalidates_it(self):
+        first = self.cube.query(["store"], ["sale_amount"])
+        first.loc[0, "sale_amount"] = -1.0  # Callers get a copy, never the cached frame
+        pd.testing.assert_frame_equal(self.cube.query(["store"], ["sale_amount"]), self.fact_only(["store"], ["sale_amount"]))
+        self.assertEqual(self.cube.cache_info()["hits"], 1, "Repeated query not served from the cache")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = pathlib.Path(tmp).joinpath("sales.csv")
+            pd.read_csv(SALES_CSV).assign(SaleAmount=1.0).to_csv(csv_path, index=False)
+            dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True)
+        dwb.refresh_rollups(self.conn)
+        result = self.cube.query(["store"], ["sale_amount"])
+        self.assertEqual(self.cube.cache_info()["hits"], 1, "Cached result served after a load")
+        pd.testing.assert_series_equal(result["sale_amount"], self.fact_only(["store"], ["transactions"])["transactions"],
+                                       check_names=False, check_dtype=False)
+
+    def test_date_predicates_prune_fact_partitions(self):
+        dwb.partition_by_month(self.conn, "sales")
+        queries = [
+            (["payment_type"], ["sale_amount"], None, ("2024-03-15", "2024-04-10")),
+            (["payment_type", "month"], ["transactions"], {"month": ["2024-02", "2024-07"]}, None),
+        ]
+        for dimensions, measures, filters, date_range in queries:
+            plan = self.cube.plan(dimensions, measures, filters, date_range)
+            self.assertEqual(len(plan["partitions"]), 2, "Date predicate not pruned to two monthly partitions")
+            expected = pd.read_sql_query(dw_cube.build_sql(dw_cube.normalize_query(dimensions, measures, filters, date_range),
+                                                           FACT_TABLE)[0], self.conn, params=plan["params"])
+            pd.testing.assert_frame_equal(self.cube.query(dimensions, measures, filters, date_range), expected)
+        self.assertIsNone(self.cube.plan(["payment_type"], ["sale_amount"])["partitions"], "Unfiltered query was pruned")
+
+    def test_calendar_levels_come_from_date_dimension(self):
+        result = self.cube.query(["quarter"], ["transactions"], date_range=("2024-01-01", "2024-06-30"))
+        dates = pd.to_datetime(pd.read_csv(SALES_CSV)["SaleDate"])
+        dates = dates[dates <= "2024-06-30"]
+        expected = dates.dt.year.astype(str) + "-Q" + dates.dt.quarter.astype(str)
+        self.assertEqual(dict(zip(result["quarter"], result["transactions"])), expected.value_counts().to_dict(),
+                         "Quarterly counts do not match the sales file")
+
+    def test_week_level_uses_the_iso_year(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = pathlib.Path(tmp).joinpath("sales.csv")
+            sales = pd.read_csv(SALES_CSV).head(3)
+            # 2024-12-30 and 2024-12-31 are in ISO week 2025-W01, not with the sample's first days in 2024-W01
+            sales.assign(TransactionID=[9001, 9002, 9003], SaleDate=["2024-12-30", "2024-12-31", "2025-01-02"]) \
+                .to_csv(csv_path, index=False)
+            dwb.csv_to_dw(str(csv_path), self.conn, "sales")
+        result = self.cube.query(["week"], ["transactions"], date_range=("2024-01-01", "2025-01-05"))
+        weeks = dict(zip(result["week"], result["transactions"]))
+        self.assertEqual(weeks["2025-W01"], 3, "Days of ISO week 2025-W01 split across years")
+        dates = pd.to_datetime(pd.read_csv(SALES_CSV)["SaleDate"])
+        self.assertEqual(weeks.get("2024-W01", 0), int((dates.dt.isocalendar().week == 1).sum()))
+
+    def test_unknown_names_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.cube.query(["planet"], ["sale_amount"])
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
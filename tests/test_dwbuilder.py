@@ -0,0 +1,455 @@
+r"""
+tests/test_dwbuilder.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_dwbuilder.py
+    python3 tests\test_dwbuilder.py
+
+This test suite loads the prepared sample data into throwaway SQLite warehouses
+built from scripts/schema.sql and verifies the dwbuilder load paths.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import importlib.util
+from unittest import mock
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts import dwbuilder as dwb  # noqa: E402
+from utils.staging import write_prepared  # noqa: E402
+
+SQL_PATH = PROJECT_ROOT.joinpath("scripts", "schema.sql")
+PREPARED_DATA_DIR = PROJECT_ROOT.joinpath("data", "prepared")
+SALES_CSV = str(PREPARED_DATA_DIR.joinpath("sales_data_prepared.csv"))
+CUSTOMERS_CSV = str(PREPARED_DATA_DIR.joinpath("customers_data_prepared.csv"))
+PRODUCTS_CSV = str(PREPARED_DATA_DIR.joinpath("products_data_prepared.csv"))
+STORES_CSV = str(PREPARED_DATA_DIR.joinpath("stores_data_prepared.csv"))
+CAMPAIGNS_CSV = str(PREPARED_DATA_DIR.joinpath("campaigns_data_prepared.csv"))
+
+
+def fetch_table(conn: sqlite3.Connection, table_name: str) -> list:
+    """Return every row of a table in a stable order."""
+    return sorted(conn.execute(f"SELECT * FROM {table_name}").fetchall(), key=repr)
+
+
+class TestDwBuilder(unittest.TestCase):
+
+    def setUp(self):
+        """Build a fresh in-memory warehouse from the schema file before each test."""
+        self.conn = sqlite3.connect(":memory:")
+        dwb.execute_sql_file(self.conn, SQL_PATH)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_csv_to_dw_chunked_matches_full_load(self):
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True)
+        expected = fetch_table(self.conn, "sales")
+
+        report = dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True, chunksize=7)
+        self.assertEqual(fetch_table(self.conn, "sales"), expected, "Chunked load does not match full load")
+        self.assertEqual(report["rows"], len(expected), "Report row count does not match rows loaded")
+        self.assertGreater(report["chunks"], 1, "File was not streamed in chunks")
+
+    def test_executemany_engine_matches_to_sql(self):
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True, engine="to_sql")
+        expected = fetch_table(self.conn, "sales")
+
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True, engine="executemany", batch_size=10)
+        self.assertEqual(fetch_table(self.conn, "sales"), expected, "executemany load does not match to_sql load")
+
+    def test_column_to_sql_values_handles_missing_and_dates(self):
+        dates = pd.Series(pd.to_datetime(["2024-01-06", None]))
+        self.assertEqual(dwb.column_to_sql_values(dates), ["2024-01-06", None], "Dates not converted to ISO strings")
+        self.assertEqual(dwb.column_to_sql_values(pd.Series([1.5, None])), [1.5, None], "NaN not converted to None")
+        self.assertIsInstance(dwb.column_to_sql_values(pd.Series([1, 2]))[0], int, "Integers not converted to int")
+
+    def test_bulk_load_session_switches_profiles(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = dwb.connect_dw(pathlib.Path(tmp).joinpath("dw.db"), profile="serve")
+            dwb.execute_sql_file(conn, SQL_PATH)
+            with dwb.bulk_load_session(conn) as timings:
+                self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 0, "bulk_load profile not applied")
+                dwb.csv_to_dw(SALES_CSV, conn, "sales", delete_first=True)
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal", "WAL not enabled")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1, "serve profile not restored")
+            self.assertIn("load", timings, "Load phase was not timed")
+            conn.close()
+
+    def test_deferred_indexes_are_rebuilt_and_foreign_keys_checked(self):
+        index_names = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'sales' AND sql IS NOT NULL"
+        expected_indexes = sorted(self.conn.execute(index_names).fetchall())
+        dwb.csv_to_dw(CUSTOMERS_CSV, self.conn, "customers", delete_first=True)
+        dwb.csv_to_dw(PRODUCTS_CSV, self.conn, "products", delete_first=True)
+
+        report = dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True, defer_indexes=True)
+        self.assertEqual(sorted(self.conn.execute(index_names).fetchall()), expected_indexes, "Indexes not rebuilt")
+        # Customers filtered out as outliers still have sales in the prepared data
+        self.assertGreater(report["fk_violations"], 0, "Orphaned sales not reported by the foreign key check")
+
+    def test_incremental_load_skips_unchanged_and_upserts_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = pathlib.Path(tmp).joinpath("sales.csv")
+            df = pd.read_csv(SALES_CSV)
+            df.to_csv(csv_path, index=False)
+            first = dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True)
+            second = dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True)
+            self.assertFalse(first["skipped"], "First incremental load should not be skipped")
+            self.assertTrue(second["skipped"], "Unchanged file was loaded again")
+
+            # Change one existing sale and add a new one
+            df.loc[0, "SaleAmount"] = 1.0
+            new_row = df.iloc[[1]].assign(TransactionID=df["TransactionID"].max() + 1)
+            pd.concat([df, new_row]).to_csv(csv_path, index=False)
+            third = dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True)
+
+        self.assertFalse(third["skipped"], "Changed file was skipped")
+        first_id = int(df.loc[0, "TransactionID"])
+        amount = self.conn.execute("SELECT sale_amount FROM sales WHERE transaction_id = ?", (first_id,)).fetchone()[0]
+        self.assertEqual(amount, 1.0, "Changed row was not updated")
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM sales").fetchone()[0], len(df) + 1, "New row not added")
+        state = dwb.get_load_state(self.conn, str(csv_path), "sales")
+        self.assertEqual(state["rows_loaded"], len(df) + 1, "Row count of the changed file not recorded")
+
+    def test_convert_to_sql_format(self):
+        df = pd.DataFrame(columns=["TransactionID", "SaleDate", "Unit Price"])
+        dwb.convert_to_sql_format(df)
+        self.assertEqual(list(df.columns), ["transaction_id", "sale_date", "unit_price"], "Columns not converted")
+
+    def test_convert_to_sql_format_rejects_collisions(self):
+        df = pd.DataFrame(columns=["SaleDate", "sale_date"])
+        with self.assertRaises(ValueError):
+            dwb.convert_to_sql_format(df)
+
+    def test_rollups_refresh_only_touched_partitions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = pathlib.Path(tmp).joinpath("sales.csv")
+            df = pd.read_csv(SALES_CSV)
+            df.to_csv(csv_path, index=False)
+            dwb.csv_to_dw(CUSTOMERS_CSV, self.conn, "customers", incremental=True)
+            dwb.csv_to_dw(PRODUCTS_CSV, self.conn, "products", incremental=True)
+            dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True)
+            self.assertEqual(dwb.refresh_rollups(self.conn)["rollup_daily_sales"], "full", "First refresh not full")
+
+            # Move one sale to another date and customer, and add a new sale
+            df.loc[0, ["SaleDate", "CustomerID", "SaleAmount"]] = ["2024-12-30", 1001, 1.0]
+            new_row = df.iloc[[1]].assign(TransactionID=df["TransactionID"].max() + 1)
+            pd.concat([df, new_row]).to_csv(csv_path, index=False)
+            dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True)
+            report = dwb.refresh_rollups(self.conn)
+
+        self.assertLess(report["rollup_daily_sales"], df["SaleDate"].nunique(), "Every sale date was refreshed")
+        incremental = {table: fetch_table(self.conn, table) for table in dwb.ROLLUPS}
+        dwb.mark_dirty(self.conn, "sales")
+        dwb.refresh_rollups(self.conn)
+        for table in dwb.ROLLUPS:
+            self.assertEqual(incremental[table], fetch_table(self.conn, table), f"{table} differs from a full rebuild")
+
+    def test_store_daily_rollup_matches_fact_and_refreshes_touched_dates(self):
+        dwb.csv_to_dw(PRODUCTS_CSV, self.conn, "products", delete_first=True)
+        dwb.csv_to_dw(STORES_CSV, self.conn, "stores", delete_first=True)
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True)
+        dwb.refresh_rollups(self.conn)
+        by_store_day = """SELECT sale_date, store_id, COUNT(*), SUM(sale_amount), SUM(sale_profit)
+                          FROM sales GROUP BY sale_date, store_id"""
+        self.assertEqual(fetch_table(self.conn, "rollup_store_daily"), fetch_table(self.conn, f"({by_store_day})"))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = pathlib.Path(tmp).joinpath("sales.csv")
+            sales = pd.read_csv(SALES_CSV)
+            sales[sales["TransactionID"] == sales["TransactionID"].max()].assign(SaleAmount=1.0).to_csv(csv_path, index=False)
+            dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True)
+        self.assertEqual(dwb.refresh_rollups(self.conn)["rollup_store_daily"], 1, "Untouched sale dates re-aggregated")
+        self.assertEqual(fetch_table(self.conn, "rollup_store_daily"), fetch_table(self.conn, f"({by_store_day})"))
+
+    def test_campaign_lift_compares_each_campaign_with_baseline(self):
+        for csv_path, table_name in ((CUSTOMERS_CSV, "customers"), (PRODUCTS_CSV, "products"),
+                                     (CAMPAIGNS_CSV, "campaigns"), (SALES_CSV, "sales")):
+            dwb.csv_to_dw(csv_path, self.conn, table_name, delete_first=True)
+        dwb.refresh_rollups(self.conn)
+        self.assertEqual(self.conn.execute("SELECT COUNT(DISTINCT campaign_id) FROM sales").fetchone()[0],
+                         pd.read_csv(SALES_CSV)["CampaignID"].nunique(), "campaign_id not loaded")
+
+        lift = pd.read_sql("SELECT * FROM campaign_lift", self.conn)
+        sales = pd.read_sql("SELECT s.*, c.region FROM sales s LEFT JOIN customers c USING (customer_id)", self.conn)
+        averages = sales.groupby(["campaign_id", "region", "store_id"], dropna=False)["sale_amount"].mean().reset_index()
+        baseline = averages[averages["campaign_id"] == 0].drop(columns="campaign_id")
+        expected = averages[averages["campaign_id"] != 0].merge(baseline, on=["region", "store_id"], how="left",
+                                                                suffixes=("", "_baseline"))
+        expected["lift"] = expected["sale_amount"] - expected["sale_amount_baseline"]
+        lift = lift.sort_values(["campaign_id", "region", "store_id"], na_position="first").reset_index(drop=True)
+        expected = expected.sort_values(["campaign_id", "region", "store_id"], na_position="first").reset_index(drop=True)
+        pd.testing.assert_series_equal(lift["avg_sale_amount"], expected["sale_amount"], check_names=False)
+        pd.testing.assert_series_equal(lift["sale_amount_lift"], expected["lift"], check_names=False)
+        self.assertTrue(lift["sale_amount_lift"].notna().any(), "No campaign has a baseline to compare with")
+        self.assertNotIn(0, set(lift["campaign_id"]), "Baseline listed as a campaign")
+
+    def test_sales_derived_columns_match_products_join(self):
+        dwb.csv_to_dw(PRODUCTS_CSV, self.conn, "products", delete_first=True)
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True)
+        expected = pd.read_csv(SALES_CSV).merge(pd.read_csv(PRODUCTS_CSV), on="ProductID", how="left")
+        expected["Quantity"] = expected["SaleAmount"] / expected["UnitPrice"]
+        expected["SaleProfit"] = expected["Quantity"] * (expected["UnitPrice"] - expected["WholesalePrice"])
+        stored = pd.read_sql("SELECT transaction_id, quantity, sale_profit FROM sales", self.conn)
+        merged = stored.merge(expected, left_on="transaction_id", right_on="TransactionID")
+        pd.testing.assert_series_equal(merged["quantity"], merged["Quantity"], check_names=False)
+        pd.testing.assert_series_equal(merged["sale_profit"], merged["SaleProfit"], check_names=False)
+
+    def test_product_price_change_refreshes_stored_sales_columns(self):
+        dwb.csv_to_dw(PRODUCTS_CSV, self.conn, "products", delete_first=True)
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            products_path = pathlib.Path(tmp).joinpath("products.csv")
+            pd.read_csv(PRODUCTS_CSV).assign(UnitPrice=100.0, WholesalePrice=60.0).to_csv(products_path, index=False)
+            dwb.csv_to_dw(str(products_path), self.conn, "products", incremental=True)
+        margins = self.conn.execute("SELECT DISTINCT profit_margin FROM sales WHERE unit_price IS NOT NULL").fetchall()
+        self.assertEqual(margins, [(40.0,)], "Stored sales columns not refreshed after a price change")
+
+    def test_older_warehouse_is_migrated_in_place(self):
+        dwb.csv_to_dw(PRODUCTS_CSV, self.conn, "products")
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales")
+        columns = "transaction_id, sale_date_key, unit_price, quantity, sale_profit"
+        expected = fetch_table(self.conn, f"(SELECT {columns} FROM sales)")
+        for partitioned in (False, True):
+            with self.subTest(partitioned=partitioned):
+                conn = sqlite3.connect(":memory:")
+                self.addCleanup(conn.close)
+                # The tables as the first release of schema.sql created them
+                conn.executescript("""
+                    CREATE TABLE products (product_id INTEGER PRIMARY KEY, product_name TEXT, category TEXT,
+                                           unit_price REAL, wholesale_price REAL, supplier TEXT);
+                    CREATE TABLE sales (transaction_id INTEGER PRIMARY KEY, customer_id INTEGER, product_id INTEGER,
+                                        sale_amount REAL, sale_date TEXT, store_id INTEGER, loyalty_points INTEGER,
+                                        payment_type TEXT);""")
+                dwb.csv_to_dw(PRODUCTS_CSV, conn, "products", evolve_schema=False)
+                dwb.csv_to_dw(SALES_CSV, conn, "sales", evolve_schema=False)
+                if partitioned:
+                    dwb.partition_by_month(conn, "sales")
+
+                dwb.execute_sql_file(conn, SQL_PATH)
+                for table in dwb.storage_tables(conn, "sales"):
+                    self.assertEqual(dwb.table_columns(conn, table), dwb.table_columns(self.conn, "sales"),
+                                     f"{table} not migrated")
+                version = dwb.schema_version(conn)
+                self.assertGreater(version, 0, "Migrations not recorded")
+                self.assertEqual(dwb.migrate_to_schema(conn, SQL_PATH.read_text()), {},
+                                 "Re-running the schema added columns again")
+                self.assertEqual(dwb.schema_version(conn), version, "Re-running the schema applied migrations again")
+
+                # Backfilled columns match what a fresh load computes
+                self.assertEqual(fetch_table(conn, f"(SELECT {columns} FROM sales)"), expected)
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM sales s JOIN dim_date d ON d.date_key = s.sale_date_key")
+                                 .fetchone()[0], len(expected), "Backfilled date keys missing from dim_date")
+
+    def test_partition_by_month_keeps_rows_and_routes_loads(self):
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True)
+        expected = fetch_table(self.conn, "sales")
+        tables = dwb.partition_by_month(self.conn, "sales")
+        self.assertEqual(fetch_table(self.conn, "sales"), expected, "Partitioned view does not match the table")
+        self.assertEqual(len(tables) - 1, pd.read_csv(SALES_CSV)["SaleDate"].str[:7].nunique(), "Not one partition per month")
+        dwb.execute_sql_file(self.conn, SQL_PATH)  # Re-running the schema must not fail on the view
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = pathlib.Path(tmp).joinpath("sales.csv")
+            df = pd.read_csv(SALES_CSV)
+            df.loc[0, "SaleDate"] = "2024-12-30"  # Move one sale to a new month
+            df.to_csv(csv_path, index=False)
+            dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True)
+        transaction_id = int(df.loc[0, "TransactionID"])
+        stored = [table for table in dwb.storage_tables(self.conn, "sales")
+                  if self.conn.execute(f"SELECT 1 FROM {table} WHERE transaction_id = ?", (transaction_id,)).fetchone()]
+        self.assertEqual(stored, ["sales_p202412"], "Moved sale not routed to (only) its new partition")
+
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True, defer_indexes=True)
+        self.assertEqual(fetch_table(self.conn, "sales"), expected, "Reload into partitions does not match the table")
+        self.assertTrue(self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_sales_sale_date_p202412'").fetchone()
+                        is None, "Dropped partition's index left behind")
+        self.assertTrue(self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_sales_sale_date_p202401'").fetchone(),
+                        "Deferred partition indexes not built")
+        self.assertEqual(dwb.prune_partitions(self.conn, "sales", "2024-03-15", "2024-04-10"),
+                         ["sales_p202403", "sales_p202404"], "Wrong partitions for a date range")
+
+    def test_unparseable_dates_go_to_undated_partition(self):
+        dwb.partition_by_month(self.conn, "sales")
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = pathlib.Path(tmp).joinpath("sales.csv")
+            df = pd.read_csv(SALES_CSV)
+            df.loc[0, "SaleDate"] = "not a date"
+            df.to_csv(csv_path, index=False)
+            for chunksize in (None, 7):
+                report = dwb.csv_to_dw(str(csv_path), self.conn, "sales", delete_first=True, chunksize=chunksize)
+                self.assertEqual(report["rows"], len(df), "Rows lost to an unparseable date")
+                undated = self.conn.execute("SELECT transaction_id, sale_date FROM sales_undated").fetchall()
+                self.assertEqual(undated, [(int(df.loc[0, "TransactionID"]), None)], "Row not kept as undated")
+                self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM sales").fetchone()[0], len(df))
+        dwb.refresh_rollups(self.conn)
+
+    def test_date_keys_join_a_contiguous_date_dimension(self):
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True)
+        dates = pd.to_datetime(pd.read_csv(SALES_CSV)["SaleDate"])
+        first, last, days = self.conn.execute("SELECT MIN(full_date), MAX(full_date), COUNT(*) FROM dim_date").fetchone()
+        self.assertEqual((first, last), (f"{dates.min():%Y-%m-%d}", f"{dates.max():%Y-%m-%d}"), "dim_date bounds wrong")
+        self.assertEqual(days, (dates.max() - dates.min()).days + 1, "dim_date has gaps")
+        mismatched = self.conn.execute(
+            "SELECT COUNT(*) FROM sales s LEFT JOIN dim_date d ON d.date_key = s.sale_date_key "
+            "WHERE d.full_date IS NOT s.sale_date"
+        ).fetchone()[0]
+        self.assertEqual(mismatched, 0, "sale_date_key does not join the sale's dim_date row")
+        row = self.conn.execute("SELECT quarter, day_of_week, fiscal_year, fiscal_quarter FROM dim_date "
+                                "WHERE date_key = 20240706").fetchone()
+        self.assertEqual(row, (3, 6, 2025, 1), "Wrong calendar or fiscal attributes")
+
+    def test_iso_year_straddles_the_year_boundary(self):
+        days = pd.Series(pd.date_range("2024-12-27", "2026-01-05", freq="D"))
+        dwb.extend_date_dimension(self.conn, days)
+        iso = days.dt.isocalendar()
+        expected = list(zip(days.dt.strftime("%Y%m%d").astype(int), iso["year"], iso["week"]))
+        query = "SELECT date_key, iso_year, week_of_year FROM dim_date ORDER BY date_key"
+        self.assertEqual(self.conn.execute(query).fetchall(), expected, "Wrong ISO year or week")
+        self.assertEqual(self.conn.execute("SELECT year, iso_year FROM dim_date WHERE date_key = 20241231").fetchone(),
+                         (2024, 2025))
+
+        # A dim_date built before iso_year existed gets it backfilled by the schema migration
+        self.conn.execute("ALTER TABLE dim_date DROP COLUMN iso_year")
+        dwb.execute_sql_file(self.conn, SQL_PATH)
+        self.assertEqual(self.conn.execute(query).fetchall(), expected, "iso_year backfill wrong")
+
+    def test_dictionary_encoding_keeps_views_and_stores_codes(self):
+        tables = {"customers": CUSTOMERS_CSV, "products": PRODUCTS_CSV, "sales": SALES_CSV}
+        for table_name, csv_path in tables.items():
+            dwb.csv_to_dw(csv_path, self.conn, table_name, delete_first=True)
+        expected = {table_name: fetch_table(self.conn, table_name) for table_name in tables}
+        for table_name in tables:
+            dwb.dictionary_encode_table(self.conn, table_name)
+        dwb.partition_by_month(self.conn, "sales")
+        for table_name in tables:
+            self.assertEqual(fetch_table(self.conn, table_name), expected[table_name], f"{table_name} view changed")
+        stored_types = self.conn.execute("SELECT DISTINCT typeof(payment_type) FROM sales_p202401").fetchall()
+        self.assertEqual(stored_types, [("integer",)], "payment_type not stored as codes")
+
+        # Loads encode new chunks, and rows that did not change are still recognized as unchanged
+        dwb.refresh_rollups(self.conn)
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", incremental=True)
+        self.assertEqual(fetch_table(self.conn, "sales"), expected["sales"], "Reloaded sales differ")
+        self.assertEqual(fetch_table(self.conn, "etl_dirty_keys"), [], "Unchanged encoded rows marked dirty")
+
+        df = dwb.read_table(self.conn, "sales")
+        self.assertIsInstance(df["payment_type"].dtype, pd.CategoricalDtype, "Codes not read as categories")
+        pd.testing.assert_series_equal(df.sort_values("transaction_id")["payment_type"].astype(object).reset_index(drop=True),
+                                       pd.read_sql("SELECT payment_type FROM sales ORDER BY transaction_id",
+                                                   self.conn)["payment_type"])
+
+    def test_key_lookup_dense_and_sparse(self):
+        keys = pd.Series([105, 101, 103]).to_numpy()
+        probe = pd.Series([101, 102, 105, -1]).to_numpy()
+        for max_dense_size in (1_000, 0):
+            lookup = dwb.build_key_lookup(keys, max_dense_size)
+            self.assertEqual(dwb.lookup_positions(lookup, probe).tolist(), [1, -1, 0, -1], "Wrong lookup positions")
+
+    def test_orphaned_keys_reported_quarantined_or_adopted(self):
+        dwb.csv_to_dw(CUSTOMERS_CSV, self.conn, "customers", delete_first=True)
+        dwb.csv_to_dw(PRODUCTS_CSV, self.conn, "products", delete_first=True)
+        dwb.csv_to_dw(STORES_CSV, self.conn, "stores", delete_first=True)
+        dwb.csv_to_dw(CAMPAIGNS_CSV, self.conn, "campaigns", delete_first=True)
+        sales = pd.read_csv(SALES_CSV)
+        orphaned = ~sales["CustomerID"].isin(pd.read_csv(CUSTOMERS_CSV)["CustomerID"])
+        self.assertTrue(orphaned.any(), "Sample data has no orphaned sales")
+
+        report = dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True, chunksize=20)
+        self.assertEqual(report["orphans"], {"customer_id": int(orphaned.sum()), "product_id": 0, "store_id": 0,
+                                             "campaign_id": 0})
+        self.assertEqual(report["rows"], len(sales), "Orphans not loaded under the report policy")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            quarantine_path = pathlib.Path(tmp).joinpath("sales_orphans.csv")
+            with mock.patch.object(dwb, "quarantine_file_path", lambda stem: str(quarantine_path)):
+                report = dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True, chunksize=20,
+                                       orphans="quarantine")
+            rejected = pd.read_csv(quarantine_path)
+        self.assertEqual(report["rows"], int((~orphaned).sum()), "Orphans loaded under the quarantine policy")
+        self.assertEqual(sorted(rejected["transaction_id"]), sorted(sales.loc[orphaned, "TransactionID"]))
+        self.assertEqual(set(rejected["rule"]), {"customer_id:references"})
+
+        dwb.dictionary_encode_table(self.conn, "customers")
+        report = dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True, orphans="unknown_member")
+        self.assertEqual(report["rows"], len(sales))
+        unknown = self.conn.execute("SELECT customer_id, region FROM customers WHERE name = 'Unknown'").fetchall()
+        self.assertEqual(sorted(unknown), [(key, "Unknown") for key in sorted(set(sales.loc[orphaned, "CustomerID"]))])
+        self.assertEqual(dwb.csv_to_dw(SALES_CSV, self.conn, "sales", delete_first=True)["orphans"]["customer_id"], 0)
+        with self.assertRaises(ValueError):
+            dwb.csv_to_dw(SALES_CSV, self.conn, "sales", orphans="drop")
+
+    def test_new_source_column_added_to_partitioned_encoded_table(self):
+        dwb.partition_by_month(self.conn, "sales")
+        dwb.dictionary_encode_table(self.conn, "sales")
+        dwb.csv_to_dw(SALES_CSV, self.conn, "sales", incremental=True)
+        dwb.refresh_rollups(self.conn)
+        version = dwb.schema_version(self.conn)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = pathlib.Path(tmp).joinpath("sales.csv")
+            sales = pd.read_csv(SALES_CSV)
+            sales.assign(Channel=sales["StoreID"].map(lambda store_id: "Online" if store_id % 2 else "In-Store")) \
+                .to_csv(csv_path, index=False)
+            report = dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True, chunksize=30,
+                                   evolve_schema=True)
+            self.assertEqual(report["columns_added"], ["channel"])
+            self.assertEqual(dwb.schema_version(self.conn), version + 1)
+            for table in dwb.storage_tables(self.conn, "sales"):
+                self.assertIn("channel", dwb.table_columns(self.conn, table), f"{table} missing the new column")
+            self.assertEqual(self.conn.execute("SELECT COUNT(channel) FROM sales").fetchone()[0], len(sales),
+                             "Existing rows not backfilled")
+            self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM etl_dirty_keys").fetchone()[0], 0,
+                             "Rows changed only by the new column marked rollups dirty")
+
+            sales.assign(Extra=1).to_csv(csv_path, index=False)
+            dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True)
+            self.assertNotIn("extra", dwb.table_columns(self.conn, "sales"), "Column added without opting in")
+            # EVOLVE_SCHEMA=1 in the environment turns it on for every load of the run
+            sales.assign(Extra=2).to_csv(csv_path, index=False)  # A changed file, so the load is not skipped
+            with mock.patch.object(dwb, "EVOLVE_SCHEMA", True):
+                dwb.csv_to_dw(str(csv_path), self.conn, "sales", incremental=True)
+            self.assertIn("extra", dwb.table_columns(self.conn, "sales"), "EVOLVE_SCHEMA not used as the default")
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_columnar_staging_matches_csv_load(self):
+        dwb.file_to_dw(SALES_CSV, self.conn, "sales", delete_first=True)
+        expected = fetch_table(self.conn, "sales")
+
+        df = pd.read_csv(SALES_CSV, parse_dates=["SaleDate"], dtype={"PaymentType": "category"})
+        with tempfile.TemporaryDirectory() as tmp:
+            for fmt in ("parquet", "feather"):
+                file_path = write_prepared(df, "sales_data_prepared", fmt, tmp)
+                dwb.file_to_dw(file_path, self.conn, "sales", delete_first=True, chunksize=20)
+                self.assertEqual(fetch_table(self.conn, "sales"), expected, f"{fmt} load does not match CSV load")
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_columnar_files_stream_in_bounded_batches(self):
+        df = pd.read_csv(SALES_CSV)
+        with tempfile.TemporaryDirectory() as tmp:
+            parquet_path = str(pathlib.Path(tmp).joinpath("sales.parquet"))
+            feather_path = str(pathlib.Path(tmp).joinpath("sales.feather"))
+            # Several row groups / record batches, none of them a multiple of the chunk size
+            df.to_parquet(parquet_path, index=False, row_group_size=33)
+            df.to_feather(feather_path, chunksize=33)
+            for file_path in (parquet_path, feather_path):
+                sizes = [batch.num_rows for batch in dwb.iter_arrow_batches(file_path, 20)]
+                self.assertLessEqual(max(sizes), 20, f"{file_path} batch larger than the chunk size")
+                self.assertEqual(sum(sizes), len(df), f"{file_path} rows lost while streaming")
+                chunks = list(dwb.load_file_chunks(file_path, 20))
+                pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df)
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
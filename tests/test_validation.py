@@ -0,0 +1,126 @@
+r"""
+tests/test_validation.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_validation.py
+    python3 tests\test_validation.py
+
+This test suite checks the declarative validation engine against the raw sample data
+and the rules the prepare scripts used to hard-code.
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root and the prepare scripts folder to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+for path in (PROJECT_ROOT, PROJECT_ROOT.joinpath("scripts", "data_preparation")):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from utils.typed_csv import read_typed_csv  # noqa: E402
+from utils.validation import Validator, date_formats, expected_dtypes, prepare_source, validate  # noqa: E402
+from prepare_customers_data import CUSTOMERS_SPEC  # noqa: E402
+from prepare_sales_data import SALES_SPEC  # noqa: E402
+
+RAW_DATA_DIR = PROJECT_ROOT.joinpath("data", "raw")
+
+
+def read_raw(stem: str, spec: dict) -> pd.DataFrame:
+    """Read a raw sample file with the spec's dtypes."""
+    return read_typed_csv(str(RAW_DATA_DIR.joinpath(f"{stem}.csv")), expected_dtypes(spec), date_formats(spec))
+
+
+class TestValidation(unittest.TestCase):
+
+    def test_rules_match_hand_written_filters(self):
+        df = read_raw("customers_data", CUSTOMERS_SPEC)
+        valid, report = validate(df, CUSTOMERS_SPEC)
+        expected = df.drop_duplicates(subset=["CustomerID"])
+        expected = expected[(expected["Age"] >= 13) & (expected["Age"] <= 150)]
+        pd.testing.assert_frame_equal(valid, expected)
+        self.assertEqual(report.rows_rejected, len(df) - len(expected))
+
+        df = read_raw("sales_data", SALES_SPEC)
+        valid, report = validate(df, SALES_SPEC)
+        expected = df.drop_duplicates(subset=["TransactionID"])
+        pd.testing.assert_frame_equal(valid, expected[expected["SaleDate"] >= "2000-01-01"])
+
+    def test_report_lists_every_violation_per_rule(self):
+        df = pd.DataFrame({"ID": [1, 2, 2, 3, 4, 4], "Age": [20, 5, 200, np.nan, 30, 40],
+                           "Region": ["East", "East", "Mars", "West", None, "West"]})
+        spec = {"columns": {"ID": {"dtype": "int64"},
+                            "Age": {"dtype": "float64", "min": 13, "max": 150, "not_null": True},
+                            "Region": {"dtype": "object", "allowed": ["East", "West"]}},
+                "unique": ["ID"]}
+        valid, report = validate(df, spec)
+        self.assertEqual(valid["ID"].tolist(), [1, 4], "Missing Region should pass without not_null")
+        self.assertEqual(report.counts(), {"Age:not_null": 1, "Age:min": 1, "Age:max": 1,
+                                           "Region:allowed": 1, "unique": 1})
+        self.assertEqual(report.violations()["Age:max"].tolist(), [2])
+        self.assertEqual(report.violations()["unique"].tolist(), [5])
+
+    def test_rejected_row_does_not_claim_its_key(self):
+        spec = {"columns": {"ID": {"dtype": "int64"}, "Age": {"dtype": "int64", "min": 13}}, "unique": ["ID"]}
+        chunks = [pd.DataFrame({"ID": [1, 2], "Age": [5, 20]}),
+                  pd.DataFrame({"ID": [1, 1], "Age": [30, 40]}, index=[2, 3])]
+        with Validator(spec) as validator:
+            valid = pd.concat(validator.iter_valid(chunks))
+        # The under-age first row is rejected by Age:min only; the next row with its key is kept
+        self.assertEqual(valid["Age"].tolist(), [20, 30])
+        self.assertEqual(validator.report.violations()["Age:min"].tolist(), [0])
+        self.assertEqual(validator.report.violations()["unique"].tolist(), [3])
+
+    def test_schema_mismatch_reports_all_problems(self):
+        df = pd.DataFrame({"ID": ["a"], "Extra": [1]})
+        spec = {"columns": {"ID": {"dtype": "int64"}, "Age": {"dtype": "int64"}}}
+        with self.assertRaises(ValueError) as context:
+            validate(df, spec)
+        for problem in ("Missing column: Age", "Unexpected column: Extra", "Incorrect data type for column 'ID'"):
+            self.assertIn(problem, str(context.exception))
+
+    def test_references_reject_unknown_keys(self):
+        df = pd.DataFrame({"CustomerID": [1001, 1002, 9999]})
+        spec = {"columns": {"CustomerID": {"dtype": "int64", "references": np.array([1001, 1002])}}}
+        valid, report = validate(df, spec)
+        self.assertEqual(valid["CustomerID"].tolist(), [1001, 1002])
+        self.assertEqual(report.violations()["CustomerID:references"].tolist(), [2])
+
+    def test_chunked_validation_matches_whole_frame_and_quarantines(self):
+        df = read_raw("sales_data", SALES_SPEC)
+        expected, expected_report = validate(df, SALES_SPEC)
+        with tempfile.TemporaryDirectory() as tmp:
+            quarantine_path = str(pathlib.Path(tmp).joinpath("quarantine", "sales_data_rejected.csv"))
+            with Validator(SALES_SPEC, quarantine_path) as validator:
+                chunks = (df.iloc[start:start + 7] for start in range(0, len(df), 7))
+                valid = pd.concat(validator.iter_valid(chunks))
+            rejected = pd.read_csv(quarantine_path)
+
+        # Duplicates are caught across chunk boundaries, as in a single pass
+        pd.testing.assert_frame_equal(valid, expected)
+        self.assertEqual(validator.report.counts(), expected_report.counts())
+        self.assertEqual(len(rejected), expected_report.rows_rejected)
+        self.assertIn("SaleDate:min", set(rejected["rule"]))
+
+    def test_prepare_source_stages_valid_rows_and_quarantines(self):
+        expected, report = validate(read_raw("customers_data", CUSTOMERS_SPEC), CUSTOMERS_SPEC)
+        with tempfile.TemporaryDirectory() as tmp:
+            prepared_dir, quarantine_dir = (str(pathlib.Path(tmp).joinpath(name)) for name in ("prepared", "quarantine"))
+            df = prepare_source("customers_data", CUSTOMERS_SPEC, str(RAW_DATA_DIR), prepared_dir, quarantine_dir)
+            pd.testing.assert_frame_equal(df, expected)
+            self.assertTrue(pathlib.Path(prepared_dir).joinpath("customers_data_prepared.csv").exists())
+            rejected = pd.read_csv(pathlib.Path(quarantine_dir).joinpath("customers_data_rejected.csv"))
+            self.assertEqual(len(rejected), report.rows_rejected)
+            self.assertIsNone(prepare_source("missing_data", CUSTOMERS_SPEC, str(RAW_DATA_DIR), prepared_dir,
+                                             quarantine_dir), "Missing file not reported")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,128 @@
+"""
+Fast-Path Date Parsing
+File: utils/date_parsing.py
+
+Parses date strings without per-element format inference:
+- the format is inferred once from a sample and cached per (source, column), so
+  every later chunk or call for the same column reuses it
+- only the unique values are parsed and the results are mapped back to the rows,
+  which matters because sale dates repeat heavily (a year of sales has ~366 dates)
+- values the cached format cannot parse fall back to pandas' per-element parser,
+  so a handful of odd rows never force the whole column onto the slow path
+
+Example:
+    df["SaleDate"] = parse_dates(df["SaleDate"], source="data/raw/sales_data.csv")
+"""
+
+# Imports from Python Standard Library
+import warnings
+from typing import Dict, Iterable, Optional, Tuple
+
+# Imports from external packages
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# Local Imports
+from utils.logger import logger
+
+# Formats tried, in order, when pandas cannot guess one from the sample (UPDATE TO CUSTOMIZE)
+CANDIDATE_FORMATS = [
+    "%Y-%m-%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%y",
+    "%Y/%m/%d",
+    "%d.%m.%Y",
+    "%Y%m%d",
+]
+
+# Number of unique values checked when inferring a format
+SAMPLE_SIZE = 1_000
+
+# (source, column) -> inferred format
+_format_cache: Dict[Tuple[Optional[str], Optional[str]], str] = {}
+
+
+def clear_format_cache() -> None:
+    """Forget every cached format (e.g. when a source changes layout)."""
+    _format_cache.clear()
+
+
+def infer_date_format(values: Iterable[str]) -> Optional[str]:
+    """
+    Infer the strftime format that parses the most values of a sample.
+
+    Args:
+        values: Non-null date strings, ideally unique.
+
+    Returns:
+        str or None: The best format, or None if no format parses at least half of the sample.
+    """
+    sample = pd.Index(list(values)[:SAMPLE_SIZE]).astype(str)
+    if len(sample) == 0:
+        return None
+    # pandas' own guess for a few values comes first; the fixed list covers what it cannot guess.
+    # The guesses are only hints (each is verified below), so pandas' day-first warning is noise here
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        guesses = [guess_datetime_format(value) for value in sample[:5]]
+    candidates = list(dict.fromkeys([fmt for fmt in guesses if fmt] + CANDIDATE_FORMATS))
+    best_format, best_parsed = None, 0
+    for fmt in candidates:
+        parsed = int(pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum())
+        if parsed == len(sample):
+            return fmt
+        if parsed > best_parsed:
+            best_format, best_parsed = fmt, parsed
+    return best_format if best_parsed * 2 >= len(sample) else None
+
+
+def parse_dates(series: pd.Series, source: Optional[str] = None, date_format: Optional[str] = None,
+                errors: str = "raise") -> pd.Series:
+    """
+    Parse a column of date strings to datetime64.
+
+    Args:
+        series: The values to parse. Datetime columns are returned unchanged.
+        source: Name of the file or feed the column comes from; with the column name it
+                keys the format cache.
+        date_format: Known strftime format. None infers one (or reuses the cached one).
+        errors: "raise" (like pd.to_datetime) or "coerce" for values no parser understands.
+
+    Returns:
+        pd.Series: The parsed datetimes, with the same index and name as the input.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series
+
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Index(uniques).astype(str)
+    key = (source, series.name)
+    declared = date_format is not None
+    if not declared:
+        date_format = _format_cache.get(key)
+
+    parsed = pd.to_datetime(uniques, format=date_format, errors="coerce") if date_format else None
+    if not declared and (parsed is None or parsed.isna().sum() * 2 > len(uniques)):
+        # No format yet, or the cached one no longer fits most of the values: infer again
+        inferred = infer_date_format(uniques)
+        if inferred is not None:
+            date_format = inferred
+            _format_cache[key] = inferred
+            logger.info(f"Inferred date format '{inferred}' for column {series.name!r} ({source or 'no source'})")
+            parsed = pd.to_datetime(uniques, format=inferred, errors="coerce")
+
+    if parsed is None:
+        parsed = pd.to_datetime(uniques, format="mixed", errors=errors)
+    elif parsed.isna().any():
+        # Per-element fallback, only for the values the format could not parse
+        failed = parsed.isna()
+        values = parsed.to_numpy().copy()
+        values[failed] = pd.to_datetime(uniques[failed], format="mixed", errors=errors).to_numpy()
+        parsed = pd.DatetimeIndex(values)
+        logger.info(f"{int(failed.sum())} value(s) of {series.name!r} did not match '{date_format}' and were parsed individually")
+
+    result = pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(result, index=series.index, name=series.name)
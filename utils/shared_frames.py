@@ -0,0 +1,106 @@
+"""
+Shared-Memory DataFrame Transport
+File: utils/shared_frames.py
+
+Moves DataFrames between processes as Arrow IPC streams written into
+multiprocessing.shared_memory blocks, so a process pool only has to pass a block
+name and size instead of pickling every Python object in the frame. The receiving
+process copies the block out with a single memcpy and decodes the columns from it.
+
+Frames that Arrow cannot represent (for example mixed-type object columns or
+non-string column labels), or a missing pyarrow package, fall back to normal
+pickling, so callers never need to check. Each payload is a tuple:
+("shm", block name, size) or ("pickle", DataFrame).
+"""
+
+# Imports from Python Standard Library
+from multiprocessing import shared_memory
+
+# Imports from external packages
+import pandas as pd
+
+
+def _arrow():
+    """Import pyarrow lazily; it is an optional dependency."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    return pa
+
+
+def to_payload(df: pd.DataFrame) -> tuple:
+    """
+    Package a DataFrame for another process.
+
+    Args:
+        df: The DataFrame to send. Its index is preserved.
+
+    Returns:
+        tuple: A shared-memory payload, or a pickle payload when Arrow cannot hold the frame.
+    """
+    pa = _arrow()
+    if pa is None or not all(isinstance(col, str) for col in df.columns) or df.columns.has_duplicates:
+        return ("pickle", df)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return ("pickle", df)
+
+    # Measure the stream first, then write it straight into the shared block
+    counter = pa.MockOutputStream()
+    with pa.ipc.new_stream(counter, table.schema) as writer:
+        writer.write_table(table)
+    size = counter.size()
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        buffer = pa.py_buffer(block.buf)
+        sink = pa.FixedSizeBufferWriter(buffer)
+        writer = pa.ipc.new_stream(sink, table.schema)
+        writer.write_table(table)
+        writer.close()
+        sink.close()
+        # The Arrow objects point into the block; release them before the block is closed
+        del writer, sink, buffer
+        return ("shm", block.name, size)
+    finally:
+        block.close()
+
+
+def from_payload(payload: tuple, unlink: bool = False) -> pd.DataFrame:
+    """
+    Rebuild a DataFrame from a payload made by to_payload().
+
+    Args:
+        payload: The payload.
+        unlink: Free the shared-memory block after reading (done once, by the final reader).
+
+    Returns:
+        pd.DataFrame: The DataFrame, with its own copy of the data.
+    """
+    if payload[0] == "pickle":
+        return payload[1]
+    pa = _arrow()
+    _, name, size = payload
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        # One memcpy out of the block; to_pandas may keep zero-copy views of the Arrow buffers,
+        # which must not point into a block that is about to be closed and unlinked
+        stream = bytes(block.buf[:size])
+        df = pa.ipc.open_stream(pa.py_buffer(stream)).read_pandas()
+    finally:
+        block.close()
+        if unlink:
+            block.unlink()
+    return df
+
+
+def release_payload(payload: tuple) -> None:
+    """Free the shared-memory block of a payload that will not be read."""
+    if payload[0] == "shm":
+        try:
+            block = shared_memory.SharedMemory(name=payload[1])
+        except FileNotFoundError:
+            return
+        block.close()
+        block.unlink()
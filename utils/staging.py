@@ -0,0 +1,70 @@
+"""
+Prepared Data Staging
+File: utils/staging.py
+
+Writes the prepared DataFrames to data/prepared in the staging format of choice:
+- "csv": plain text, the original format (dtypes are re-inferred when read back)
+- "parquet": columnar and zstd-compressed, keeps datetimes and categoricals
+- "feather": uncompressed Arrow IPC, keeps dtypes and can be memory-mapped by the loader
+
+Parquet and Feather need the optional pyarrow package.
+"""
+
+# Imports from Python Standard Library
+import os
+
+# Imports from external packages
+import pandas as pd
+
+# Local Imports
+from utils.logger import logger
+
+# Staging format used by the prepare scripts and the warehouse loaders (UPDATE TO CUSTOMIZE)
+PREPARED_FORMAT = os.environ.get("PREPARED_FORMAT", "csv")
+PREPARED_DATA_DIR = os.path.join("data", "prepared")
+
+STAGING_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+
+def prepared_file_path(stem: str, fmt: str = PREPARED_FORMAT, prepared_data_dir: str = PREPARED_DATA_DIR) -> str:
+    """
+    Build the path of a prepared file, e.g. data/prepared/sales_data_prepared.parquet.
+
+    Args:
+        stem: File name without extension, e.g. "sales_data_prepared".
+        fmt: Staging format, one of STAGING_EXTENSIONS.
+        prepared_data_dir: Directory holding the prepared files.
+
+    Returns:
+        str: Path to the prepared file.
+    """
+    if fmt not in STAGING_EXTENSIONS:
+        raise ValueError(f"Unknown staging format '{fmt}'. Expected one of: {', '.join(STAGING_EXTENSIONS)}")
+    return os.path.join(prepared_data_dir, stem + STAGING_EXTENSIONS[fmt])
+
+
+def write_prepared(df: pd.DataFrame, stem: str, fmt: str = PREPARED_FORMAT,
+                   prepared_data_dir: str = PREPARED_DATA_DIR) -> str:
+    """
+    Write a prepared DataFrame to the staging directory.
+
+    Args:
+        df: The prepared data.
+        stem: File name without extension, e.g. "sales_data_prepared".
+        fmt: Staging format, one of STAGING_EXTENSIONS.
+        prepared_data_dir: Directory holding the prepared files.
+
+    Returns:
+        str: Path of the file written.
+    """
+    output_filepath = prepared_file_path(stem, fmt, prepared_data_dir)
+    os.makedirs(prepared_data_dir, exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(output_filepath, index=False)  # index=False prevents writing the index
+    elif fmt == "parquet":
+        df.to_parquet(output_filepath, index=False, compression="zstd")
+    else:
+        # Uncompressed so the loader can memory-map the file instead of reading it
+        df.reset_index(drop=True).to_feather(output_filepath, compression="uncompressed")
+    logger.info(f"Processed data saved to: {output_filepath}")
+    return output_filepath
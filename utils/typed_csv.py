@@ -0,0 +1,100 @@
+"""
+Typed CSV Reader
+File: utils/typed_csv.py
+
+Reads CSV files with the column names and dtypes declared up front, so pandas never
+infers types, never creates object columns for low-cardinality text and never runs
+per-element date inference. The expected-columns dict used for verification is the
+single source of truth for parsing as well. Datetime columns without a declared
+format are read as text and parsed with utils.date_parsing, which infers the format
+once per file and column and parses each distinct value only once.
+
+Example:
+    expected_cols = {"SaleDate": "datetime64[ns]", "StoreID": "int16", "PaymentType": "category"}
+    df = read_typed_csv("data/raw/sales_data.csv", expected_cols, date_formats={"SaleDate": "%m/%d/%Y"})
+"""
+
+# Imports from Python Standard Library
+import importlib.util
+from typing import Dict, Optional
+
+# Imports from external packages
+import pandas as pd
+
+# Local Imports
+from utils.date_parsing import parse_dates
+from utils.logger import logger
+
+# The pyarrow CSV engine is multi-threaded; use it when the optional package is installed
+DEFAULT_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
+
+
+def read_csv_arguments(expected_columns: Dict[str, str], date_formats: Optional[Dict[str, str]] = None) -> dict:
+    """
+    Translate an expected-columns dict into pd.read_csv keyword arguments.
+
+    Args:
+        expected_columns: Column name -> dtype string (e.g. 'int32', 'category', 'datetime64[ns]').
+        date_formats: Column name -> strftime format for the datetime columns. Datetime columns
+                      without a format are read as text (see undeclared_date_columns).
+
+    Returns:
+        dict: usecols, dtype, parse_dates and date_format arguments for pd.read_csv.
+    """
+    date_formats = date_formats or {}
+    date_columns = [col for col, dtype in expected_columns.items()
+                    if dtype.startswith("datetime64") and col in date_formats]
+    text_columns = undeclared_date_columns(expected_columns, date_formats)
+
+    arguments = {
+        "usecols": list(expected_columns),
+        "dtype": {col: ("object" if col in text_columns else dtype)
+                  for col, dtype in expected_columns.items() if col not in date_columns},
+    }
+    if date_columns:
+        arguments["parse_dates"] = date_columns
+        arguments["date_format"] = {col: date_formats[col] for col in date_columns}
+    return arguments
+
+
+def undeclared_date_columns(expected_columns: Dict[str, str], date_formats: Optional[Dict[str, str]] = None) -> list:
+    """Return the datetime columns that have no declared format and must be inferred."""
+    date_formats = date_formats or {}
+    return [col for col, dtype in expected_columns.items()
+            if dtype.startswith("datetime64") and col not in date_formats]
+
+
+def read_typed_csv(file_path: str, expected_columns: Dict[str, str], date_formats: Optional[Dict[str, str]] = None,
+                   engine: str = DEFAULT_ENGINE) -> pd.DataFrame:
+    """
+    Read a CSV file using the declared column dtypes and date formats.
+
+    Args:
+        file_path: Path to the CSV file.
+        expected_columns: Column name -> dtype string; only these columns are read.
+        date_formats: Column name -> strftime format for the datetime columns; formats left out are inferred.
+        engine: pd.read_csv engine, "pyarrow" when installed and "c" otherwise.
+
+    Returns:
+        pd.DataFrame: The parsed data with the declared dtypes.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If a value cannot be parsed as its declared type.
+    """
+    arguments = read_csv_arguments(expected_columns, date_formats)
+    try:
+        # Keep the file's column order; the pyarrow engine would otherwise follow usecols order
+        header = pd.read_csv(file_path, nrows=0).columns
+        arguments["usecols"] = [col for col in header if col in expected_columns] + \
+                               [col for col in expected_columns if col not in header]
+        df = pd.read_csv(file_path, engine=engine, **arguments)
+        for col in undeclared_date_columns(expected_columns, date_formats):
+            df[col] = parse_dates(df[col], source=str(file_path))
+    except FileNotFoundError:
+        raise
+    except (ValueError, TypeError) as e:
+        logger.error(f"Failed to parse {file_path} with the declared column types: {e}")
+        raise ValueError(f"Failed to parse {file_path} with the declared column types: {e}") from e
+    logger.info(f"Loaded {len(df)} rows from {file_path} with declared dtypes (engine: {engine})")
+    return df
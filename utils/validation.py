@@ -0,0 +1,318 @@
+"""
+Declarative Data Validation
+File: utils/validation.py
+
+Validates prepared DataFrames against a declarative spec per table instead of
+hand-written checks in each prepare script. A spec is a plain dict:
+
+    SPEC = {
+        "columns": {
+            "CustomerID": {"dtype": "int32", "not_null": True},
+            "Region": {"dtype": "category", "allowed": ["East", "West", "North", "South"]},
+            "JoinDate": {"dtype": "datetime64[ns]", "format": "%m/%d/%Y"},
+            "Age": {"dtype": "int16", "min": 13, "max": 150},
+        },
+        "unique": ["CustomerID"],
+    }
+
+Column rules:
+- dtype: expected pandas dtype string; also drives parsing via expected_dtypes(spec)
+- format: strftime format of a datetime column, see date_formats(spec)
+- not_null: reject missing values
+- min / max: inclusive bounds (numbers, or date strings for datetime columns)
+- allowed: the permitted values; missing values pass unless not_null is set
+- references: the keys of a parent table (any array-like), e.g. the loaded CustomerIDs
+
+The table-level "unique" rule lists the key columns; the first occurrence is kept and
+later repeats are rejected, also across chunks. It is checked after the row rules, on the
+rows that pass them, so a rejected row does not claim its key: a later valid row with the
+same key is kept, as when duplicates were dropped before the outliers.
+
+The column names and dtypes are a structural check: any mismatch is reported in full
+and raises ValueError, as the data cannot be trusted at all. The row rules are evaluated
+as vectorized boolean masks, all in one pass, and rows failing any rule are rejected.
+The ValidationReport lists how many rows and which row index labels failed each rule.
+Rejected rows can be written to a quarantine CSV (with a "rule" column naming the
+failed rules) instead of being dropped silently.
+
+prepare_source() runs the whole prepare step the prepare scripts share: read the raw CSV
+with the spec's dtypes, validate it with quarantine, log the report and stage the valid rows.
+
+Example:
+    df_valid, report = validate(df, SPEC, quarantine_path=quarantine_file_path("customers_data"))
+
+    prepare_source("customers_data", CUSTOMERS_SPEC)  # data/raw/customers_data.csv -> data/prepared
+
+    with Validator(SPEC, quarantine_path="data/quarantine/sales_data_rejected.csv") as validator:
+        for chunk in validator.iter_valid(chunks):
+            ...
+"""
+
+# Imports from Python Standard Library
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Imports from external packages
+import numpy as np
+import pandas as pd
+
+# Local Imports
+from utils.dedup import StreamingDeduplicator
+from utils.logger import logger
+from utils.staging import PREPARED_DATA_DIR, write_prepared
+from utils.typed_csv import read_typed_csv
+
+# Directory of the raw source files read by prepare_source (UPDATE TO CUSTOMIZE)
+RAW_DATA_DIR = os.path.join("data", "raw")
+
+# Directory for the rejected rows of each prepare run (UPDATE TO CUSTOMIZE)
+QUARANTINE_DIR = os.path.join("data", "quarantine")
+
+# Name of the quarantine column listing the rules a row failed
+RULE_COLUMN = "rule"
+
+
+def quarantine_file_path(stem: str, quarantine_dir: str = QUARANTINE_DIR) -> str:
+    """Build the quarantine path for a source, e.g. data/quarantine/sales_data_rejected.csv."""
+    return os.path.join(quarantine_dir, f"{stem}_rejected.csv")
+
+
+def expected_dtypes(spec: dict) -> Dict[str, str]:
+    """Return the column name -> dtype dict of a spec, as used by utils.typed_csv.read_typed_csv."""
+    return {col: rules["dtype"] for col, rules in spec["columns"].items()}
+
+
+def date_formats(spec: dict) -> Dict[str, str]:
+    """Return the column name -> strftime format dict of the datetime columns that declare one."""
+    return {col: rules["format"] for col, rules in spec["columns"].items() if "format" in rules}
+
+
+def schema_errors(df: pd.DataFrame, spec: dict) -> List[str]:
+    """
+    List every way the DataFrame's columns and dtypes differ from the spec.
+
+    Args:
+        df: The DataFrame to check.
+        spec: The table spec.
+
+    Returns:
+        list: One message per missing column, unexpected column or wrong dtype; empty if the schema matches.
+    """
+    columns = spec["columns"]
+    errors = [f"Missing column: {col}" for col in columns if col not in df.columns]
+    errors += [f"Unexpected column: {col}" for col in df.columns if col not in columns]
+    for col, rules in columns.items():
+        if col in df.columns and "dtype" in rules and str(df[col].dtype) != rules["dtype"]:
+            errors.append(f"Incorrect data type for column '{col}'. Expected: {rules['dtype']}, Found: {df[col].dtype}")
+    return errors
+
+
+def rule_masks(df: pd.DataFrame, spec: dict) -> Dict[str, np.ndarray]:
+    """
+    Evaluate the row rules of a spec (all but "unique") as boolean violation masks.
+
+    Args:
+        df: The rows to check; the schema is assumed to match.
+        spec: The table spec.
+
+    Returns:
+        dict: Rule name (e.g. "Age:max") -> mask, True for each row that violates the rule.
+    """
+    masks = {}
+    for col, rules in spec["columns"].items():
+        values = df[col]
+        missing = values.isna().to_numpy()
+        if rules.get("not_null"):
+            masks[f"{col}:not_null"] = missing
+        # Comparisons with a missing value are False, so only not_null rejects missing values
+        if "min" in rules:
+            masks[f"{col}:min"] = (values < rules["min"]).to_numpy()
+        if "max" in rules:
+            masks[f"{col}:max"] = (values > rules["max"]).to_numpy()
+        if "allowed" in rules:
+            masks[f"{col}:allowed"] = ~values.isin(rules["allowed"]).to_numpy() & ~missing
+        if "references" in rules:
+            masks[f"{col}:references"] = ~values.isin(rules["references"]).to_numpy() & ~missing
+    return masks
+
+
+def rule_labels(masks: Dict[str, np.ndarray], rejected: np.ndarray) -> pd.Series:
+    """Join the names of the rules each rejected row failed, e.g. "Age:max;unique"."""
+    labels = pd.Series("", index=np.flatnonzero(rejected), dtype=object)
+    for rule, mask in masks.items():
+        failed = mask[rejected]
+        labels[failed] = labels[failed] + ";" + rule
+    return labels.str.lstrip(";")
+
+
+class ValidationReport:
+    """Per-rule violation counts and row index labels, accumulated over one or more chunks."""
+
+    def __init__(self):
+        self.rows_in = 0
+        self.rows_valid = 0
+        self._violations: Dict[str, List[np.ndarray]] = {}
+
+    def add(self, index: pd.Index, masks: Dict[str, np.ndarray], rows_valid: int) -> None:
+        """Record the violations of one chunk."""
+        self.rows_in += len(index)
+        self.rows_valid += rows_valid
+        for rule, mask in masks.items():
+            self._violations.setdefault(rule, []).append(index[mask].to_numpy())
+
+    @property
+    def rows_rejected(self) -> int:
+        """Number of rows that failed at least one rule."""
+        return self.rows_in - self.rows_valid
+
+    def violations(self) -> Dict[str, np.ndarray]:
+        """Return rule name -> index labels of the rows that violate it, for every rule checked."""
+        return {rule: np.concatenate(parts) for rule, parts in self._violations.items()}
+
+    def counts(self) -> Dict[str, int]:
+        """Return rule name -> number of rows that violate it, for every rule checked."""
+        return {rule: int(sum(len(part) for part in parts)) for rule, parts in self._violations.items()}
+
+    def log(self, source: str = "data") -> None:
+        """Log the totals and each rule with violations."""
+        logger.info(f"Validated {source}: {self.rows_in} rows in, {self.rows_valid} valid, {self.rows_rejected} rejected")
+        for rule, count in self.counts().items():
+            if count:
+                logger.warning(f"{count} row(s) in {source} failed rule {rule}")
+
+
+class Validator:
+    """
+    Validates a stream of chunks against one spec, keeping the uniqueness state and the
+    report across chunks and appending rejected rows to the quarantine file.
+
+    Any quarantine file from an earlier run is removed first. With a seen_db_path the keys
+    seen so far are kept on disk (see utils.dedup.StreamingDeduplicator).
+    """
+
+    def __init__(self, spec: dict, quarantine_path: Optional[str] = None, seen_db_path: Optional[str] = None):
+        self.spec = spec
+        self.quarantine_path = quarantine_path
+        self.report = ValidationReport()
+        self._dedup = StreamingDeduplicator(spec["unique"], seen_db_path) if spec.get("unique") else None
+        self._quarantine_started = False
+        if quarantine_path is not None and os.path.exists(quarantine_path):
+            os.remove(quarantine_path)
+
+    def validate(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Validate the next chunk.
+
+        Args:
+            chunk: The next rows, with the spec's columns and dtypes.
+
+        Returns:
+            pd.DataFrame: The rows passing every rule, in their original order.
+
+        Raises:
+            ValueError: If the columns or dtypes do not match the spec.
+        """
+        errors = schema_errors(chunk, self.spec)
+        if errors:
+            for error in errors:
+                logger.error(error)
+            raise ValueError("Data does not match the validation spec: " + "; ".join(errors))
+
+        masks = rule_masks(chunk, self.spec)
+        rejected = np.zeros(len(chunk), dtype=bool)
+        for mask in masks.values():
+            rejected |= mask
+        if self._dedup is not None:
+            # Only rows passing the row rules claim their key, so a rejected row cannot shadow a later valid one
+            passing = np.flatnonzero(~rejected)
+            masks["unique"] = np.zeros(len(chunk), dtype=bool)
+            masks["unique"][passing] = self._dedup.duplicate_mask(chunk.iloc[passing])
+            rejected |= masks["unique"]
+
+        rows_rejected = int(rejected.sum())
+        self.report.add(chunk.index, masks, len(chunk) - rows_rejected)
+        if not rows_rejected:
+            return chunk
+        if self.quarantine_path is not None:
+            self._quarantine(chunk[rejected].assign(**{RULE_COLUMN: rule_labels(masks, rejected).to_numpy()}))
+        return chunk[~rejected]
+
+    def _quarantine(self, rows: pd.DataFrame) -> None:
+        """Append rejected rows to the quarantine CSV, writing the header on the first write."""
+        os.makedirs(os.path.dirname(self.quarantine_path) or ".", exist_ok=True)
+        rows.to_csv(self.quarantine_path, mode="a", header=not self._quarantine_started, index=False)
+        self._quarantine_started = True
+
+    def iter_valid(self, chunks: Iterable[pd.DataFrame], source: str = "stream") -> Iterator[pd.DataFrame]:
+        """Yield the valid rows of each chunk, then log the report under the given source name."""
+        for chunk in chunks:
+            yield self.validate(chunk)
+        self.report.log(source)
+
+    def close(self) -> None:
+        """Close the on-disk key set, if any."""
+        if self._dedup is not None:
+            self._dedup.close()
+
+    def __enter__(self) -> "Validator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def validate(df: pd.DataFrame, spec: dict, quarantine_path: Optional[str] = None) -> Tuple[pd.DataFrame, ValidationReport]:
+    """
+    Validate an in-memory DataFrame against a spec.
+
+    Args:
+        df: The rows to check.
+        spec: The table spec.
+        quarantine_path: CSV file for the rejected rows. None drops them.
+
+    Returns:
+        tuple: The valid rows and the ValidationReport.
+
+    Raises:
+        ValueError: If the columns or dtypes do not match the spec.
+    """
+    with Validator(spec, quarantine_path) as validator:
+        df_valid = validator.validate(df)
+    return df_valid, validator.report
+
+
+def prepare_source(stem: str, spec: dict, raw_data_dir: str = RAW_DATA_DIR,
+                   prepared_data_dir: str = PREPARED_DATA_DIR,
+                   quarantine_dir: str = QUARANTINE_DIR) -> Optional[pd.DataFrame]:
+    """
+    Prepare one raw CSV: read it with the spec's dtypes, validate it, log the report and write
+    the valid rows as <stem>_prepared in the configured staging format.
+
+    Args:
+        stem: Raw file name without extension, e.g. "customers_data".
+        spec: The table spec.
+        raw_data_dir: Directory holding the raw files.
+        prepared_data_dir: Directory for the prepared file.
+        quarantine_dir: Directory for the rejected rows.
+
+    Returns:
+        pd.DataFrame: The prepared rows, or None if the file is missing or does not match the spec.
+    """
+    file_name = f"{stem}.csv"
+    try:
+        df = read_typed_csv(os.path.join(raw_data_dir, file_name), expected_dtypes(spec), date_formats(spec))
+
+        # Schema mismatches raise ValueError; rows failing a rule are quarantined
+        logger.info(f"Validating {stem.replace('_', ' ')}...")
+        df, report = validate(df, spec, quarantine_path=quarantine_file_path(stem, quarantine_dir))
+        report.log(file_name)
+
+        # Write the processed DataFrame in the configured staging format (csv, parquet or feather)
+        write_prepared(df, f"{stem}_prepared", prepared_data_dir=prepared_data_dir)
+    except FileNotFoundError:
+        logger.error(f"{file_name} not found")
+        return None
+    except ValueError:
+        logger.error(f"{file_name} does not match the declared column types. Exiting.")
+        return None
+    return df